@@ -0,0 +1,151 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Compiled matcher for the entries of approved_patterns.yml.
+
+Matching an action ref against every allowlist entry with ``fnmatch`` costs
+O(entries) per ref. ``AllowlistMatcher`` sorts the entries once into:
+
+- exact entries (``owner/action@<sha>``) -- a hash lookup,
+- ``owner/action@*`` entries -- prefix checks, bucketed by owner,
+- ``owner/*@*`` entries -- a hash lookup by owner,
+- all remaining glob entries -- one precompiled regex.
+
+Entries starting with ``!`` block matching refs, regardless of their
+position in the list and of any allowing entry.
+
+Matching is equivalent to ``fnmatch.fnmatchcase`` against every entry.
+This module is shared by allowlist-check/check_asf_allowlist.py and
+gateway/check_repository_actions.py.
+"""
+
+import fnmatch
+import re
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def _has_glob(text: str) -> bool:
+    return not GLOB_CHARS.isdisjoint(text)
+
+
+class _PatternIndex:
+    """Index over a list of glob patterns, see the module docstring."""
+
+    def __init__(self, patterns: list[str]):
+        self._exact: set[str] = set()
+        # owner -> [(prefix, pattern)] for 'owner/action@*' entries
+        self._ref_wildcards: dict[str, list[tuple[str, str]]] = {}
+        # owner -> pattern for 'owner/*@*' entries
+        self._owner_wildcards: dict[str, str] = {}
+        globs: list[str] = []
+
+        for pattern in patterns:
+            if not _has_glob(pattern):
+                self._exact.add(pattern)
+            elif pattern.endswith("@*") and not _has_glob(pattern[:-1]) and "/" in pattern:
+                prefix = pattern[:-1]
+                owner = prefix.split("/", 1)[0]
+                self._ref_wildcards.setdefault(owner, []).append((prefix, pattern))
+            elif pattern.endswith("/*@*") and not _has_glob(pattern[:-4]) and "/" not in pattern[:-4]:
+                self._owner_wildcards.setdefault(pattern[:-4], pattern)
+            else:
+                globs.append(pattern)
+
+        self._globs = globs
+        self._glob_regex = (
+            re.compile("|".join(f"(?P<g{i}>{fnmatch.translate(p)})" for i, p in enumerate(globs)))
+            if globs
+            else None
+        )
+
+    def match(self, action_ref: str) -> str | None:
+        if action_ref in self._exact:
+            return action_ref
+
+        owner, sep, rest = action_ref.partition("/")
+        if sep:
+            for prefix, pattern in self._ref_wildcards.get(owner, ()):
+                if action_ref.startswith(prefix):
+                    return pattern
+            pattern = self._owner_wildcards.get(owner)
+            if pattern is not None and "@" in rest:
+                return pattern
+
+        if self._glob_regex is not None:
+            m = self._glob_regex.match(action_ref)
+            if m is not None:
+                return self._globs[int(m.lastgroup[1:])]
+        return None
+
+
+class AllowlistMatcher:
+    """Matches action refs against a list of allowlist patterns.
+
+    Args:
+        patterns: Allowlist entries, as found in approved_patterns.yml
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = list(patterns)
+        self._allow = _PatternIndex([p for p in self.patterns if not p.startswith("!")])
+        self._block = _PatternIndex([p[1:] for p in self.patterns if p.startswith("!")])
+
+    def to_dict(self) -> dict:
+        """Return the entries as JSON-serializable data, see from_dict."""
+        return {"patterns": self.patterns}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AllowlistMatcher":
+        """Restore a matcher from to_dict output.
+
+        The indexes are always rebuilt from the entries, which is cheap, so
+        stored data can never allow more than the entries it lists.
+        """
+        return cls(list(data["patterns"]))
+
+    def match(self, action_ref: str) -> str | None:
+        """Return the allowlist entry that allows ``action_ref``, or None.
+
+        Refs matched by a blocking ``!`` entry are never allowed.
+
+        Args:
+            action_ref: The action reference string (e.g., "owner/action@ref")
+
+        Returns:
+            str | None: The matching allowlist entry
+        """
+        if self._block.match(action_ref) is not None:
+            return None
+        return self._allow.match(action_ref)
+
+    def blocked_by(self, action_ref: str) -> str | None:
+        """Return the ``!`` entry that blocks ``action_ref``, or None.
+
+        Args:
+            action_ref: The action reference string (e.g., "owner/action@ref")
+
+        Returns:
+            str | None: The blocking allowlist entry, including the ``!``
+        """
+        pattern = self._block.match(action_ref)
+        return None if pattern is None else f"!{pattern}"
+
+    def __contains__(self, action_ref: str) -> bool:
+        return self.match(action_ref) is not None
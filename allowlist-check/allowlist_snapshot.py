@@ -0,0 +1,290 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Precompiled snapshot of approved_patterns.yml and the actions.yml expiry dates.
+
+gateway/gateway.py writes approved_patterns.json next to approved_patterns.yml
+whenever it regenerates the allowlist. The snapshot holds the allowlist
+entries and an ExpiryCalendar of every expiring ref, so
+check_asf_allowlist.py can start without parsing either YAML file, and
+gateway.py can tell which refs are due for removal or expire next.
+
+The snapshot records the SHA-256 of the approved_patterns.yml and actions.yml
+contents it was generated from. It is only used when these still match the
+files passed to the check; otherwise the check falls back to the YAML files.
+gateway.py also records the composite action it generated last, to tell
+whether that file can be patched rather than generated again.
+The matcher is rebuilt from the snapshot's entries on load, and every entry
+must be listed in approved_patterns.yml, so an edited snapshot can never
+allow a ref the YAML file does not.
+"""
+
+import bisect
+import datetime
+import hashlib
+import json
+import os
+from typing import Any, Iterable
+
+from allowlist_matcher import AllowlistMatcher
+
+SNAPSHOT_VERSION = 3
+
+
+def snapshot_path(allowlist_path: str) -> str:
+    """Return the snapshot path for an approved_patterns.yml path."""
+    return os.path.splitext(str(allowlist_path))[0] + ".json"
+
+
+def sha256_of(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _read_bytes(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _file_sha256(path: str) -> str | None:
+    content = _read_bytes(path)
+    return None if content is None else sha256_of(content)
+
+
+def _listed_entries(allowlist_content: bytes) -> set[str]:
+    """The ``- entry`` lines of a generated approved_patterns.yml, without quotes."""
+    entries = set()
+    for line in allowlist_content.decode(errors="replace").splitlines():
+        if line.startswith("- "):
+            entry = line[2:].strip()
+            if len(entry) > 1 and entry[0] == entry[-1] and entry[0] in "'\"":
+                entry = entry[1:-1]
+            entries.add(entry)
+    return entries
+
+
+def _expiring_refs(actions: Any) -> Iterable[tuple[str, datetime.date, bool]]:
+    if not isinstance(actions, dict):
+        return
+    for name, refs in actions.items():
+        if not isinstance(refs, dict):
+            continue
+        for ref, details in refs.items():
+            if not isinstance(details, dict):
+                continue
+            when = details.get("expires_at")
+            if isinstance(when, str):
+                try:
+                    when = datetime.date.fromisoformat(when)
+                except ValueError:
+                    continue
+            if isinstance(when, datetime.date):
+                yield f"{name}@{ref}", when, bool(details.get("keep"))
+
+
+def expiry_map_from_actions(actions: Any) -> dict[str, datetime.date]:
+    """Map each ``owner/action@ref`` in parsed actions.yml content to its ``expires_at`` date.
+
+    Refs without a valid ``expires_at`` are omitted.
+
+    Args:
+        actions: Parsed actions.yml content.
+
+    Returns:
+        dict: Mapping of ``owner/action@ref`` to its expiry ``datetime.date``.
+    """
+    return {ref: when for ref, when, _ in _expiring_refs(actions)}
+
+
+class ExpiryCalendar:
+    """Expiring refs sorted by their expiry date, for range queries.
+
+    Args:
+        entries: ``(owner/action@ref, expiry date, keep)`` tuples. Refs with
+            ``keep`` are never removed, regardless of their expiry date.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, datetime.date, bool]]):
+        self._entries = sorted(
+            (when.toordinal(), ref, keep) for ref, when, keep in entries
+        )
+        self._ordinals = [entry[0] for entry in self._entries]
+
+    @classmethod
+    def from_actions(cls, actions: Any) -> "ExpiryCalendar":
+        """Build the calendar from parsed actions.yml content."""
+        return cls(_expiring_refs(actions))
+
+    @classmethod
+    def from_map(cls, expiry_map: dict[str, datetime.date]) -> "ExpiryCalendar":
+        """Build the calendar from a :func:`expiry_map_from_actions` mapping."""
+        return cls((ref, when, False) for ref, when in expiry_map.items())
+
+    def to_list(self) -> list[list]:
+        return [
+            [datetime.date.fromordinal(ordinal).isoformat(), ref, keep]
+            for ordinal, ref, keep in self._entries
+        ]
+
+    @classmethod
+    def from_list(cls, data: list[list]) -> "ExpiryCalendar":
+        return cls(
+            (ref, datetime.date.fromisoformat(when), bool(keep)) for when, ref, keep in data
+        )
+
+    def _slice(self, start: int, end: int) -> list[tuple[datetime.date, str]]:
+        return [
+            (datetime.date.fromordinal(ordinal), ref)
+            for ordinal, ref, _ in self._entries[start:end]
+        ]
+
+    def between(
+        self, first: datetime.date | None, last: datetime.date
+    ) -> list[tuple[datetime.date, str]]:
+        """Return the ``(expiry date, ref)`` pairs expiring from ``first`` (or ever) until ``last``, inclusive."""
+        start = 0 if first is None else bisect.bisect_left(self._ordinals, first.toordinal())
+        return self._slice(start, bisect.bisect_right(self._ordinals, last.toordinal()))
+
+    def upcoming(self, first: datetime.date, count: int) -> list[tuple[datetime.date, str]]:
+        """Return the next ``count`` ``(expiry date, ref)`` pairs expiring on or after ``first``."""
+        start = bisect.bisect_left(self._ordinals, first.toordinal())
+        return self._slice(start, start + count)
+
+    def due(self, today: datetime.date) -> list[str]:
+        """Return the refs to remove on ``today``, i.e. expiring on or before it and not kept."""
+        end = bisect.bisect_right(self._ordinals, today.toordinal())
+        return [ref for _, ref, keep in self._entries[:end] if not keep]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def write_snapshot(
+    path: str,
+    patterns: list[str],
+    allowlist_content: bytes,
+    actions: Any,
+    actions_content: bytes,
+    composite_action_content: bytes | None = None,
+) -> None:
+    """Write the snapshot for a freshly generated approved_patterns.yml.
+
+    Args:
+        path: Where to write the snapshot.
+        patterns: The allowlist entries.
+        allowlist_content: The approved_patterns.yml content as written.
+        actions: Parsed actions.yml content the allowlist was generated from.
+        actions_content: The actions.yml content as read.
+        composite_action_content: The composite action generated from the same
+            actions.yml, if any.
+    """
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "approved_patterns_sha256": sha256_of(allowlist_content),
+        "actions_sha256": sha256_of(actions_content),
+        "composite_action_sha256": (
+            None if composite_action_content is None else sha256_of(composite_action_content)
+        ),
+        "matcher": AllowlistMatcher(patterns).to_dict(),
+        "expiry_calendar": ExpiryCalendar.from_actions(actions).to_list(),
+    }
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+class AllowlistSnapshot:
+    """A loaded snapshot.
+
+    Attributes:
+        matcher: The compiled allowlist.
+        expiry: The expiry calendar of actions.yml, or None if the snapshot
+            does not match the actions.yml in use.
+    """
+
+    def __init__(self, matcher: AllowlistMatcher, expiry: ExpiryCalendar | None):
+        self.matcher = matcher
+        self.expiry = expiry
+
+
+def _read_snapshot(path: str, allowlist_path: str) -> tuple[dict, bytes] | tuple[None, None]:
+    """Return the snapshot and the approved_patterns.yml content it was generated from."""
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None, None
+    allowlist_content = _read_bytes(allowlist_path)
+    if allowlist_content is None or snapshot.get("approved_patterns_sha256") != sha256_of(allowlist_content):
+        return None, None
+    return snapshot, allowlist_content
+
+
+def snapshot_matches(
+    path: str,
+    allowlist_path: str,
+    actions_path: str,
+    composite_action_content: bytes | None = None,
+) -> bool:
+    """Whether the snapshot was generated from the given approved_patterns.yml and actions.yml.
+
+    If ``composite_action_content`` is given, it must also be the composite
+    action written with the snapshot. Unlike :func:`load_snapshot`, this does
+    not restore the matcher.
+    """
+    snapshot, _ = _read_snapshot(path, allowlist_path)
+    if snapshot is None or snapshot.get("actions_sha256") != _file_sha256(actions_path):
+        return False
+    return composite_action_content is None or (
+        snapshot.get("composite_action_sha256") == sha256_of(composite_action_content)
+    )
+
+
+def load_snapshot(
+    path: str, allowlist_path: str, actions_path: str | None = None
+) -> AllowlistSnapshot | None:
+    """Load the snapshot if it is current.
+
+    Args:
+        path: The snapshot file.
+        allowlist_path: The approved_patterns.yml the snapshot must match.
+        actions_path: The actions.yml the expiry dates must match, if any.
+
+    Returns:
+        AllowlistSnapshot | None: None if the snapshot is missing, unreadable,
+        of another version, stale with respect to ``allowlist_path`` or lists
+        entries that ``allowlist_path`` does not.
+    """
+    snapshot, allowlist_content = _read_snapshot(path, allowlist_path)
+    if snapshot is None:
+        return None
+    try:
+        matcher = AllowlistMatcher.from_dict(snapshot["matcher"])
+        if not set(matcher.patterns) <= _listed_entries(allowlist_content):
+            return None
+        expiry = None
+        if actions_path and snapshot.get("actions_sha256") == _file_sha256(actions_path):
+            expiry = ExpiryCalendar.from_list(snapshot["expiry_calendar"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return AllowlistSnapshot(matcher, expiry)
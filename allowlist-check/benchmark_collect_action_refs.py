@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+"""Benchmark collect_action_refs on a synthetic .github tree.
+
+Usage:
+    python3 benchmark_collect_action_refs.py [number_of_files]
+
+Generates a .github tree with the given number of workflow and composite
+action files (default: 1000) in a temporary directory and compares the
+round-trip loader with the fast scan, serially and with a process pool.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from check_asf_allowlist import collect_action_refs
+
+WORKFLOW = """\
+name: Workflow {i}
+on:
+  push:
+    branches: [main]
+  pull_request:
+jobs:
+{jobs}
+"""
+
+JOB = """\
+  job-{j}:
+    runs-on: ubuntu-latest
+    strategy:
+      matrix:
+        python: ["3.10", "3.11", "3.12", "3.13"]
+    steps:
+      - uses: actions/checkout@v4  # v4
+        with:
+          persist-credentials: false
+      - uses: astral-sh/setup-uv@681c641aba71e4a1c380be3ab5e12ad51f415867
+      - name: Build
+        run: |
+          echo "building {j}"
+          make build
+      - uses: ./.github/actions/local-{j}
+      - uses: codecov/codecov-action@v{j}
+"""
+
+COMPOSITE = """\
+name: Composite {i}
+runs:
+  using: composite
+  steps:
+    - uses: golangci/golangci-lint-action@v{i}
+    - run: echo composite
+      shell: bash
+"""
+
+
+def generate_tree(root: str, files: int) -> None:
+    workflows = os.path.join(root, ".github", "workflows")
+    os.makedirs(workflows)
+    for i in range(files):
+        if i % 4 == 3:
+            action_dir = os.path.join(root, ".github", "actions", f"action-{i}")
+            os.makedirs(action_dir)
+            with open(os.path.join(action_dir, "action.yml"), "w") as f:
+                f.write(COMPOSITE.format(i=i))
+        else:
+            jobs = "".join(JOB.format(j=j) for j in range(5))
+            with open(os.path.join(workflows, f"workflow-{i}.yml"), "w") as f:
+                f.write(WORKFLOW.format(i=i, jobs=jobs))
+
+
+def measure(label: str, scan_glob: str, **kwargs) -> dict[str, list[str]]:
+    started = time.perf_counter()
+    refs = collect_action_refs(scan_glob, **kwargs)
+    print(f"{label:<32} {time.perf_counter() - started:8.2f}s")
+    return refs
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as root:
+        generate_tree(root, files)
+        scan_glob = os.path.join(root, ".github/**/*.yml")
+        print(f"Scanning {files} files, {os.cpu_count()} CPUs")
+        expected = measure("round-trip loader (default)", scan_glob)
+        serial = measure("fast scan, serial", scan_glob, fast=True, workers=1)
+        parallel = measure("fast scan, process pool", scan_glob, fast=True)
+        if serial != expected or parallel != expected:
+            print("Results differ!")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
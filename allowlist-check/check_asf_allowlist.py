@@ -23,23 +23,46 @@ Usage:
     python3 check_asf_allowlist.py <allowlist_path>
 
 The allowlist is the approved_patterns.yml file colocated at the root of
-this repository (../approved_patterns.yml relative to this script).
+this repository (../approved_patterns.yml relative to this script). If the
+precompiled approved_patterns.json snapshot next to it is current, it is used
+instead of parsing the YAML file, see allowlist_snapshot.py.
 
 The glob pattern for YAML files to scan can be overridden via the
 GITHUB_YAML_GLOB environment variable (default: .github/**/*.yml).
 
+The files are scanned with a streaming YAML event scan, in parallel worker
+processes for large trees. Set ALLOWLIST_SCAN_WORKERS to limit the number of
+worker processes (1 scans serially).
+
 Exits with code 1 if any action ref is not allowlisted.
 """
 
 import datetime
-import fnmatch
+import functools
 import glob
 import os
 import shlex
 import sys
-from typing import Any, Generator
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Generator
 
 import ruyaml
+from ruyaml.events import (
+    AliasEvent,
+    CollectionEndEvent,
+    MappingStartEvent,
+    ScalarEvent,
+    SequenceStartEvent,
+)
+from ruyaml.nodes import ScalarNode
+
+from allowlist_matcher import AllowlistMatcher
+from allowlist_snapshot import (
+    ExpiryCalendar,
+    expiry_map_from_actions,
+    load_snapshot,
+    snapshot_path,
+)
 
 # actions/*, github/*, apache/* are implicitly trusted by GitHub/ASF
 # See ../README.md ("Management of Organization-wide GitHub Actions Allow List")
@@ -59,6 +82,12 @@ USES_KEY = "uses"
 # How many days before an allowlisted pin's expiry to start warning about it.
 DEFAULT_EXPIRY_WARNING_DAYS = 30
 
+# Fast scans use worker processes only from this many files on; for fewer
+# files, starting the workers costs more than it saves.
+PARALLEL_SCAN_MIN_FILES = 64
+
+YAML_STR_TAG = "tag:yaml.org,2002:str"
+
 
 def find_action_refs(node: Any) -> Generator[str, None, None]:
     """Recursively find all `uses:` values from a parsed YAML tree.
@@ -80,8 +109,91 @@ def find_action_refs(node: Any) -> Generator[str, None, None]:
             yield from find_action_refs(item)
 
 
+def scan_action_refs(stream: IO[str]) -> Generator[str, None, None]:
+    """Find all `uses:` values in a YAML stream without building a tree.
+
+    Walks the parser events and only tracks whether the current scalar is
+    the value of a `uses` key, which is much cheaper than loading the
+    document with the round-trip loader. Yields the same string values as
+    :func:`find_action_refs` on the loaded document. Anchored string
+    scalars are remembered, so a `uses` value (or key) given as an alias is
+    reported too; the `uses` values inside an aliased collection are
+    reported once, where the anchor is defined.
+
+    Args:
+        stream: The YAML content
+
+    Yields:
+        str: Each `uses:` string value found in the stream
+    """
+    yaml = ruyaml.YAML(typ="safe", pure=True)
+
+    def string_value(event: ScalarEvent) -> str | None:
+        tag = event.tag
+        if tag in (None, "!"):
+            tag = yaml.resolver.resolve(ScalarNode, event.value, event.implicit)
+        return event.value if tag == YAML_STR_TAG else None
+
+    # One entry per open collection: None for sequences, otherwise a
+    # two-item list [expecting_key, current_key] for mappings.
+    stack: list[list | None] = []
+    # Anchor name -> the anchored scalar's string value, None for anything else
+    anchors: dict[str, str | None] = {}
+    for event in yaml.parse(stream):
+        if isinstance(event, (ScalarEvent, AliasEvent, MappingStartEvent, SequenceStartEvent)):
+            if isinstance(event, AliasEvent):
+                value = anchors.get(event.anchor)
+            else:
+                value = string_value(event) if isinstance(event, ScalarEvent) else None
+                if event.anchor is not None:
+                    anchors[event.anchor] = value
+            mapping = stack[-1] if stack else None
+            if mapping is not None:
+                if mapping[0]:
+                    mapping[0] = False
+                    mapping[1] = value
+                else:
+                    mapping[0] = True
+                    if mapping[1] == USES_KEY and value is not None:
+                        yield value
+            if isinstance(event, MappingStartEvent):
+                stack.append([True, None])
+            elif isinstance(event, SequenceStartEvent):
+                stack.append(None)
+        elif isinstance(event, CollectionEndEvent):
+            stack.pop()
+
+
+def _scan_file(filepath: str) -> tuple[str, list[str], str | None]:
+    """Scan one file with :func:`scan_action_refs`.
+
+    Errors are returned instead of raised, so this can run in a worker process.
+
+    Returns:
+        tuple: ``(filepath, uses values, parse error or None)``
+    """
+    try:
+        with open(filepath) as f:
+            return filepath, list(scan_action_refs(f)), None
+    except ruyaml.YAMLError as exc:
+        return filepath, [], str(exc)
+
+
+def _load_file(filepath: str) -> tuple[str, list[str], str | None]:
+    """Load one file with the round-trip loader and collect its `uses:` values."""
+    try:
+        yaml = ruyaml.YAML()
+        with open(filepath) as f:
+            content = yaml.load(f)
+    except ruyaml.YAMLError as exc:
+        return filepath, [], str(exc)
+    return filepath, list(find_action_refs(content)) if content else [], None
+
+
 def collect_action_refs(
     scan_glob: str = DEFAULT_GITHUB_YAML_GLOB,
+    fast: bool = False,
+    workers: int | None = None,
 ) -> dict[str, list[str]]:
     """Collect all third-party action refs from YAML files.
 
@@ -90,23 +202,30 @@ def collect_action_refs(
 
     Args:
         scan_glob: Glob pattern for files to scan.
+        fast: Use the streaming :func:`scan_action_refs` instead of loading
+            each file, with a process pool for large trees.
+        workers: Maximum number of worker processes for fast scans
+            (default: number of CPUs, 1 disables the process pool).
 
     Returns:
         dict: Mapping of each action ref to the list of file paths that use it.
     """
 
+    filepaths = sorted(glob.glob(scan_glob, recursive=True))
+    if not fast:
+        results = map(_load_file, filepaths)
+    elif len(filepaths) >= PARALLEL_SCAN_MIN_FILES and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan_file, filepaths, chunksize=16))
+    else:
+        results = map(_scan_file, filepaths)
+
     action_refs = {}
-    for filepath in sorted(glob.glob(scan_glob, recursive=True)):
-        try:
-            yaml = ruyaml.YAML()
-            with open(filepath) as f:
-                content = yaml.load(f)
-        except ruyaml.YAMLError as exc:
-            print(f"::error file={filepath}::Failed to parse YAML: {exc}")
+    for filepath, refs, error in results:
+        if error is not None:
+            print(f"::error file={filepath}::Failed to parse YAML: {error}")
             sys.exit(1)
-        if not content:
-            continue
-        for ref in find_action_refs(content):
+        for ref in refs:
             if ref.startswith(SKIPPED_PREFIXES):
                 continue
             action_refs.setdefault(ref, []).append(filepath)
@@ -136,7 +255,12 @@ def load_allowlist(allowlist_path: str) -> list[str]:
     return result if result else []
 
 
-def is_allowed(action_ref: str, allowlist: list[str]) -> bool:
+@functools.lru_cache(maxsize=8)
+def _compiled_allowlist(patterns: tuple[str, ...]) -> AllowlistMatcher:
+    return AllowlistMatcher(list(patterns))
+
+
+def is_allowed(action_ref: str, allowlist: list[str] | AllowlistMatcher) -> bool:
     """Check whether a single action ref is allowed.
 
     An action ref is allowed if its owner is in TRUSTED_OWNERS or it
@@ -144,7 +268,9 @@ def is_allowed(action_ref: str, allowlist: list[str]) -> bool:
 
     Args:
         action_ref: The action reference string (e.g., "owner/action@ref")
-        allowlist: List of allowlist patterns to match against
+        allowlist: List of allowlist patterns to match against, or an
+            already compiled AllowlistMatcher. Lists are compiled once and
+            reused for later calls with the same patterns.
 
     Returns:
         bool: True if the action ref is allowed
@@ -152,7 +278,9 @@ def is_allowed(action_ref: str, allowlist: list[str]) -> bool:
     owner = action_ref.split("/")[0]
     if owner in TRUSTED_OWNERS:
         return True
-    return any(fnmatch.fnmatch(action_ref, pattern) for pattern in allowlist)
+    if not isinstance(allowlist, AllowlistMatcher):
+        allowlist = _compiled_allowlist(tuple(allowlist))
+    return allowlist.match(action_ref) is not None
 
 
 def load_expiry_map(actions_path: str) -> dict[str, datetime.date]:
@@ -178,30 +306,12 @@ def load_expiry_map(actions_path: str) -> dict[str, datetime.date]:
             actions = yaml.load(f)
     except (OSError, ruyaml.YAMLError):
         return {}
-    if not actions:
-        return {}
-
-    expiry: dict[str, datetime.date] = {}
-    for name, refs in actions.items():
-        if not isinstance(refs, dict):
-            continue
-        for ref, details in refs.items():
-            if not isinstance(details, dict):
-                continue
-            when = details.get("expires_at")
-            if isinstance(when, datetime.date):
-                expiry[f"{name}@{ref}"] = when
-            elif isinstance(when, str):
-                try:
-                    expiry[f"{name}@{ref}"] = datetime.date.fromisoformat(when)
-                except ValueError:
-                    continue
-    return expiry
+    return expiry_map_from_actions(actions)
 
 
 def upcoming_expiry_warnings(
     action_refs: dict[str, list[str]],
-    expiry_map: dict[str, datetime.date],
+    expiry_map: dict[str, datetime.date] | ExpiryCalendar,
     warning_days: int,
     today: datetime.date,
 ) -> list[tuple[str, str, datetime.date, int]]:
@@ -212,7 +322,8 @@ def upcoming_expiry_warnings(
 
     Args:
         action_refs: Mapping of action ref -> files that use it.
-        expiry_map: Output of :func:`load_expiry_map`.
+        expiry_map: Output of :func:`load_expiry_map`, or the expiry calendar
+            of the allowlist snapshot.
         warning_days: Warn when a pin expires within this many days.
         today: Reference date for the countdown (injected for testability).
 
@@ -221,15 +332,14 @@ def upcoming_expiry_warnings(
         (ref, file) pair, soonest expiry first. ``days_left`` is negative for a
         pin that is already past its expiry but still listed.
     """
+    if not isinstance(expiry_map, ExpiryCalendar):
+        expiry_map = ExpiryCalendar.from_map(expiry_map)
     warnings: list[tuple[str, str, datetime.date, int]] = []
-    for ref, filepaths in action_refs.items():
-        expiry_date = expiry_map.get(ref)
-        if expiry_date is None:
-            continue
-        days_left = (expiry_date - today).days
-        if days_left <= warning_days:
-            for filepath in filepaths:
-                warnings.append((filepath, ref, expiry_date, days_left))
+    # Only the refs expiring until the end of the warning window are looked at
+    window_end = today + datetime.timedelta(days=warning_days)
+    for expiry_date, ref in expiry_map.between(None, window_end):
+        for filepath in action_refs.get(ref, ()):
+            warnings.append((filepath, ref, expiry_date, (expiry_date - today).days))
     warnings.sort(key=lambda w: (w[3], w[1], w[0]))
     return warnings
 
@@ -283,12 +393,16 @@ def build_gh_pr_command(action_name: str, refs: list[str], repo_name: str) -> st
 
 
 def emit_expiry_warnings(
-    action_refs: dict[str, list[str]], actions_path: str
+    action_refs: dict[str, list[str]],
+    actions_path: str,
+    expiry_map: dict[str, datetime.date] | ExpiryCalendar | None = None,
 ) -> None:
     """Print GitHub ``::warning::`` annotations for soon-to-expire pins.
 
     Best-effort and never fatal: a missing/unparseable ``actions.yml`` or a bad
-    ``EXPIRY_WARNING_DAYS`` value simply yields no warnings.
+    ``EXPIRY_WARNING_DAYS`` value simply yields no warnings. ``expiry_map``
+    (e.g. from the allowlist snapshot) is used instead of parsing
+    ``actions_path`` when given.
     """
     try:
         warning_days = int(
@@ -297,7 +411,8 @@ def emit_expiry_warnings(
     except ValueError:
         warning_days = DEFAULT_EXPIRY_WARNING_DAYS
 
-    expiry_map = load_expiry_map(actions_path)
+    if expiry_map is None:
+        expiry_map = load_expiry_map(actions_path)
     warnings = upcoming_expiry_warnings(
         action_refs, expiry_map, warning_days, datetime.date.today()
     )
@@ -335,19 +450,29 @@ def main():
 
     allowlist_path = sys.argv[1]
     actions_path = sys.argv[2] if len(sys.argv) == 3 else None
-    allowlist = load_allowlist(allowlist_path)
+    # Use the precompiled snapshot next to the allowlist when it is current,
+    # otherwise parse the YAML files.
+    snapshot = load_snapshot(snapshot_path(allowlist_path), allowlist_path, actions_path)
+    if snapshot is not None:
+        allowlist = snapshot.matcher
+    else:
+        allowlist = AllowlistMatcher(load_allowlist(allowlist_path))
     scan_glob = os.environ.get("GITHUB_YAML_GLOB", DEFAULT_GITHUB_YAML_GLOB)
-    action_refs = collect_action_refs(scan_glob)
+    workers = os.environ.get("ALLOWLIST_SCAN_WORKERS", "")
+    action_refs = collect_action_refs(
+        scan_glob, fast=True, workers=int(workers) if workers.isdigit() and int(workers) > 0 else None
+    )
 
     print(f"Checking {len(action_refs)} unique action ref(s) against the ASF allowlist:\n")
     violations = []
     for action_ref, filepaths in sorted(action_refs.items()):
-        allowed = is_allowed(action_ref, allowlist)
         owner = action_ref.split("/")[0]
+        pattern = None if owner in TRUSTED_OWNERS else allowlist.match(action_ref)
+        allowed = owner in TRUSTED_OWNERS or pattern is not None
         if owner in TRUSTED_OWNERS:
             reason = f"trusted owner ({owner})"
         elif allowed:
-            reason = "matches allowlist"
+            reason = f"matches allowlist entry {pattern}"
         else:
             reason = "NOT ON ALLOWLIST"
         status = "✅" if allowed else "❌"
@@ -360,7 +485,9 @@ def main():
     # Best-effort expiry warnings (never fail the build); shown whether or not
     # there are hard violations, so projects get advance notice to bump pins.
     if actions_path:
-        emit_expiry_warnings(action_refs, actions_path)
+        emit_expiry_warnings(
+            action_refs, actions_path, snapshot.expiry if snapshot is not None else None
+        )
 
     if violations:
         print(
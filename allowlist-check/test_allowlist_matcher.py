@@ -0,0 +1,108 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import fnmatch
+import os
+import unittest
+
+from allowlist_matcher import AllowlistMatcher
+from check_asf_allowlist import load_allowlist
+
+APPROVED_PATTERNS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "approved_patterns.yml"
+)
+
+
+class TestAllowlistMatcher(unittest.TestCase):
+    """Tests for the compiled allowlist matcher."""
+
+    def setUp(self):
+        self.matcher = AllowlistMatcher(
+            [
+                "astral-sh/setup-uv@681c641aba71e4a1c380be3ab5e12ad51f415867",
+                "codecov/codecov-action@*",
+                "golangci/*@*",
+                "docker://jekyll/jekyll@sha256:400b",
+                "some-org/action-?@v[0-9]",
+            ]
+        )
+
+    def test_exact(self):
+        self.assertEqual(
+            self.matcher.match("astral-sh/setup-uv@681c641aba71e4a1c380be3ab5e12ad51f415867"),
+            "astral-sh/setup-uv@681c641aba71e4a1c380be3ab5e12ad51f415867",
+        )
+        self.assertIsNone(self.matcher.match("astral-sh/setup-uv@v5"))
+
+    def test_ref_wildcard(self):
+        self.assertEqual(
+            self.matcher.match("codecov/codecov-action@v4"), "codecov/codecov-action@*"
+        )
+        self.assertIsNone(self.matcher.match("codecov/codecov-action/sub@v4"))
+        self.assertIsNone(self.matcher.match("codecov/other@v4"))
+
+    def test_owner_wildcard(self):
+        self.assertEqual(self.matcher.match("golangci/lint-action@abc"), "golangci/*@*")
+        self.assertEqual(self.matcher.match("golangci/a/b@abc"), "golangci/*@*")
+        self.assertIsNone(self.matcher.match("golangci/lint-action"))
+        self.assertIsNone(self.matcher.match("golangcix/lint-action@abc"))
+
+    def test_other_globs(self):
+        self.assertEqual(self.matcher.match("some-org/action-a@v1"), "some-org/action-?@v[0-9]")
+        self.assertIsNone(self.matcher.match("some-org/action-ab@v1"))
+
+    def test_contains(self):
+        self.assertIn("docker://jekyll/jekyll@sha256:400b", self.matcher)
+        self.assertNotIn("evil-org/evil-action@v1", self.matcher)
+
+    def test_block_entries(self):
+        matcher = AllowlistMatcher(
+            ["!codecov/codecov-action@v3", "codecov/*@*", "!evil/*@*"]
+        )
+        self.assertEqual(matcher.match("codecov/codecov-action@v4"), "codecov/*@*")
+        # A block entry wins regardless of its position in the list
+        self.assertIsNone(matcher.match("codecov/codecov-action@v3"))
+        self.assertEqual(
+            matcher.blocked_by("codecov/codecov-action@v3"), "!codecov/codecov-action@v3"
+        )
+        self.assertEqual(matcher.blocked_by("evil/action@v1"), "!evil/*@*")
+        self.assertIsNone(matcher.blocked_by("codecov/codecov-action@v4"))
+
+    def test_empty(self):
+        self.assertIsNone(AllowlistMatcher([]).match("some/action@v1"))
+
+    def test_equivalent_to_fnmatch_on_approved_patterns(self):
+        patterns = load_allowlist(APPROVED_PATTERNS)
+        matcher = AllowlistMatcher(patterns)
+        candidates = set(patterns)
+        for pattern in patterns:
+            base = pattern.replace("*", "x").replace("?", "y")
+            candidates.update(
+                {base, base + "0", base.upper(), base.split("@")[0] + "@v1", base.split("@")[0] + "/sub@v1"}
+            )
+        for ref in sorted(candidates):
+            expected = any(fnmatch.fnmatchcase(ref, p) for p in patterns)
+            found = matcher.match(ref)
+            self.assertEqual(found is not None, expected, ref)
+            if found is not None:
+                self.assertTrue(fnmatch.fnmatchcase(ref, found), ref)
+
+
+if __name__ == "__main__":
+    unittest.main()
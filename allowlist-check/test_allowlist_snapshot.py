@@ -0,0 +1,194 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import textwrap
+import unittest
+
+from allowlist_matcher import AllowlistMatcher
+from allowlist_snapshot import ExpiryCalendar, load_snapshot, snapshot_path, write_snapshot
+
+PATTERNS = [
+    "astral-sh/setup-uv@681c641aba71e4a1c380be3ab5e12ad51f415867",
+    "codecov/codecov-action@*",
+    "golangci/*@*",
+    "some-org/action-?@v[0-9]",
+    "!codecov/codecov-action@v3",
+]
+
+ACTIONS_YML = textwrap.dedent(
+    """\
+    astral-sh/setup-uv:
+      681c641aba71e4a1c380be3ab5e12ad51f415867:
+        tag: v5
+        expires_at: 2026-08-16
+    codecov/codecov-action:
+      '*':
+        keep: true
+    """
+)
+
+
+class TestAllowlistSnapshot(unittest.TestCase):
+    """Tests for writing and loading the precompiled allowlist snapshot."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.allowlist_path = os.path.join(self.tmpdir, "approved_patterns.yml")
+        self.actions_path = os.path.join(self.tmpdir, "actions.yml")
+        self.snapshot = snapshot_path(self.allowlist_path)
+        allowlist_content = "".join(f"- {p}\n" for p in PATTERNS)
+        with open(self.allowlist_path, "w") as f:
+            f.write(allowlist_content)
+        with open(self.actions_path, "w") as f:
+            f.write(ACTIONS_YML)
+        actions = {
+            "astral-sh/setup-uv": {
+                "681c641aba71e4a1c380be3ab5e12ad51f415867": {
+                    "tag": "v5",
+                    "expires_at": datetime.date(2026, 8, 16),
+                },
+            },
+            "codecov/codecov-action": {"*": {"keep": True}},
+        }
+        write_snapshot(
+            self.snapshot, PATTERNS, allowlist_content.encode(), actions, ACTIONS_YML.encode()
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_snapshot_path(self):
+        self.assertEqual(snapshot_path("/a/approved_patterns.yml"), "/a/approved_patterns.json")
+
+    def test_round_trip_matches_compiled_matcher(self):
+        snapshot = load_snapshot(self.snapshot, self.allowlist_path, self.actions_path)
+        self.assertIsNotNone(snapshot)
+        expected = AllowlistMatcher(PATTERNS)
+        for ref in [
+            "astral-sh/setup-uv@681c641aba71e4a1c380be3ab5e12ad51f415867",
+            "astral-sh/setup-uv@v5",
+            "codecov/codecov-action@v4",
+            "codecov/codecov-action@v3",
+            "golangci/lint-action@abc",
+            "some-org/action-a@v1",
+            "some-org/action-ab@v1",
+        ]:
+            self.assertEqual(snapshot.matcher.match(ref), expected.match(ref), ref)
+            self.assertEqual(snapshot.matcher.blocked_by(ref), expected.blocked_by(ref), ref)
+        self.assertEqual(snapshot.matcher.patterns, PATTERNS)
+        self.assertEqual(
+            snapshot.expiry.between(None, datetime.date(2026, 12, 31)),
+            [(datetime.date(2026, 8, 16), "astral-sh/setup-uv@681c641aba71e4a1c380be3ab5e12ad51f415867")],
+        )
+
+    def test_stale_allowlist_is_ignored(self):
+        with open(self.allowlist_path, "a") as f:
+            f.write("- evil-org/evil-action@v1\n")
+        self.assertIsNone(load_snapshot(self.snapshot, self.allowlist_path, self.actions_path))
+
+    def test_stale_actions_drops_only_expiry(self):
+        with open(self.actions_path, "a") as f:
+            f.write("other/action:\n  v1: {}\n")
+        snapshot = load_snapshot(self.snapshot, self.allowlist_path, self.actions_path)
+        self.assertIsNotNone(snapshot)
+        self.assertIsNone(snapshot.expiry)
+        self.assertEqual(snapshot.matcher.match("golangci/lint-action@abc"), "golangci/*@*")
+
+    def test_missing_or_invalid_snapshot(self):
+        self.assertIsNone(
+            load_snapshot(os.path.join(self.tmpdir, "missing.json"), self.allowlist_path)
+        )
+        with open(self.snapshot, "w") as f:
+            f.write("{not json")
+        self.assertIsNone(load_snapshot(self.snapshot, self.allowlist_path))
+
+    def test_other_version_is_ignored(self):
+        with open(self.snapshot) as f:
+            content = f.read()
+        with open(self.snapshot, "w") as f:
+            f.write(content.replace('"version": 3', '"version": 2'))
+        self.assertIsNone(load_snapshot(self.snapshot, self.allowlist_path))
+
+    def _edit_snapshot(self, edit):
+        with open(self.snapshot) as f:
+            data = json.load(f)
+        edit(data)
+        with open(self.snapshot, "w") as f:
+            json.dump(data, f)
+
+    def test_stored_indexes_are_not_trusted(self):
+        def add_exact(data):
+            data["matcher"]["allow"] = {"exact": ["evil-org/evil-action@v1"]}
+
+        self._edit_snapshot(add_exact)
+        snapshot = load_snapshot(self.snapshot, self.allowlist_path, self.actions_path)
+        self.assertIsNotNone(snapshot)
+        self.assertIsNone(snapshot.matcher.match("evil-org/evil-action@v1"))
+        self.assertEqual(snapshot.matcher.match("golangci/lint-action@abc"), "golangci/*@*")
+
+    def test_entries_not_in_allowlist_are_rejected(self):
+        self._edit_snapshot(lambda data: data["matcher"]["patterns"].append("evil-org/*@*"))
+        self.assertIsNone(load_snapshot(self.snapshot, self.allowlist_path, self.actions_path))
+
+
+class TestExpiryCalendar(unittest.TestCase):
+    """Tests for the expiry calendar range queries."""
+
+    def setUp(self):
+        self.calendar = ExpiryCalendar(
+            [
+                ("org/c@ccc", datetime.date(2026, 3, 1), False),
+                ("org/a@aaa", datetime.date(2026, 1, 1), False),
+                ("org/k@kkk", datetime.date(2026, 1, 15), True),
+                ("org/b@bbb", datetime.date(2026, 2, 1), False),
+            ]
+        )
+
+    def test_between(self):
+        self.assertEqual(
+            self.calendar.between(datetime.date(2026, 1, 2), datetime.date(2026, 2, 1)),
+            [(datetime.date(2026, 1, 15), "org/k@kkk"), (datetime.date(2026, 2, 1), "org/b@bbb")],
+        )
+        self.assertEqual(len(self.calendar.between(None, datetime.date(2026, 2, 1))), 3)
+
+    def test_upcoming(self):
+        self.assertEqual(
+            self.calendar.upcoming(datetime.date(2026, 1, 16), 1),
+            [(datetime.date(2026, 2, 1), "org/b@bbb")],
+        )
+        self.assertEqual(self.calendar.upcoming(datetime.date(2026, 4, 1), 5), [])
+
+    def test_due_skips_kept_refs(self):
+        self.assertEqual(self.calendar.due(datetime.date(2026, 2, 1)), ["org/a@aaa", "org/b@bbb"])
+        self.assertEqual(self.calendar.due(datetime.date(2025, 12, 31)), [])
+
+    def test_list_round_trip(self):
+        restored = ExpiryCalendar.from_list(self.calendar.to_list())
+        self.assertEqual(restored.to_list(), self.calendar.to_list())
+        self.assertEqual(len(restored), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,6 +17,7 @@
 # under the License.
 #
 
+import io
 import os
 import shutil
 import tempfile
@@ -26,6 +27,9 @@ from unittest.mock import patch
 
 import datetime
 
+import ruyaml
+
+from allowlist_matcher import _PatternIndex
 from check_asf_allowlist import (
     build_gh_pr_command,
     collect_action_refs,
@@ -34,6 +38,7 @@ from check_asf_allowlist import (
     load_allowlist,
     load_expiry_map,
     main,
+    scan_action_refs,
     upcoming_expiry_warnings,
 )
 from insert_actions import insert_actions
@@ -170,6 +175,15 @@ class TestIsAllowed(unittest.TestCase):
         """An action ref that is just an owner name (edge case) should still work."""
         self.assertFalse(is_allowed("random", self.allowlist))
 
+    def test_list_is_compiled_once(self):
+        allowlist = self.allowlist + ["compiled/once@*"]
+        with patch("allowlist_matcher._PatternIndex", wraps=_PatternIndex) as index:
+            for _ in range(3):
+                self.assertTrue(is_allowed("compiled/once@v1", allowlist))
+                self.assertFalse(is_allowed("compiled/twice@v1", allowlist))
+        # One index for the allowing and one for the blocking entries
+        self.assertEqual(index.call_count, 2)
+
 
 class TestLoadAllowlist(unittest.TestCase):
     """Tests for loading allowlist from a YAML file."""
@@ -312,6 +326,121 @@ class TestCollectActionRefs(unittest.TestCase):
         refs = collect_action_refs(scan_glob)
         self.assertEqual(refs, {})
 
+    def test_fast_scan_matches_default(self):
+        for i in range(5):
+            self._write_workflow(
+                f"ci{i}.yml",
+                f"""\
+                name: CI {i}
+                on: push
+                jobs:
+                  build:
+                    runs-on: ubuntu-latest
+                    steps:
+                      - uses: actions/checkout@v4
+                      - uses: ./local-action
+                      - uses: codecov/codecov-action@v{i}
+                """,
+            )
+        self._write_workflow("empty.yml", "")
+        scan_glob = os.path.join(self.tmpdir, ".github/**/*.yml")
+        expected = collect_action_refs(scan_glob)
+        self.assertEqual(collect_action_refs(scan_glob, fast=True), expected)
+        with patch("check_asf_allowlist.PARALLEL_SCAN_MIN_FILES", 2):
+            self.assertEqual(
+                collect_action_refs(scan_glob, fast=True, workers=2), expected
+            )
+
+    def test_fast_scan_reports_aliased_uses(self):
+        self._write_workflow(
+            "alias.yml",
+            """\
+            env: {X: &ref evil/action@v1}
+            jobs:
+              build:
+                steps:
+                  - uses: *ref
+            """,
+        )
+        scan_glob = os.path.join(self.tmpdir, ".github/**/*.yml")
+        self.assertEqual(collect_action_refs(scan_glob, fast=True), collect_action_refs(scan_glob))
+        self.assertIn("evil/action@v1", collect_action_refs(scan_glob, fast=True))
+
+    def test_fast_scan_invalid_yaml_errors(self):
+        self._write_workflow("bad.yml", ":\n  - :\n  invalid: [")
+        scan_glob = os.path.join(self.tmpdir, ".github/**/*.yml")
+        with self.assertRaises(SystemExit):
+            collect_action_refs(scan_glob, fast=True)
+
+
+class TestScanActionRefs(unittest.TestCase):
+    """Tests for the streaming `uses:` scan."""
+
+    def _scan(self, content):
+        return list(scan_action_refs(io.StringIO(textwrap.dedent(content))))
+
+    def test_matches_find_action_refs(self):
+        content = """\
+            name: CI
+            jobs:
+              build:
+                uses: org/repo/.github/workflows/build.yml@main
+                steps:
+                  - uses: actions/checkout@v4
+                  - name: nested
+                    with: {uses: not/an-action@v1}
+                  - [uses, foo/bar@v1]
+                  - uses: "quoted/action@v2"
+              other:
+                steps:
+                  - run: echo uses
+                  - uses: 'single/action@v3'
+            """
+        tree = ruyaml.YAML().load(textwrap.dedent(content))
+        self.assertEqual(self._scan(content), list(find_action_refs(tree)))
+        self.assertEqual(
+            self._scan(content),
+            [
+                "org/repo/.github/workflows/build.yml@main",
+                "actions/checkout@v4",
+                "not/an-action@v1",
+                "quoted/action@v2",
+                "single/action@v3",
+            ],
+        )
+
+    def test_non_string_values_ignored(self):
+        content = """\
+            a: {uses: 42}
+            b: {uses: true}
+            c: {uses: null}
+            d: {uses: [x/y@v1]}
+            e: {uses: "42"}
+            """
+        self.assertEqual(self._scan(content), ["42"])
+
+    def test_uses_as_value_is_not_a_key(self):
+        self.assertEqual(self._scan("key: uses\nother: x/y@v1\n"), [])
+
+    def test_aliased_uses_value_is_reported(self):
+        content = """\
+            env: {X: &ref evil/action@0123456789abcdef0123456789abcdef01234567}
+            number: &num 42
+            key: &key uses
+            jobs:
+              build:
+                steps:
+                  - uses: *ref
+                  - uses: *num
+                  - *key : aliased/key@v1
+            """
+        tree = ruyaml.YAML().load(textwrap.dedent(content))
+        self.assertEqual(self._scan(content), list(find_action_refs(tree)))
+        self.assertEqual(
+            self._scan(content),
+            ["evil/action@0123456789abcdef0123456789abcdef01234567", "aliased/key@v1"],
+        )
+
 
 class TestInsertActions(unittest.TestCase):
     """Tests for the insert_actions helper script."""
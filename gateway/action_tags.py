@@ -19,14 +19,21 @@
 
 import json
 import os
+import random
 import re
+import subprocess
+import threading
+import time
 import urllib.parse
 from urllib.error import HTTPError
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from urllib.request import Request, urlopen
 from pathlib import Path
-from gateway import ActionsYAML, load_yaml, on_gha
+from gateway import ActionRefs, ActionsIndex, ActionsYAML, as_index, on_gha
+from gh_api_cache import GhApiCache, header_value
+from verification_ledger import VerificationLedger
 
 re_github_actions_repo_wildcard = r"^[A-Za-z0-9-_.]+/[*]$"
 re_github_actions_repo = r"^([A-Za-z0-9-_.]+/[A-Za-z0-9-_.]+)(/.+)?$"
@@ -54,6 +61,12 @@ class ActionTagsCheckResult(object):
         self.log(f"{indent} ⚡ {message}")
         self.warnings.append(message)
 
+    def merge(self, other: "ActionTagsCheckResult") -> None:
+        for message in other.logs:
+            self.log(message)
+        self.failures.extend(other.failures)
+        self.warnings.extend(other.warnings)
+
     def has_failures(self) -> bool:
         return len(self.failures) > 0
 
@@ -66,6 +79,136 @@ class ActionTagsCheckResult(object):
           + ''.join([f"WARNING: {warning}\n" for warning in self.warnings]))
 
 
+class ApiStats(object):
+    """Counts the GitHub API requests issued by `_gh_send`, safe to use from multiple threads."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retried = 0
+        self.cached = 0
+        self.throttled_seconds = 0.0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retried += 1
+
+    def record_cached(self) -> None:
+        with self._lock:
+            self.cached += 1
+
+    def record_throttled(self, seconds: float) -> None:
+        with self._lock:
+            self.throttled_seconds += seconds
+
+    def counters(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retried": self.retried,
+                "cached": self.cached,
+                "throttled_seconds": self.throttled_seconds,
+            }
+
+
+class RateLimitScheduler(object):
+    """
+    Schedules GitHub API requests according to GitHub's rate limits.
+
+    * Tracks `X-RateLimit-Remaining` and `X-RateLimit-Reset` of the responses and, once fewer
+      than `min_remaining` requests are left, holds back all requests until the rate limit is reset.
+    * Honors `Retry-After`, which GitHub sends for secondary rate limits, for all threads.
+    * Decides whether a failed request is retried: 429, 403 due to a (secondary) rate limit and 5xx responses
+      are retried up to `max_retries` times with an exponential, jittered backoff.
+
+    See https://docs.github.com/en/rest/using-the-rest-api/rate-limits-for-the-rest-api
+    """
+
+    def __init__(self, max_retries: int = 5, backoff_seconds: float = 1.0, max_backoff_seconds: float = 60.0, min_remaining: int = 10):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.min_remaining = min_remaining
+        self._lock = threading.Lock()
+        self._remaining: int | None = None
+        self._reset_at: float | None = None
+        self._paused_until = 0.0
+
+    def wait(self) -> None:
+        """
+        Blocks until the next request may be sent.
+        """
+        with self._lock:
+            now = time.time()
+            until = self._paused_until
+            if self._remaining is not None and self._remaining < self.min_remaining and self._reset_at:
+                until = max(until, self._reset_at)
+        delay = until - now
+        if delay > 0:
+            print(f"Waiting {delay:.0f}s for the GitHub API rate limit")
+            api_stats.record_throttled(delay)
+            time.sleep(delay)
+
+    def update(self, response: "ApiResponse") -> None:
+        """
+        Records the rate limit state reported by a response.
+        """
+        remaining = header_value(response.headers, "X-RateLimit-Remaining")
+        reset = header_value(response.headers, "X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None and remaining.isdigit():
+                self._remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self._reset_at = float(reset)
+
+    def retry_delay(self, response: "ApiResponse", attempt: int) -> float | None:
+        """
+        Returns the number of seconds to wait before retrying the request, or `None` if it must not be retried.
+        """
+        if attempt >= self.max_retries:
+            return None
+        rate_limited = response.status == 429 or (
+            response.status == 403 and (
+                header_value(response.headers, "X-RateLimit-Remaining") == "0"
+                or header_value(response.headers, "Retry-After") is not None
+                or "rate limit" in response.body.lower()))
+        if not rate_limited and response.status < 500:
+            return None
+
+        retry_after = header_value(response.headers, "Retry-After")
+        reset = header_value(response.headers, "X-RateLimit-Reset")
+        if retry_after is not None and retry_after.isdigit():
+            delay = float(retry_after)
+        elif rate_limited and header_value(response.headers, "X-RateLimit-Remaining") == "0" and reset is not None and reset.isdigit():
+            delay = max(float(reset) - time.time(), 0.0) + 1.0
+        else:
+            delay = min(self.backoff_seconds * 2 ** attempt, self.max_backoff_seconds) * random.uniform(0.5, 1.0)
+        if rate_limited:
+            # Other threads should not run into the rate limit as well.
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.time() + delay)
+        return delay
+
+
+api_stats = ApiStats()
+rate_limit_scheduler = RateLimitScheduler()
+
+# Optional on-disk cache for GitHub API responses, see `enable_api_cache`.
+_api_cache: GhApiCache | None = None
+
+
+def enable_api_cache(cache: GhApiCache | None) -> None:
+    """
+    Lets `_gh_api_get` revalidate previously fetched responses using conditional requests.
+    Pass `None` to disable the cache.
+    """
+    global _api_cache
+    _api_cache = cache
+
+
 class ApiResponse(object):
     def __init__(self, req_url: str, status: int, reason: str, headers: dict[str, str], body: str):
         self.req_url = req_url
@@ -75,7 +218,7 @@ class ApiResponse(object):
         self.body = body
 
 
-def _gh_api_get(url_abspath: str) -> ApiResponse:
+def _gh_headers() -> dict[str, str]:
     headers: dict[str, str] = {
         'Accept': 'application/vnd.github.v3+json',
     }
@@ -86,16 +229,55 @@ def _gh_api_get(url_abspath: str) -> ApiResponse:
     gh_token = os.environ.get('GH_TOKEN')
     if gh_token:
         headers['Authorization'] = f"Bearer {gh_token}"
+    return headers
+
+def _gh_send(request: Request) -> ApiResponse:
+    req_url = request.full_url
+    attempt = 0
+    while True:
+        rate_limit_scheduler.wait()
+        api_stats.record_request()
+        try:
+            with urlopen(request) as response:
+                api_response = ApiResponse(req_url, response.status, response.reason, dict(response.headers), response.read().decode('utf-8'))
+        except HTTPError as e:
+            api_response = ApiResponse(req_url, e.code, e.reason, dict(e.headers), e.read().decode('utf-8'))
+        except Exception as e:
+            print(f"Failed to fetch '{req_url}' from GitHub API")
+            raise e
+        rate_limit_scheduler.update(api_response)
+        delay = rate_limit_scheduler.retry_delay(api_response, attempt)
+        if delay is None:
+            return api_response
+        print(f"Retrying '{req_url}' in {delay:.1f}s after HTTP/{api_response.status}: {api_response.reason}")
+        api_stats.record_retry()
+        api_stats.record_throttled(delay)
+        time.sleep(delay)
+        attempt += 1
+
+def _gh_api_get(url_abspath: str) -> ApiResponse:
+    headers = _gh_headers()
     req_url = f"https://api.github.com{url_abspath}"
-    request = Request(url=req_url, headers=headers)
-    try:
-        with urlopen(request) as response:
-            return ApiResponse(req_url, response.status, response.reason, dict(response.headers), response.read().decode('utf-8'))
-    except HTTPError as e:
-        return ApiResponse(req_url, e.code, e.reason, dict(e.headers), e.read().decode('utf-8'))
-    except Exception as e:
-        print(f"Failed to fetch '{req_url}' from GitHub API")
-        raise e
+    cache = _api_cache
+    cached = cache.lookup(req_url) if cache else None
+    if cached:
+        headers.update(cache.conditional_headers(cached))
+    response = _gh_send(Request(url=req_url, headers=headers))
+    if cache:
+        if response.status == 304 and cached:
+            # Not modified: replay the cached response. Does not count against the rate limit.
+            api_stats.record_cached()
+            cache.touch(cached)
+            return ApiResponse(req_url, cached.status, cached.reason, cached.headers, cached.body)
+        cache.store(req_url, response.status, response.reason, response.headers, response.body)
+    return response
+
+def _gh_graphql(query: str) -> ApiResponse:
+    headers = _gh_headers()
+    headers['Content-Type'] = 'application/json'
+    request = Request(url="https://api.github.com/graphql", headers=headers,
+                      data=json.dumps({"query": query}).encode('utf-8'), method="POST")
+    return _gh_send(request)
 
 def _gh_get_commit_object(owner_repo: str, sha: str) -> ApiResponse:
     sha = urllib.parse.quote(sha, safe="")
@@ -118,7 +300,403 @@ def _gh_compare(owner_repo: str, tag: str, requested_sha: str) -> ApiResponse:
     requested_sha = urllib.parse.quote(requested_sha, safe="")
     return _gh_api_get(f"/repos/{owner_repo}/compare/{requested_sha}...{tag}")
 
-def verify_actions(actions: Path | ActionsYAML | str, log_to_console: bool = True, today: date | None = None) -> ActionTagsCheckResult:
+ResolvedTags = dict[tuple[str, str], list[tuple[str, str, str | None]]]
+"""
+Maps `(owner_repo, tag)` to the Git objects of the tag as `(object type, object SHA, commit SHA)` tuples.
+The commit SHA is only set for annotated tags, an empty list means that the tag does not exist.
+"""
+
+GRAPHQL_TAGS_PER_QUERY = 50
+
+GIT_REMOTE_URL = "https://github.com/{owner_repo}.git"
+GIT_LS_REMOTE_TIMEOUT_SECONDS = 60
+
+
+def _collect_tagged_refs(actions: ActionsYAML | ActionsIndex, today: date,
+                         selected: set[str] | None = None) -> list[tuple[str, str]]:
+    """
+    Collects the `(owner_repo, tag)` pairs that `verify_actions` has to resolve, for the `selected` actions or all.
+    """
+    pairs: dict[tuple[str, str], None] = {}
+    for action_ref in as_index(actions).refs:
+        if selected is not None and action_ref.name not in selected:
+            continue
+        if action_ref.owner is None or '*' in action_ref.repo or action_ref.tag is None or not action_ref.is_sha:
+            continue
+        if action_ref.expires is not None and not action_ref.keep and action_ref.expires < today.toordinal():
+            continue
+        pairs[(f"{action_ref.owner}/{action_ref.repo}", action_ref.tag)] = None
+    return list(pairs)
+
+
+def _gh_resolve_tags(pairs: list[tuple[str, str]], tags_per_query: int = GRAPHQL_TAGS_PER_QUERY) -> ResolvedTags:
+    """
+    Resolves Git tags to the SHAs of their tag and commit objects using GitHub's GraphQL API.
+
+    Each query resolves up to `tags_per_query` tags using aliased `repository { ref(qualifiedName:) }` fields,
+    instead of one REST `matching-refs` request plus one `git/tags` request per annotated tag.
+
+    Tags that cannot be resolved, for example because the query or a repository lookup failed,
+    are not contained in the result, so the caller can fall back to the REST API for those.
+    """
+    resolved: ResolvedTags = {}
+    for start in range(0, len(pairs), tags_per_query):
+        chunk = pairs[start:start + tags_per_query]
+        tags_by_repo: dict[str, list[str]] = {}
+        for owner_repo, tag in chunk:
+            tags_by_repo.setdefault(owner_repo, []).append(tag)
+
+        aliases: dict[tuple[str, str], tuple[str, str]] = {}
+        fields: list[str] = []
+        for repo_index, (owner_repo, tags) in enumerate(tags_by_repo.items()):
+            owner, repo = owner_repo.split("/", 1)
+            tag_fields: list[str] = []
+            for tag_index, tag in enumerate(tags):
+                aliases[(f"r{repo_index}", f"t{tag_index}")] = (owner_repo, tag)
+                tag_fields.append(
+                    f"t{tag_index}: ref(qualifiedName: {json.dumps(f'refs/tags/{tag}')}) "
+                    "{ target { __typename oid ... on Tag { target { oid } } } }")
+            fields.append(f"r{repo_index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{ {' '.join(tag_fields)} }}")
+
+        response = _gh_graphql(f"query {{ {' '.join(fields)} }}")
+        if response.status != 200:
+            print(f"Failed to resolve Git tags using the GitHub GraphQL API: HTTP/{response.status}: {response.reason}\n{response.body}")
+            continue
+        response_json = json.loads(response.body)
+        data = response_json.get("data") or {}
+        failed_paths = {tuple(error.get("path") or [])[:2] for error in response_json.get("errors") or []}
+
+        for (repo_alias, tag_alias), pair in aliases.items():
+            repository = data.get(repo_alias)
+            if repository is None or (repo_alias,) in failed_paths or (repo_alias, tag_alias) in failed_paths:
+                continue
+            tag_ref = repository.get(tag_alias)
+            if tag_ref is None:
+                resolved[pair] = []
+                continue
+            target = tag_ref["target"]
+            match target["__typename"]:
+                case "Tag":
+                    resolved[pair] = [("tag", target["oid"], target["target"]["oid"])]
+                case "Commit":
+                    resolved[pair] = [("commit", target["oid"], None)]
+                case _:
+                    # Let the REST API code path report the unexpected object type
+                    pass
+    return resolved
+
+
+def _git_ls_remote_tags(remote_url: str, tags: list[str]) -> dict[str, str] | None:
+    """
+    Lists the given Git tags of a remote repository using a single `git ls-remote` call.
+
+    Returns:
+        The object SHA of each existing tag ref, and of the peeled `refs/tags/<tag>^{}` ref for annotated tags,
+        by ref name. None if the remote repository cannot be listed.
+    """
+    patterns: list[str] = []
+    for tag in tags:
+        patterns += [f"refs/tags/{tag}", f"refs/tags/{tag}^{{}}"]
+    try:
+        completed = subprocess.run(
+            ["git", "ls-remote", "--tags", remote_url, *patterns],
+            capture_output=True, text=True, timeout=GIT_LS_REMOTE_TIMEOUT_SECONDS,
+            # Fail instead of asking for credentials, GitHub asks for them for missing repositories
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"})
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Failed to list Git tags of {remote_url}: {e}")
+        return None
+    if completed.returncode != 0:
+        print(f"Failed to list Git tags of {remote_url}: {completed.stderr.strip()}")
+        return None
+    refs: dict[str, str] = {}
+    for line in completed.stdout.splitlines():
+        sha, _, ref_name = line.partition("\t")
+        refs[ref_name] = sha
+    return refs
+
+
+def _git_resolve_tags(pairs: list[tuple[str, str]], jobs: int = 1, remote_url: str | None = None) -> ResolvedTags:
+    """
+    Resolves Git tags to the SHAs of their tag and commit objects using `git ls-remote`.
+
+    Needs one `git ls-remote` call per repository, which does not count against the GitHub API rate limit,
+    instead of one REST `matching-refs` request plus one `git/tags` request per annotated tag.
+    Annotated tags are resolved to their commits using the peeled `^{}` refs.
+
+    Tags of repositories that cannot be listed are not contained in the result,
+    so the caller can fall back to the GitHub API for those.
+
+    Args:
+        pairs: The `(owner_repo, tag)` pairs to resolve
+        jobs: Number of repositories to list concurrently
+        remote_url: URL of the remote repository, `{owner_repo}` is replaced with the repository (default: GIT_REMOTE_URL)
+    """
+    if remote_url is None:
+        remote_url = GIT_REMOTE_URL
+    tags_by_repo: dict[str, list[str]] = {}
+    for owner_repo, tag in pairs:
+        tags_by_repo.setdefault(owner_repo, []).append(tag)
+
+    def resolve_repo(owner_repo: str) -> ResolvedTags:
+        tags = tags_by_repo[owner_repo]
+        refs = _git_ls_remote_tags(remote_url.format(owner_repo=owner_repo), tags)
+        if refs is None:
+            return {}
+        resolved: ResolvedTags = {}
+        for tag in tags:
+            tag_sha = refs.get(f"refs/tags/{tag}")
+            commit_sha = refs.get(f"refs/tags/{tag}^{{}}")
+            if tag_sha is None:
+                resolved[(owner_repo, tag)] = []
+            elif commit_sha is not None:
+                resolved[(owner_repo, tag)] = [("tag", tag_sha, commit_sha)]
+            else:
+                resolved[(owner_repo, tag)] = [("commit", tag_sha, None)]
+        return resolved
+
+    resolved: ResolvedTags = {}
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        for repo_resolved in executor.map(resolve_repo, tags_by_repo):
+            resolved.update(repo_resolved)
+    return resolved
+
+
+def _verify_action(name: str, action: ActionRefs, result: ActionTagsCheckResult, today: date,
+                   resolved_tags: ResolvedTags | None = None) -> bool:
+    """
+    Verifies the references of a single action from `actions.yml`, see `verify_actions`.
+
+    Args:
+        name: The action name, the key in `actions.yml`
+        action: The references for the action
+        result: Receives the log messages, failures and warnings
+        today: The current date
+        resolved_tags: Git tags already resolved by `_git_resolve_tags` or `_gh_resolve_tags`,
+            tags not in here are resolved via the REST API
+
+    Returns:
+        bool: False if a check was skipped because of an ignored GH API error
+    """
+    gh_repo_matcher = re.match(re_github_actions_repo, name)
+    if gh_repo_matcher is not None:
+        owner_repo = gh_repo_matcher.group(1)
+        result.log(f"Checking GitHub action {name} in GH repo 'https://github.com/{owner_repo}'...")
+        valid_shas_by_tag: dict[str, set[str]] = {}
+        requested_shas_by_tag: dict[str, set[str]] = {}
+        has_wildcard = False
+        has_specific_sha = False
+        has_wildcard_msg_emitted = False
+        # Flag whether to not error out on tag/SHA mismatches due to explicitly ignored GH API errors.
+        has_ignored_api_errors = False
+        for ref, details in action.items():
+            if details and 'expires_at' in details and not details.get('keep'):
+                expires_at: date = details.get('expires_at')
+                if expires_at < today:
+                    # skip expired entries
+                    result.log(f"  .. ref '{ref}' is expired, skipping")
+                    continue
+
+            # noinspection PyTypedDict
+            ignore_gh_api_errors = bool(details and 'ignore_gh_api_errors' in details and details['ignore_gh_api_errors'])
+            if ignore_gh_api_errors:
+                result.warning(f"ignore_gh_api_errors is set to true: will ignore GH API errors for action {name} ref '{ref}'", "  ..")
+
+            if ref == '*':
+                # "wildcard" SHA - what would we...
+                result.log(f"  .. detected wildcard ref")
+                if has_specific_sha and not has_wildcard_msg_emitted:
+                    result.warning(f"GitHub action {name} references a wildcard SHA but also has specific SHAs", "    ..")
+                    has_wildcard_msg_emitted = True
+                has_wildcard = True
+                continue
+            elif re.match(re_git_sha, ref):
+                result.log(f"  .. detected entry with Git SHA '{ref}'")
+                has_specific_sha = True
+                if has_wildcard and not has_wildcard_msg_emitted:
+                    result.warning(f"GitHub action {name} references a wildcard SHA but also has specific SHAs", "    ..")
+                    has_wildcard_msg_emitted = True
+
+                if not details or not 'tag' in details:
+                    result.log(f"    .. no Git tag")
+                    # https://docs.github.com/en/rest/git/commits?apiVersion=2022-11-28#get-a-commit-object
+                    response = _gh_get_commit_object(owner_repo, ref)
+                    match response.status:
+                        case 200:
+                            result.warning(f"GitHub action {name} references existing commit SHA '{ref}' but does not specify the tag name for it.", "    ..")
+                        case 404:
+                            result.failure(f"GitHub action {name} references non existing commit SHA '{ref}': HTTP/{response.status}: {response.reason}, API URL: {response.req_url}", "    ..")
+                        case _:
+                            m = f"Failed to fetch Git SHA '{ref}' from GitHub repo 'https://github.com/{owner_repo}': HTTP/{response.status}: {response.reason}, API URL: {response.req_url}\n{response.body}"
+                            if ignore_gh_api_errors:
+                                has_ignored_api_errors = True
+                                result.warning(m, "    ..")
+                            else:
+                                result.failure(m, "    ..")
+                else:
+                    tag: str = details.get('tag')
+                    result.log(f"    .. collecting Git SHAs for tag {tag}")
+
+                    if not tag in requested_shas_by_tag:
+                        requested_shas_by_tag[tag] = set()
+                    requested_shas_by_tag[tag].add(ref)
+
+                    if not tag in valid_shas_by_tag:
+                        valid_shas_by_tag[tag] = set()
+                    valid_shas_for_tag = valid_shas_by_tag[tag]
+
+                    resolved_tag = resolved_tags.get((owner_repo, tag)) if resolved_tags else None
+                    if resolved_tag is not None:
+                        # Already resolved using git ls-remote or GitHub's GraphQL API, see `_git_resolve_tags`
+                        for tag_object_type, tag_object_sha, commit_sha in resolved_tag:
+                            result.log(f"      .. GH yields {tag_object_type} SHA '{tag_object_sha}' for 'refs/tags/{tag}'")
+                            valid_shas_for_tag.add(tag_object_sha)
+                            if commit_sha:
+                                valid_shas_for_tag.add(commit_sha)
+                                result.log(f"        .. GH returns commit SHA '{commit_sha}' for previous tag SHA")
+                        continue
+
+                    # https://docs.github.com/en/rest/git/refs?apiVersion=2022-11-28#list-matching-references
+                    response = _gh_matching_tags(owner_repo, tag)
+                    match response.status:
+                        case 200:
+                            response_json = json.loads(response.body)
+                            for msg in response_json:
+                                tag_ref_map = msg
+                                if tag_ref_map["ref"] != f"refs/tags/{tag}":
+                                    result.log(f"      .. ignoring prefix-matched Git ref '{tag_ref_map['ref']}' for tag '{tag}'")
+                                    continue
+                                tag_object = tag_ref_map["object"]
+                                tag_object_type: str = tag_object["type"]
+                                tag_object_sha: str = tag_object["sha"]
+                                result.log(f"      .. GH yields {tag_object_type} SHA '{tag_object_sha}' for '{tag_ref_map['ref']}'")
+                                match tag_object_type:
+                                    case "tag":
+                                        valid_shas_for_tag.add(tag_object_sha)
+                                        # https://docs.github.com/en/rest/git/tags?apiVersion=2022-11-28#get-a-tag
+                                        response2 = _gh_get_tag(owner_repo, tag_object_sha)
+                                        match response2.status:
+                                            case 200:
+                                                tag_object_sha = json.loads(response2.body)["object"]["sha"]
+                                                valid_shas_for_tag.add(tag_object_sha)
+                                                result.log(f"        .. GH returns commit SHA '{tag_object_sha}' for previous tag SHA")
+                                            case 404:
+                                                result.log(f"        .. commit SHA '{tag_object_sha}' does not exist")
+                                            case _:
+                                                m = f"Failed to fetch details for Git tag '{tag}' from GitHub repo 'https://github.com/{owner_repo}': HTTP/{response2.status}: {response2.reason}, API URL: {response2.req_url}\n{response2.body}"
+                                                if ignore_gh_api_errors:
+                                                    has_ignored_api_errors = True
+                                                    result.warning(m, "        ..")
+                                                else:
+                                                    result.failure(m, "        ..")
+                                    case "commit":
+                                        valid_shas_for_tag.add(tag_object_sha)
+                                    case "branch":
+                                        # Practically impossible to get here, because _gh_matching_tags loads only tags
+                                        result.failure(f"Branch references mentioned for Git tag '{tag}' for GitHub action {name}", "        ..")
+                                    case _:
+                                        result.failure(f"Invalid Git object type '{tag_object['type']}' for Git tag '{tag}' in GitHub repo 'https://github.com/{owner_repo}'", "        ..")
+                        case _:
+                            m = f"Failed to fetch matching Git tags for '{tag}' from GitHub repo 'https://github.com/{owner_repo}': HTTP/{response.status}: {response.reason}, API URL: {response.req_url}\n{response.body}"
+                            if ignore_gh_api_errors:
+                                result.warning(m, "      ..")
+                                has_ignored_api_errors = True
+                            else:
+                                result.failure(m, "      ..")
+            else:
+                ignore_invalid_git_sha = details and 'ignore_invalid_git_sha' in details and details['ignore_invalid_git_sha'] == True
+                if ignore_invalid_git_sha:
+                    result.warning(f"GitHub action {name} references an invalid Git SHA but 'ignore_invalid_git_sha' is set: will ignore invalid Git SHA '{ref}'", "  ..")
+                else:
+                    result.failure(f"GitHub action {name} references an invalid Git SHA '{ref}'", "  ..")
+
+        for req_tag, req_shas in requested_shas_by_tag.items():
+            result.log(f"  .. checking tag '{req_tag}'")
+            result.log(f"    .. referenced SHAs: {req_shas}")
+            valid_shas = valid_shas_by_tag.get(req_tag)
+            result.log(f"    .. verified SHAs: {valid_shas if len(valid_shas)>0 else '(none)'}")
+            if not valid_shas:
+                # No tag refs found for req_tag. Maybe req_tag is a branch.
+                result.log(f"    .. checking branch '{req_tag}'")
+                on_branch = False
+                any_on_branch = False
+                branch_check_failed = False
+                branch_resp = _gh_get_branch(owner_repo, req_tag)
+                ignore_gh_api_errors = False
+                for req_sha in req_shas:
+                    details = action.get(req_sha)
+                    if bool(details and 'ignore_gh_api_errors' in details and details['ignore_gh_api_errors']):
+                        ignore_gh_api_errors = True
+                        break
+                match branch_resp.status:
+                    case 200:
+                        on_branch = True
+                        for req_sha in req_shas:
+                            result.log(f"    .. checking for commit '{req_sha}' on branch '{req_tag}'")
+                            cmp_response = _gh_compare(owner_repo, req_tag, req_sha)
+                            match cmp_response.status:
+                                case 200:
+                                    cmp_json = json.loads(cmp_response.body)
+                                    on_branch = True
+
+                                    if cmp_json["merge_base_commit"]["sha"] == req_sha:
+                                        # branch exists and contains requested SHA: accept
+                                        any_on_branch = True
+                                        m = f"GitHub action {name} references Git tag '{req_tag}' via SHAs '{req_shas}' but that references a Git branch"
+                                        result.warning(m, "")
+                                        break
+                                case 404:
+                                    pass
+                                case _:
+                                    m = f"Failed to find Git SHA '{req_sha}' on Git branch '{req_tag}' in GitHub repo 'https://github.com/{owner_repo}': HTTP/{cmp_response.status}: {cmp_response.reason}, API URL: {cmp_response.req_url}\n{cmp_response.body}"
+                                    if ignore_gh_api_errors:
+                                        result.warning(m, "      ..")
+                                        has_ignored_api_errors = True
+                                    else:
+                                        result.failure(m, "      ..")
+                                    branch_check_failed = True
+                    case 404:
+                        pass
+                    case _:
+                        m = f"Failed to check Git branch '{req_tag}' against GitHub repo 'https://github.com/{owner_repo}': HTTP/{branch_resp.status}: {branch_resp.reason}, API URL: {branch_resp.req_url}\n{branch_resp.body}"
+                        if ignore_gh_api_errors:
+                            result.warning(m, "      ..")
+                            has_ignored_api_errors = True
+                        else:
+                            result.failure(m, "      ..")
+                        branch_check_failed = True
+                if not branch_check_failed and (not on_branch or not any_on_branch):
+                    if on_branch:
+                        m = f"GitHub action {name} references Git branch '{req_tag}' via SHAs '{req_shas}' but none of those SHAs are ancestors of that branch"
+                    else:
+                        m = f"GitHub action {name} references Git tag '{req_tag}' via SHAs '{req_shas}' but no SHAs for tag could be found - does the Git tag exist?"
+                    if has_ignored_api_errors:
+                        result.warning(m, "")
+                    else:
+                        result.failure(m, "")
+            elif req_shas.isdisjoint(valid_shas):
+                m = f"GitHub action {name} references Git tag '{req_tag}' via SHAs '{req_shas}' but none of those matches the valid SHAs '{valid_shas}'"
+                result.failure(m, "")
+            else:
+                result.log(f"  ✅ GitHub action {name} definition for tag '{req_tag}' is good!")
+
+        return not has_ignored_api_errors
+
+    elif re.match(re_github_actions_repo_wildcard, name):
+        result.warning(f"Ignoring '{name}' because it uses a GitHub repository wildcard ...", "")
+
+    elif re.match(re_docker_image, name):
+        result.warning(f"Ignoring '{name}' because it references a Docker image ...", "")
+
+    else:
+        m = f"Cannot determine action kind for '{name}'"
+        result.failure(m, "")
+
+    return True
+
+def verify_actions(actions: Path | ActionsYAML | ActionsIndex | str, log_to_console: bool = True, today: date | None = None, jobs: int = 1,
+                   graphql: bool = False, ledger: VerificationLedger | None = None, sample_size: int = 0,
+                   git_ls_remote: bool = False) -> ActionTagsCheckResult:
     """
     Validates the contents of the actions file against GitHub.
 
@@ -145,10 +723,28 @@ def verify_actions(actions: Path | ActionsYAML | str, log_to_console: bool = Tru
         * Add each returned SHA to the set of valid-shas-by-tag.
     * For each "requested tag" verify that the sets of valid and requested shas intersect. If not, emit an error.
 
+    With `jobs` > 1, the actions are verified concurrently by a pool of worker threads.
+    The log messages of each action are buffered and emitted in the order of `actions.yml`.
+
+    With `graphql`, all tags are resolved upfront in batches using GitHub's GraphQL API,
+    which needs a few queries instead of one or two REST API requests per tag.
+    With `git_ls_remote`, all tags are resolved upfront using one `git ls-remote` call per repository,
+    before the GraphQL API is used for the remaining tags.
+    Tags that cannot be resolved that way are still checked using the REST API.
+
+    With a `ledger`, only actions that are new, changed or failed since their last verification
+    are verified, plus the `sample_size` unchanged actions that were verified longest ago.
+    The results are recorded in the ledger, the caller is responsible for saving it.
+
     Args:
         actions: Path to the actions list file (mandatory)
         log_to_console: Whether to log messages immediately to the console (default: True)
         today: The current date (default: today)
+        jobs: Number of actions to verify concurrently (default: 1)
+        graphql: Whether to resolve the Git tags using the GraphQL API (default: False)
+        git_ls_remote: Whether to resolve the Git tags using `git ls-remote` (default: False)
+        ledger: Verify incrementally using this ledger (default: verify all actions)
+        sample_size: Number of unchanged actions to verify again when using a ledger (default: 0)
     """
     if today is None:
         today = date.today()
@@ -160,229 +756,82 @@ def verify_actions(actions: Path | ActionsYAML | str, log_to_console: bool = Tru
             raise Exception("GH_TOKEN environment variable is not set or empty")
 
     if isinstance(actions, Path) or isinstance(actions, str):
-        actions = load_yaml(actions)
-    actions_yaml: ActionsYAML = actions
+        actions = ActionsIndex.load(actions)
+    actions_yaml = as_index(actions)
 
     result = ActionTagsCheckResult(log_to_console=log_to_console or on_gha())
 
-    for name, action in actions_yaml.items():
-        gh_repo_matcher = re.match(re_github_actions_repo, name)
-        if gh_repo_matcher is not None:
-            owner_repo = gh_repo_matcher.group(1)
-            result.log(f"Checking GitHub action {name} in GH repo 'https://github.com/{owner_repo}'...")
-            valid_shas_by_tag: dict[str, set[str]] = {}
-            requested_shas_by_tag: dict[str, set[str]] = {}
-            has_wildcard = False
-            has_specific_sha = False
-            has_wildcard_msg_emitted = False
-            # Flag whether to not error out on tag/SHA mismatches due to explicitly ignored GH API errors.
-            has_ignored_api_errors = False
-            for ref, details in action.items():
-                if details and 'expires_at' in details and not details.get('keep'):
-                    expires_at: date = details.get('expires_at')
-                    if expires_at < today:
-                        # skip expired entries
-                        result.log(f"  .. ref '{ref}' is expired, skipping")
-                        continue
-
-                # noinspection PyTypedDict
-                ignore_gh_api_errors = bool(details and 'ignore_gh_api_errors' in details and details['ignore_gh_api_errors'])
-                if ignore_gh_api_errors:
-                    result.warning(f"ignore_gh_api_errors is set to true: will ignore GH API errors for action {name} ref '{ref}'", "  ..")
-
-                if ref == '*':
-                    # "wildcard" SHA - what would we...
-                    result.log(f"  .. detected wildcard ref")
-                    if has_specific_sha and not has_wildcard_msg_emitted:
-                        result.warning(f"GitHub action {name} references a wildcard SHA but also has specific SHAs", "    ..")
-                        has_wildcard_msg_emitted = True
-                    has_wildcard = True
-                    continue
-                elif re.match(re_git_sha, ref):
-                    result.log(f"  .. detected entry with Git SHA '{ref}'")
-                    has_specific_sha = True
-                    if has_wildcard and not has_wildcard_msg_emitted:
-                        result.warning(f"GitHub action {name} references a wildcard SHA but also has specific SHAs", "    ..")
-                        has_wildcard_msg_emitted = True
-
-                    if not details or not 'tag' in details:
-                        result.log(f"    .. no Git tag")
-                        # https://docs.github.com/en/rest/git/commits?apiVersion=2022-11-28#get-a-commit-object
-                        response = _gh_get_commit_object(owner_repo, ref)
-                        match response.status:
-                            case 200:
-                                result.warning(f"GitHub action {name} references existing commit SHA '{ref}' but does not specify the tag name for it.", "    ..")
-                            case 404:
-                                result.failure(f"GitHub action {name} references non existing commit SHA '{ref}': HTTP/{response.status}: {response.reason}, API URL: {response.req_url}", "    ..")
-                            case _:
-                                m = f"Failed to fetch Git SHA '{ref}' from GitHub repo 'https://github.com/{owner_repo}': HTTP/{response.status}: {response.reason}, API URL: {response.req_url}\n{response.body}"
-                                if ignore_gh_api_errors:
-                                    has_ignored_api_errors = True
-                                    result.warning(m, "    ..")
-                                else:
-                                    result.failure(m, "    ..")
-                    else:
-                        tag: str = details.get('tag')
-                        result.log(f"    .. collecting Git SHAs for tag {tag}")
-
-                        if not tag in requested_shas_by_tag:
-                            requested_shas_by_tag[tag] = set()
-                        requested_shas_by_tag[tag].add(ref)
-
-                        if not tag in valid_shas_by_tag:
-                            valid_shas_by_tag[tag] = set()
-                        valid_shas_for_tag = valid_shas_by_tag[tag]
-
-                        # https://docs.github.com/en/rest/git/refs?apiVersion=2022-11-28#list-matching-references
-                        response = _gh_matching_tags(owner_repo, tag)
-                        match response.status:
-                            case 200:
-                                response_json = json.loads(response.body)
-                                for msg in response_json:
-                                    tag_ref_map = msg
-                                    if tag_ref_map["ref"] != f"refs/tags/{tag}":
-                                        result.log(f"      .. ignoring prefix-matched Git ref '{tag_ref_map['ref']}' for tag '{tag}'")
-                                        continue
-                                    tag_object = tag_ref_map["object"]
-                                    tag_object_type: str = tag_object["type"]
-                                    tag_object_sha: str = tag_object["sha"]
-                                    result.log(f"      .. GH yields {tag_object_type} SHA '{tag_object_sha}' for '{tag_ref_map['ref']}'")
-                                    match tag_object_type:
-                                        case "tag":
-                                            valid_shas_for_tag.add(tag_object_sha)
-                                            # https://docs.github.com/en/rest/git/tags?apiVersion=2022-11-28#get-a-tag
-                                            response2 = _gh_get_tag(owner_repo, tag_object_sha)
-                                            match response2.status:
-                                                case 200:
-                                                    tag_object_sha = json.loads(response2.body)["object"]["sha"]
-                                                    valid_shas_for_tag.add(tag_object_sha)
-                                                    result.log(f"        .. GH returns commit SHA '{tag_object_sha}' for previous tag SHA")
-                                                case 404:
-                                                    result.log(f"        .. commit SHA '{tag_object_sha}' does not exist")
-                                                case _:
-                                                    m = f"Failed to fetch details for Git tag '{tag}' from GitHub repo 'https://github.com/{owner_repo}': HTTP/{response2.status}: {response2.reason}, API URL: {response2.req_url}\n{response2.body}"
-                                                    if ignore_gh_api_errors:
-                                                        has_ignored_api_errors = True
-                                                        result.warning(m, "        ..")
-                                                    else:
-                                                        result.failure(m, "        ..")
-                                        case "commit":
-                                            valid_shas_for_tag.add(tag_object_sha)
-                                        case "branch":
-                                            # Practically impossible to get here, because _gh_matching_tags loads only tags
-                                            result.failure(f"Branch references mentioned for Git tag '{tag}' for GitHub action {name}", "        ..")
-                                        case _:
-                                            result.failure(f"Invalid Git object type '{tag_object['type']}' for Git tag '{tag}' in GitHub repo 'https://github.com/{owner_repo}'", "        ..")
-                            case _:
-                                m = f"Failed to fetch matching Git tags for '{tag}' from GitHub repo 'https://github.com/{owner_repo}': HTTP/{response.status}: {response.reason}, API URL: {response.req_url}\n{response.body}"
-                                if ignore_gh_api_errors:
-                                    result.warning(m, "      ..")
-                                    has_ignored_api_errors = True
-                                else:
-                                    result.failure(m, "      ..")
-                else:
-                    ignore_invalid_git_sha = details and 'ignore_invalid_git_sha' in details and details['ignore_invalid_git_sha'] == True
-                    if ignore_invalid_git_sha:
-                        result.warning(f"GitHub action {name} references an invalid Git SHA but 'ignore_invalid_git_sha' is set: will ignore invalid Git SHA '{ref}'", "  ..")
-                    else:
-                        result.failure(f"GitHub action {name} references an invalid Git SHA '{ref}'", "  ..")
-
-            for req_tag, req_shas in requested_shas_by_tag.items():
-                result.log(f"  .. checking tag '{req_tag}'")
-                result.log(f"    .. referenced SHAs: {req_shas}")
-                valid_shas = valid_shas_by_tag.get(req_tag)
-                result.log(f"    .. verified SHAs: {valid_shas if len(valid_shas)>0 else '(none)'}")
-                if not valid_shas:
-                    # No tag refs found for req_tag. Maybe req_tag is a branch.
-                    result.log(f"    .. checking branch '{req_tag}'")
-                    on_branch = False
-                    any_on_branch = False
-                    branch_check_failed = False
-                    branch_resp = _gh_get_branch(owner_repo, req_tag)
-                    ignore_gh_api_errors = False
-                    for req_sha in req_shas:
-                        details = action.get(req_sha)
-                        if bool(details and 'ignore_gh_api_errors' in details and details['ignore_gh_api_errors']):
-                            ignore_gh_api_errors = True
-                            break
-                    match branch_resp.status:
-                        case 200:
-                            on_branch = True
-                            for req_sha in req_shas:
-                                result.log(f"    .. checking for commit '{req_sha}' on branch '{req_tag}'")
-                                cmp_response = _gh_compare(owner_repo, req_tag, req_sha)
-                                match cmp_response.status:
-                                    case 200:
-                                        cmp_json = json.loads(cmp_response.body)
-                                        on_branch = True
-
-                                        if cmp_json["merge_base_commit"]["sha"] == req_sha:
-                                            # branch exists and contains requested SHA: accept
-                                            any_on_branch = True
-                                            m = f"GitHub action {name} references Git tag '{req_tag}' via SHAs '{req_shas}' but that references a Git branch"
-                                            result.warning(m, "")
-                                            break
-                                    case 404:
-                                        pass
-                                    case _:
-                                        m = f"Failed to find Git SHA '{req_sha}' on Git branch '{req_tag}' in GitHub repo 'https://github.com/{owner_repo}': HTTP/{cmp_response.status}: {cmp_response.reason}, API URL: {cmp_response.req_url}\n{cmp_response.body}"
-                                        if ignore_gh_api_errors:
-                                            result.warning(m, "      ..")
-                                            has_ignored_api_errors = True
-                                        else:
-                                            result.failure(m, "      ..")
-                                        branch_check_failed = True
-                        case 404:
-                            pass
-                        case _:
-                            m = f"Failed to check Git branch '{req_tag}' against GitHub repo 'https://github.com/{owner_repo}': HTTP/{branch_resp.status}: {branch_resp.reason}, API URL: {branch_resp.req_url}\n{branch_resp.body}"
-                            if ignore_gh_api_errors:
-                                result.warning(m, "      ..")
-                                has_ignored_api_errors = True
-                            else:
-                                result.failure(m, "      ..")
-                            branch_check_failed = True
-                    if not branch_check_failed and (not on_branch or not any_on_branch):
-                        if on_branch:
-                            m = f"GitHub action {name} references Git branch '{req_tag}' via SHAs '{req_shas}' but none of those SHAs are ancestors of that branch"
-                        else:
-                            m = f"GitHub action {name} references Git tag '{req_tag}' via SHAs '{req_shas}' but no SHAs for tag could be found - does the Git tag exist?"
-                        if has_ignored_api_errors:
-                            result.warning(m, "")
-                        else:
-                            result.failure(m, "")
-                elif req_shas.isdisjoint(valid_shas):
-                    m = f"GitHub action {name} references Git tag '{req_tag}' via SHAs '{req_shas}' but none of those matches the valid SHAs '{valid_shas}'"
-                    result.failure(m, "")
-                else:
-                    result.log(f"  ✅ GitHub action {name} definition for tag '{req_tag}' is good!")
-
-        elif re.match(re_github_actions_repo_wildcard, name):
-            result.warning(f"Ignoring '{name}' because it uses a GitHub repository wildcard ...", "")
-
-        elif re.match(re_docker_image, name):
-            result.warning(f"Ignoring '{name}' because it references a Docker image ...", "")
-
-        else:
-            m = f"Cannot determine action kind for '{name}'"
-            result.failure(m, "")
+    started = time.monotonic()
+    counters_before = api_stats.counters()
+
+    selected = set(actions_yaml)
+    if ledger is not None:
+        selected = ledger.select(actions_yaml, today, sample_size)
+        result.log(f"Verifying {len(selected)} of {len(actions_yaml)} actions: new, changed, previously failed or sampled")
+
+    resolved_tags: ResolvedTags | None = None
+    if git_ls_remote or graphql:
+        pairs = _collect_tagged_refs(actions_yaml, today, selected)
+        resolved_tags = {}
+        if git_ls_remote:
+            resolved_tags.update(_git_resolve_tags(pairs, jobs))
+            result.log(f"Resolved {len(resolved_tags)} of {len(pairs)} Git tags using git ls-remote")
+        if graphql:
+            remaining = [pair for pair in pairs if pair not in resolved_tags]
+            resolved_by_graphql = _gh_resolve_tags(remaining)
+            resolved_tags.update(resolved_by_graphql)
+            result.log(f"Resolved {len(resolved_by_graphql)} of {len(remaining)} Git tags using the GitHub GraphQL API")
+
+    def verify_selected(name: str, action: ActionRefs, action_result: ActionTagsCheckResult) -> None:
+        if name not in selected:
+            action_result.log(f"Skipping GitHub action {name}, unchanged since verified on {ledger.verified_at(name)}")
+            return
+        failures_before = len(action_result.failures)
+        checked = _verify_action(name, action, action_result, today, resolved_tags)
+        if ledger is not None:
+            # An action with ignored GH API errors was not fully checked, verify it again next time
+            ledger.record(name, action, today, ok=checked and len(action_result.failures) == failures_before)
+
+    if jobs <= 1:
+        for name, action in actions_yaml.items():
+            verify_selected(name, action, result)
+    else:
+        # Each action gets its own result, so the log of one action is not interleaved
+        # with the logs of the others. The results are merged in the order of `actions.yml`.
+        def verify_one(item: tuple[str, ActionRefs]) -> ActionTagsCheckResult:
+            action_result = ActionTagsCheckResult(log_to_console=False)
+            verify_selected(item[0], item[1], action_result)
+            return action_result
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            for action_result in executor.map(verify_one, actions_yaml.items()):
+                result.merge(action_result)
+
+    elapsed = time.monotonic() - started
+    api_usage = {key: value - counters_before[key] for key, value in api_stats.counters().items()}
+    result.log(f"Verified {len(selected)} actions in {elapsed:.1f}s using {api_usage['requests']} GitHub API requests,"
+               f" {api_usage['cached']} not modified since cached ({jobs} jobs)")
 
     if on_gha():
-        if result.has_failures() or result.has_warnings():
-            with open(os.environ["GITHUB_STEP_SUMMARY"], "a") as f:
-                f.write(f"# GitHub Actions verification result\n")
-                if len(result.failures) > 0:
-                    f.write(f"## Failures ({len(result.failures)})\n")
-                    f.write('```\n')
-                    for msg in result.failures:
-                        f.write(f"{msg}\n\n")
-                    f.write('```\n')
-                if len(result.warnings) > 0:
-                    f.write(f"## Warnings ({len(result.warnings)})\n")
-                    f.write('```\n')
-                    for msg in result.warnings:
-                        f.write(f"{msg}\n\n")
-                    f.write('```\n')
+        with open(os.environ["GITHUB_STEP_SUMMARY"], "a") as f:
+            f.write(f"# GitHub Actions verification result\n")
+            if len(result.failures) > 0:
+                f.write(f"## Failures ({len(result.failures)})\n")
+                f.write('```\n')
+                for msg in result.failures:
+                    f.write(f"{msg}\n\n")
+                f.write('```\n')
+            if len(result.warnings) > 0:
+                f.write(f"## Warnings ({len(result.warnings)})\n")
+                f.write('```\n')
+                for msg in result.warnings:
+                    f.write(f"{msg}\n\n")
+                f.write('```\n')
+            f.write(f"## GitHub API usage\n")
+            f.write("| Requests | Retried | Not modified (cached) | Throttled |\n")
+            f.write("|---:|---:|---:|---:|\n")
+            f.write(f"| {api_usage['requests']} | {api_usage['retried']} | {api_usage['cached']} | {api_usage['throttled_seconds']:.1f}s |\n")
+            if result.has_failures() or result.has_warnings():
                 f.write(f"## Log\n")
                 f.write('```\n')
                 for msg in result.logs:
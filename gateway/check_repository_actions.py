@@ -24,7 +24,6 @@
 # ]
 # ///
 
-import fnmatch
 import os
 import re
 import sys
@@ -33,12 +32,20 @@ from pathlib import Path
 
 from gateway import load_yaml, on_gha
 
+# The allowlist matcher is shared with allowlist-check/check_asf_allowlist.py
+sys.path.append(str(Path(__file__).resolve().parent.parent / "allowlist-check"))
+from allowlist_matcher import AllowlistMatcher
+
 re_action = r"^([A-Za-z0-9-_.]+/[A-Za-z0-9-_.]+)(/.+)?(@(.+))?$"
 re_local_file = r"^[.]/.+"
 
 re_docker_sha = r"^docker://[A-Za-z0-9-_.]+/[A-Za-z0-9-_.]+@sha256:[0-9a-f]{64}$"
 re_action_hash = r"^([A-Za-z0-9-_.]+/[A-Za-z0-9-_.]+)(/.+)?@[0-9a-f]{40}$"
 
+_re_action = re.compile(re_action)
+_re_docker_sha = re.compile(re_docker_sha)
+_re_action_hash = re.compile(re_action_hash)
+
 def _iter_uses_nodes(node: dict, yaml_path: str = ""):
     """
     Walk the entire YAML structure (dicts/lists/scalars) and yield every value
@@ -100,6 +107,7 @@ def check_project_actions(repository: str | os.PathLike, approved_patterns_file:
     print(f"There are {len(approved_patterns)} entries in the approved patterns file {approved_patterns_file}:")
     for p in sorted(approved_patterns):
         print(f"- {p}")
+    matcher = AllowlistMatcher(approved_patterns)
 
     print(f"Found {len(yaml_files)} workflow or action YAML file(s) under {github_dir}:")
     failures: list[str] = []
@@ -110,8 +118,7 @@ def check_project_actions(repository: str | os.PathLike, approved_patterns_file:
         yaml = load_yaml(p)
         uses_entries = list(_iter_uses_nodes(yaml))
         for yaml_path, uses_value in uses_entries:
-            matcher = re.match(re_action, uses_value)
-            if matcher is not None:
+            if _re_action.match(uses_value) is not None:
                 print(f"  {yaml_path}: {uses_value}")
 
                 if uses_value.startswith("./"):
@@ -130,29 +137,20 @@ def check_project_actions(repository: str | os.PathLike, approved_patterns_file:
                     # These should actually be failures, not warnings according to
                     # the Apache Infrastructure GitHub Actions Policy.
                     if uses_value.startswith("docker:"):
-                        if not re.match(re_docker_sha, uses_value):
+                        if not _re_docker_sha.match(uses_value):
                             warnings.append(f"⚠️ Mandatory SHA256 digest missing for Docker action reference: {uses_value}")
                             print("    ️⚠️  Mandatory SHA256 digest missing")
-                    elif not re.match(re_action_hash, uses_value):
+                    elif not _re_action_hash.match(uses_value):
                         warnings.append(f"⚠️ Mandatory Git Commit ID missing for action reference: {uses_value}")
                         print("    ️⚠️  Mandatory Git Commit ID digest missing")
 
-                    approved = False
-                    blocked = False
-                    for pattern in approved_patterns:
-                        blocked = pattern.startswith("!")
-                        if blocked:
-                            pattern = pattern[1:]
-                        matches = fnmatch.fnmatch(uses_value, pattern)
-                        if matches:
-                            if blocked:
-                                approved = False
-                                break
-                            approved = True
+                    # A matching '!' entry blocks the action, even if another entry approves it.
+                    blocked = matcher.blocked_by(uses_value)
+                    approved = matcher.match(uses_value)
                     if approved:
-                        print(f"    ✅ Approved pattern")
+                        print(f"    ✅ Approved pattern {approved}")
                     elif blocked:
-                        print(f"    ❌ Action is explicitly blocked")
+                        print(f"    ❌ Action is explicitly blocked by {blocked}")
                         failures.append(f"❌ {relative_path} {yaml_path}: '{uses_value}' is explicitly blocked")
                     else:
                         print(f"    ❌ Not approved")
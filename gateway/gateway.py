@@ -23,8 +23,14 @@
 # ]
 # ///
 
+import argparse
+import bisect
 import os
 import re
+import sys
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
 from datetime import date, timedelta
 from io import StringIO
 from pathlib import Path
@@ -32,6 +38,16 @@ from typing import Dict, NotRequired, TypedDict
 
 import ruyaml
 
+# The allowlist snapshot is read by allowlist-check/check_asf_allowlist.py
+sys.path.append(str(Path(__file__).resolve().parent.parent / "allowlist-check"))
+from allowlist_snapshot import (
+    ExpiryCalendar,
+    load_snapshot,
+    snapshot_matches,
+    snapshot_path,
+    write_snapshot,
+)
+
 class RefDetails(TypedDict):
     """
     Type definition for reference details of GitHub Actions for actions.yml
@@ -62,6 +78,156 @@ ActionRefs = Dict[str, RefDetails]
 ActionsYAML = Dict[str, ActionRefs]
 """Dictionary mapping action names to their reference details"""
 
+re_action_name = re.compile(r"^([A-Za-z0-9-_.]+)/([A-Za-z0-9-_.*]+)(?:/(.+))?$")
+re_sha_ref = re.compile(r"^[a-f0-9]{7,}$")
+
+
+@dataclass(slots=True)
+class ActionRef:
+    """
+    A single reference of an action in actions.yml, with the fields derived from it.
+
+    Attributes:
+        name: The action name, e.g. 'owner/repo/sub/path'
+        ref: The reference, a Git SHA, a tag or '*'
+        details: The reference details in the underlying actions.yml structure
+        owner: The GitHub owner, None for Docker images and other non-GitHub names
+        repo: The GitHub repository, '*' for a wildcard repository
+        sub_path: The path of the action in the repository, if any
+        is_sha: Whether the reference looks like a Git SHA
+        expires: The ``expires_at`` date as an ordinal (see date.toordinal), if any
+        keep: Whether the reference is kept regardless of its expiry
+        tag: The Git tag of the reference, if any
+        updatable: Whether dependabot may update the reference through the composite action
+    """
+
+    name: str
+    ref: str
+    details: RefDetails | None
+    owner: str | None
+    repo: str | None
+    sub_path: str | None
+    is_sha: bool
+    expires: int | None
+    keep: bool
+    tag: str | None
+    updatable: bool
+
+    @classmethod
+    def create(cls, name: str, ref: str, details: RefDetails | None) -> "ActionRef":
+        match = re_action_name.match(name)
+        owner, repo, sub_path = match.groups() if match else (None, None, None)
+        expires_at = details.get("expires_at") if details else None
+        return cls(
+            name=name,
+            ref=ref,
+            details=details,
+            owner=owner,
+            repo=repo,
+            sub_path=sub_path,
+            is_sha=re_sha_ref.match(ref) is not None,
+            expires=expires_at.toordinal() if isinstance(expires_at, date) else None,
+            keep=bool(details and details.get("keep")),
+            tag=details.get("tag") if details else None,
+            updatable=len(ref) >= 40 and (not details or ("keep" not in details and "expires_at" not in details)),
+        )
+
+    def is_expired(self, today: date) -> bool:
+        """
+        Whether the reference has to be removed, i.e. it expires on or before ``today`` and is not kept.
+        """
+        return self.expires is not None and not self.keep and self.expires <= today.toordinal()
+
+
+class ActionsIndex(Mapping):
+    """
+    Index over the references in actions.yml.
+
+    The index is a read-only mapping over the underlying actions.yml structure, so it can be used
+    wherever ActionsYAML is read. That structure is kept, and modified by ``remove``,
+    so writing it back keeps the comments of actions.yml.
+
+    Attributes:
+        actions: The underlying actions.yml structure
+        refs: All references, in the order of actions.yml
+        by_name: The references of each action
+        by_owner: The references of each GitHub owner
+        by_tag: The references of each Git tag
+    """
+
+    def __init__(self, actions: ActionsYAML):
+        self.actions = actions
+        self._build()
+
+    @classmethod
+    def load(cls, path: Path) -> "ActionsIndex":
+        return cls(load_yaml(path))
+
+    def _build(self):
+        self.refs: list[ActionRef] = [
+            ActionRef.create(name, ref, details)
+            for name, refs in self.actions.items()
+            for ref, details in refs.items()
+        ]
+        self.by_name: dict[str, list[ActionRef]] = {}
+        self.by_owner: dict[str, list[ActionRef]] = {}
+        self.by_tag: dict[str, list[ActionRef]] = {}
+        for action_ref in self.refs:
+            self.by_name.setdefault(action_ref.name, []).append(action_ref)
+            if action_ref.owner is not None:
+                self.by_owner.setdefault(action_ref.owner, []).append(action_ref)
+            if action_ref.tag is not None:
+                self.by_tag.setdefault(action_ref.tag, []).append(action_ref)
+        # Actions without refs
+        for name in self.actions:
+            self.by_name.setdefault(name, [])
+        self._by_expiry: list[ActionRef] = sorted(
+            (action_ref for action_ref in self.refs if action_ref.expires is not None),
+            key=lambda action_ref: action_ref.expires,
+        )
+
+    def expiring_until(self, day: date) -> list[ActionRef]:
+        """
+        Returns the references with an expiry date on or before ``day``, soonest first, including kept ones.
+        """
+        end = bisect.bisect_right(self._by_expiry, day.toordinal(), key=lambda action_ref: action_ref.expires)
+        return self._by_expiry[:end]
+
+    def expired(self, today: date) -> list[ActionRef]:
+        """
+        Returns the references that have to be removed, see ActionRef.is_expired.
+        """
+        return [action_ref for action_ref in self.expiring_until(today) if not action_ref.keep]
+
+    def remove(self, action_refs: Iterable[ActionRef]):
+        """
+        Removes references from the underlying actions.yml structure, and actions left without references.
+        """
+        for action_ref in action_refs:
+            del self.actions[action_ref.name][action_ref.ref]
+
+            # remove Actions without refs
+            if not self.actions[action_ref.name]:
+                del self.actions[action_ref.name]
+        self._build()
+
+    def __getitem__(self, name: str) -> ActionRefs:
+        return self.actions[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.actions)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+
+def as_index(actions: "ActionsYAML | ActionsIndex") -> ActionsIndex:
+    """
+    Returns ``actions`` if it is an ActionsIndex, otherwise an ActionsIndex over it.
+    """
+    return actions if isinstance(actions, ActionsIndex) else ActionsIndex(actions)
+
+
 ZIZMOR_UNPINNED_TOOLS_IGNORE = "zizmor: ignore[unpinned-tools] generated sentinel step is never executed"
 ZIZMOR_UNPINNED_TOOLS_ACTIONS = {
     "1Password/load-secrets-action",
@@ -147,7 +313,7 @@ def gha_print(content: str, title: str = ""):
     print("::endgroup::")
 
 
-def generate_composite_action(actions: ActionsYAML) -> str:
+def generate_composite_action(actions: ActionsYAML | ActionsIndex) -> str:
     """
     Generate a composite GitHub action file as a string from the actions.yml dictionary.
 
@@ -201,48 +367,60 @@ runs:
   steps:
 """
     steps = []
-    for name, refs in actions.items():
-        def is_updatable(ref):
-            details = refs[ref]
-            return len(ref) >= 40 and (
-                    not details or (
-                        not "keep" in details and
-                        not "expires_at" in details))
-
-        ref_to_update = list(filter(is_updatable, refs))
-
-        if len(ref_to_update) > 1:
-            raise ValueError(f"multiple candidates for auto-updates for {name}")
-        elif len(ref_to_update) == 1:
-            ref = ref_to_update[0]
-            details = refs[ref]
-            tag_comment = f"  # {details['tag']}" if details and 'tag' in details else ''
-            steps.append(f"    - uses: {name}@{ref}{tag_comment}")
-            # The zizmor `unpinned-tools` ignore is emitted on the `if: false`
-            # line -- within the sentinel step's finding span, per
-            # https://docs.zizmor.sh/usage/#ignoring-results -- rather than on
-            # the `uses:` line. That keeps the version tag as the trailing token
-            # of the `uses:` comment, so Dependabot's comment-updater keeps
-            # `# <tag>` in sync when it bumps the hash (it skips comments with
-            # text after the version). See #952.
-            if_comment = (
-                f"  # {ZIZMOR_UNPINNED_TOOLS_IGNORE}"
-                if name in ZIZMOR_UNPINNED_TOOLS_ACTIONS
-                else ''
-            )
-            steps.append(f"      if: false{if_comment}")
-            # zizmor's `unpinned-tools` audit flags certain actions whose
-            # default behavior is to install the "latest" version of an
-            # external tool. The remediation is to set `with.version` to
-            # a specific value. These steps never execute (`if: false`);
-            # the value is cosmetic, only here so the static analyser is
-            # satisfied. See https://docs.zizmor.sh/audits/#unpinned-tools
-            pin = _unpinned_tool_version_pin(name)
-            if pin is not None:
-                steps.append("      with:")
-                steps.append(f'        version: "{pin}"')
+    for name, refs in as_index(actions).by_name.items():
+        steps.extend(_composite_action_steps(name, refs))
 
-    return header + "\n".join(steps) + "\n" + "    - run: echo Success!\n" + "      shell: bash\n"
+    return header + "\n".join(steps) + "\n" + COMPOSITE_ACTION_FOOTER
+
+
+COMPOSITE_ACTION_FOOTER = "    - run: echo Success!\n" + "      shell: bash\n"
+
+
+def _composite_action_steps(name: str, refs: list[ActionRef]) -> list[str]:
+    """
+    Generate the lines of the composite action step for an action, see generate_composite_action.
+
+    Args:
+        name: The action name
+        refs: The references of the action
+
+    Returns:
+        list[str]: The lines of the step, none if the action has no updatable reference
+    """
+    steps = []
+    ref_to_update = [action_ref for action_ref in refs if action_ref.updatable]
+
+    if len(ref_to_update) > 1:
+        raise ValueError(f"multiple candidates for auto-updates for {name}")
+    elif len(ref_to_update) == 1:
+        ref = ref_to_update[0].ref
+        tag = ref_to_update[0].tag
+        tag_comment = f"  # {tag}" if tag is not None else ''
+        steps.append(f"    - uses: {name}@{ref}{tag_comment}")
+        # The zizmor `unpinned-tools` ignore is emitted on the `if: false`
+        # line -- within the sentinel step's finding span, per
+        # https://docs.zizmor.sh/usage/#ignoring-results -- rather than on
+        # the `uses:` line. That keeps the version tag as the trailing token
+        # of the `uses:` comment, so Dependabot's comment-updater keeps
+        # `# <tag>` in sync when it bumps the hash (it skips comments with
+        # text after the version). See #952.
+        if_comment = (
+            f"  # {ZIZMOR_UNPINNED_TOOLS_IGNORE}"
+            if name in ZIZMOR_UNPINNED_TOOLS_ACTIONS
+            else ''
+        )
+        steps.append(f"      if: false{if_comment}")
+        # zizmor's `unpinned-tools` audit flags certain actions whose
+        # default behavior is to install the "latest" version of an
+        # external tool. The remediation is to set `with.version` to
+        # a specific value. These steps never execute (`if: false`);
+        # the value is cosmetic, only here so the static analyser is
+        # satisfied. See https://docs.zizmor.sh/audits/#unpinned-tools
+        pin = _unpinned_tool_version_pin(name)
+        if pin is not None:
+            steps.append("      with:")
+            steps.append(f'        version: "{pin}"')
+    return steps
 
 
 # zizmor's `unpinned-tools` audit (zizmor source:
@@ -329,7 +507,7 @@ def update_actions(composite_action_path: Path, actions_path: Path):
     gha_print(to_yaml_string(actions), "Generated List")
     write_yaml(actions_path, actions)
 
-def create_pattern(actions: ActionsYAML) -> list[str]:
+def create_pattern(actions: ActionsYAML | ActionsIndex) -> list[str]:
     """
     Create a pattern list of valid action references.
 
@@ -339,28 +517,15 @@ def create_pattern(actions: ActionsYAML) -> list[str]:
     Returns:
         list[str]: List of action patterns (name@ref)
     """
-    pattern: list[str] = []
-
-    pattern.extend(
-        f"{name}@{ref}"
-        for name, refs in actions.items()
-        for ref, details in refs.items()
-        if (not details or "expires_at" not in details or date.today() < details["expires_at"]) or details.get("keep")
-    )
-    return pattern
+    today = date.today()
+    return [
+        f"{action_ref.name}@{action_ref.ref}"
+        for action_ref in as_index(actions).refs
+        if not action_ref.is_expired(today)
+    ]
 
 
-def update_patterns(pattern_path: Path, list_path: Path):
-    """
-    Update the patterns file based on the actions list.
-    This will overwrite the existing file, so any manual changes will be lost!
-
-    Args:
-        pattern_path: Path to write the patterns file
-        list_path: Path to the actions list file
-    """
-    actions: ActionsYAML = load_yaml(list_path)
-    patterns = create_pattern(actions)
+def _patterns_file_header(list_path: Path) -> str:
     license_header = """#
 # Licensed to the Apache Software Foundation (ASF) under one
 # or more contributor license agreements.  See the NOTICE file
@@ -383,9 +548,44 @@ def update_patterns(pattern_path: Path, list_path: Path):
     comment = f"""# This file was generated from {list_path} by gateway/gateway.py.
 # It will be regenerated and committed as part of various workflows.
 # DO NOT UPDATE MANUALLY. Update /actions.yml instead.\n"""
-    patterns_str = license_header + comment + to_yaml_string(patterns)
+    return license_header + comment
+
+
+def generate_patterns_file(patterns: list[str], list_path: Path) -> str:
+    """
+    Generate the approved patterns file as a string.
+
+    Args:
+        patterns: List of action patterns, see create_pattern
+        list_path: Path to the actions list file the patterns were created from
+
+    Returns:
+        str: Generated patterns file content
+    """
+    return _patterns_file_header(list_path) + to_yaml_string(patterns)
+
+
+def update_patterns(pattern_path: Path, list_path: Path):
+    """
+    Update the patterns file based on the actions list.
+    This will overwrite the existing file, so any manual changes will be lost!
+    Also writes the precompiled allowlist snapshot (approved_patterns.json)
+    next to the patterns file.
+
+    Args:
+        pattern_path: Path to write the patterns file
+        list_path: Path to the actions list file
+    """
+    actions: ActionsYAML = load_yaml(list_path)
+    patterns = create_pattern(actions)
+    patterns_str = generate_patterns_file(patterns, list_path)
     gha_print(patterns_str, "Generated Patterns")
     write_str(pattern_path, patterns_str)
+    with open(list_path, "rb") as file:
+        actions_content = file.read()
+    write_snapshot(
+        snapshot_path(pattern_path), patterns, patterns_str.encode(), actions, actions_content
+    )
 
 
 def update_workflow(composite_action_path: Path, list_path: Path):
@@ -403,29 +603,15 @@ def update_workflow(composite_action_path: Path, list_path: Path):
     write_str(composite_action_path, workflow)
 
 
-def remove_expired_refs(actions: ActionsYAML):
+def remove_expired_refs(actions: ActionsYAML | ActionsIndex):
     """
     Remove expired references from the actions dictionary.
 
     Args:
         actions: Dictionary of actions and their references
     """
-    refs_to_remove: list[tuple[str, str]] = []
-
-    for name, action in actions.items():
-        refs_to_remove.extend(
-            (name, ref)
-            for ref, details in action.items()
-            if details and "expires_at" in details and details["expires_at"] <= date.today() and not details.get("keep")
-        )
-
-    # Changing the iterable during iteration raises a RuntimeError
-    for name, ref in refs_to_remove:
-        del actions[name][ref]
-
-        # remove Actions without refs
-        if not actions[name]:
-            del actions[name]
+    index = as_index(actions)
+    index.remove(index.expired(date.today()))
 
 
 def clean_actions(actions_path: Path):
@@ -439,3 +625,356 @@ def clean_actions(actions_path: Path):
     remove_expired_refs(actions)
     gha_print(to_yaml_string(actions), "Cleaned Actions")
     write_yaml(actions_path, actions)
+
+
+@dataclass(slots=True)
+class ActionsDiff:
+    """
+    The references that differ between two versions of actions.yml, see diff_actions.
+
+    Attributes:
+        added: References only in the new version
+        removed: References only in the old version
+        changed: References in both versions whose expiry, keep flag, tag or updatability differ, as in the new version
+    """
+
+    added: list[ActionRef]
+    removed: list[ActionRef]
+    changed: list[ActionRef]
+
+    def names(self) -> set[str]:
+        """
+        Returns the names of the actions with added, removed or changed references.
+        """
+        return {action_ref.name for action_ref in self.added + self.removed + self.changed}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_actions(old: ActionsYAML | ActionsIndex, new: ActionsYAML | ActionsIndex) -> ActionsDiff:
+    """
+    Compare two versions of actions.yml by reference.
+
+    Only the fields the generated files depend on are compared.
+    Build the index of the old version before modifying it, as the index keeps these fields
+    while the details are shared with the underlying structure.
+
+    Args:
+        old: The previous version
+        new: The new version
+
+    Returns:
+        ActionsDiff: The added, removed and changed references
+    """
+    old_refs = {(action_ref.name, action_ref.ref): action_ref for action_ref in as_index(old).refs}
+    diff = ActionsDiff([], [], [])
+    for action_ref in as_index(new).refs:
+        old_ref = old_refs.pop((action_ref.name, action_ref.ref), None)
+        if old_ref is None:
+            diff.added.append(action_ref)
+        elif (old_ref.expires, old_ref.keep, old_ref.tag, old_ref.updatable) != (
+                action_ref.expires, action_ref.keep, action_ref.tag, action_ref.updatable):
+            diff.changed.append(action_ref)
+    diff.removed.extend(old_refs.values())
+    return diff
+
+
+def patch_patterns_file(content: str, patterns: list[str], list_path: Path) -> str | None:
+    """
+    Update a patterns file generated by generate_patterns_file with line-level edits.
+
+    The lines of patterns already in the file are kept, only the lines of new patterns are generated.
+
+    Args:
+        content: The current patterns file content
+        patterns: The new list of action patterns
+        list_path: Path to the actions list file the patterns were created from
+
+    Returns:
+        str | None: The same content as generate_patterns_file, or None if the file cannot be patched
+    """
+    header = _patterns_file_header(list_path)
+    if not patterns or not content.startswith(header):
+        return None
+    lines: dict[str, str] = {}
+    for line in content[len(header):].splitlines(keepends=True):
+        # Quoted entries and anything else ruyaml may have generated are left to it
+        if not line.startswith("- ") or line[2] in "'\"" or not line.endswith("\n"):
+            return None
+        lines[line[2:-1]] = line
+    return header + "".join(
+        lines.get(pattern) or to_yaml_string([pattern]) for pattern in patterns
+    )
+
+
+def patch_composite_action(content: str, diff: ActionsDiff, actions: ActionsIndex) -> str | None:
+    """
+    Update a composite action generated by generate_composite_action with block-level edits.
+
+    Only the steps of the actions with added, removed or changed references are generated again,
+    and inserted at the position of the action in actions.yml. This also moves a step that was
+    added to the composite action by hand to where generate_composite_action puts it.
+
+    Args:
+        content: The current composite action content, generated from the old version of actions.yml
+        diff: The differences between the old and new version of actions.yml
+        actions: The new version of actions.yml
+
+    Returns:
+        str | None: The same content as generate_composite_action, or None if the file cannot be patched
+    """
+    lines = content.splitlines(keepends=True)
+    if COMPOSITE_ACTION_FOOTER.splitlines(keepends=True)[0] not in lines:
+        return None
+
+    def find_step(name: str) -> int | None:
+        prefix = f"    - uses: {name}@"
+        return next((i for i, line in enumerate(lines) if line.startswith(prefix)), None)
+
+    names = list(actions.by_name)
+    changed_names = diff.names()
+    # Remove the steps of all changed actions first, so that the remaining steps are
+    # in the order of actions.yml and can be used to find where to insert the new ones
+    for name in changed_names:
+        start = find_step(name)
+        if start is not None:
+            end = start + 1
+            while end < len(lines) and not lines[end].startswith("    - "):
+                end += 1
+            del lines[start:end]
+    for name in [n for n in names if n in changed_names]:
+        step = [line + "\n" for line in _composite_action_steps(name, actions.by_name[name])]
+        if step:
+            # Insert before the step of the next action that has one, or before the footer
+            following = names[names.index(name) + 1:]
+            start = next(
+                (i for i in map(find_step, following) if i is not None),
+                lines.index(COMPOSITE_ACTION_FOOTER.splitlines(keepends=True)[0]),
+            )
+            lines[start:start] = step
+    return "".join(lines)
+
+
+def _read_str(path: Path) -> str | None:
+    try:
+        with open(path, "r") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """
+    Write content to a file unless the file already has exactly this content.
+
+    Args:
+        path: Path to write
+        content: The new file content
+
+    Returns:
+        bool: True if the file was written
+    """
+    try:
+        with open(path, "r") as file:
+            if file.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    write_str(path, content)
+    return True
+
+
+def sync_actions(
+    actions_path: Path,
+    pattern_path: Path,
+    composite_action_path: Path | None = None,
+    clean: bool = False,
+) -> ActionsIndex:
+    """
+    Update all files derived from the actions list in a single pass.
+
+    Parses the actions list (and the composite action) once and derives, in order:
+    the refs merged from the composite action, the expiry cleanup, the updated
+    actions list, the patterns file with its snapshot and the composite action.
+    This is equivalent to calling update_actions, clean_actions, update_workflow
+    and update_patterns, but only writes the files whose content changed.
+
+    If the snapshot shows that the patterns file was generated from the current
+    actions list, the generated files are patched according to the differences
+    between the previous and the updated actions list (see diff_actions),
+    instead of being generated from scratch. The composite action is only
+    patched if, apart from the steps of the changed actions, it is the one the
+    snapshot was written with.
+
+    Args:
+        actions_path: Path to the actions list file
+        pattern_path: Path to the patterns file
+        composite_action_path: Path to the composite action file. If None, no refs
+            are merged from it and it is not regenerated.
+        clean: Remove expired references, see remove_expired_refs
+
+    Returns:
+        ActionsIndex: The updated actions, e.g. to verify them without loading
+        the actions list again
+    """
+    timings: list[tuple[str, float]] = []
+    started = time.perf_counter()
+
+    def stage(name: str):
+        nonlocal started
+        now = time.perf_counter()
+        timings.append((name, now - started))
+        started = now
+
+    with open(actions_path, "r") as file:
+        actions_str = file.read()
+    actions: ActionsYAML = ruyaml.YAML().load(actions_str)
+    composite_action = load_yaml(composite_action_path) if composite_action_path else None
+    # The generated files can be patched if they were generated from this version of the actions list
+    in_sync = snapshot_matches(snapshot_path(pattern_path), pattern_path, actions_path)
+    stage("parse")
+
+    old_index = ActionsIndex(actions)
+    if composite_action is not None:
+        update_refs(composite_action["runs"]["steps"], actions)
+    index = ActionsIndex(actions)
+    if clean:
+        remove_expired_refs(index)
+    diff = diff_actions(old_index, index)
+    stage("update refs")
+
+    # Unchanged refs: keep the file as it is, re-serializing it would not change it
+    new_actions_str = to_yaml_string(actions) if diff or not in_sync else actions_str
+    patterns = create_pattern(index)
+    patterns_str = None
+    if in_sync:
+        patterns_str = patch_patterns_file(_read_str(pattern_path), patterns, actions_path)
+    if patterns_str is None:
+        patterns_str = generate_patterns_file(patterns, actions_path)
+    workflow = None
+    composite_in_sync = False
+    if composite_action is not None:
+        if in_sync:
+            content = _read_str(composite_action_path)
+            # Undo the edits the diff accounts for (e.g. a dependabot bump) to compare
+            # with what was generated last; anything else, like a hand edit or a step
+            # left by a failed run, means the file is generated again
+            previous = patch_composite_action(content, diff, old_index)
+            composite_in_sync = previous is not None and snapshot_matches(
+                snapshot_path(pattern_path), pattern_path, actions_path, previous.encode()
+            )
+            if composite_in_sync:
+                workflow = patch_composite_action(content, diff, index)
+        if workflow is None:
+            workflow = generate_composite_action(index)
+    stage("generate")
+
+    written = []
+    if write_if_changed(actions_path, new_actions_str):
+        gha_print(new_actions_str, "Generated List")
+        written.append(str(actions_path))
+    if write_if_changed(pattern_path, patterns_str):
+        gha_print(patterns_str, "Generated Patterns")
+        written.append(str(pattern_path))
+    if workflow is not None and write_if_changed(composite_action_path, workflow):
+        gha_print(workflow, "Generated Workflow")
+        written.append(str(composite_action_path))
+    # The snapshot records the hashes of the files, so it is rewritten whenever one changed,
+    # or when it did not match them, e.g. after a hand edit of the actions list
+    if written or not in_sync or (workflow is not None and not composite_in_sync):
+        write_snapshot(
+            snapshot_path(pattern_path), patterns, patterns_str.encode(), actions, new_actions_str.encode(),
+            None if workflow is None else workflow.encode(),
+        )
+        written.append(snapshot_path(pattern_path))
+    stage("write")
+
+    print(f"Updated {', '.join(written)}" if written else "No changes")
+    print("Timings: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings))
+    return index
+
+
+def load_expiry_calendar(actions_path: Path, pattern_path: Path) -> tuple[ExpiryCalendar, bool]:
+    """
+    Load the expiry calendar of the actions list.
+
+    The calendar is taken from the allowlist snapshot next to the patterns file if it is
+    current, otherwise it is built from the actions list.
+
+    Args:
+        actions_path: Path to the actions list file
+        pattern_path: Path to the patterns file
+
+    Returns:
+        tuple[ExpiryCalendar, bool]: The calendar, and whether it was taken from a current snapshot
+    """
+    snapshot = load_snapshot(snapshot_path(pattern_path), pattern_path, actions_path)
+    if snapshot is not None and snapshot.expiry is not None:
+        return snapshot.expiry, True
+    return ExpiryCalendar.from_actions(load_yaml(actions_path)), False
+
+
+def remove_expired(actions_path: Path, pattern_path: Path) -> bool:
+    """
+    Remove the expired references from the actions list and update the patterns file.
+
+    If the allowlist snapshot is current and its expiry calendar has no references due,
+    nothing is parsed or written.
+
+    Args:
+        actions_path: Path to the actions list file
+        pattern_path: Path to the patterns file
+
+    Returns:
+        bool: False if no references were due
+    """
+    calendar, from_snapshot = load_expiry_calendar(actions_path, pattern_path)
+    due = calendar.due(date.today())
+    if from_snapshot and not due:
+        print("No expired refs due")
+        return False
+    print(f"Removing {len(due)} expired refs")
+    sync_actions(actions_path, pattern_path, clean=True)
+    return True
+
+
+def print_expirations(actions_path: Path, pattern_path: Path, count: int):
+    """
+    Print the next expiring references of the actions list.
+
+    Args:
+        actions_path: Path to the actions list file
+        pattern_path: Path to the patterns file
+        count: Number of references to print
+    """
+    today = date.today()
+    calendar, _ = load_expiry_calendar(actions_path, pattern_path)
+    due = calendar.due(today)
+    if due:
+        print(f"{len(due)} refs are expired and will be removed on the next cleanup")
+    for expires_at, ref in calendar.upcoming(today + timedelta(days=1), count):
+        print(f"{expires_at.isoformat()}  (in {(expires_at - today).days} days)  {ref}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain actions.yml and the files generated from it")
+    parser.add_argument("--actions", type=Path, default=Path("actions.yml"),
+                        help="Path to the actions list file (default: %(default)s)")
+    parser.add_argument("--patterns", type=Path, default=Path("approved_patterns.yml"),
+                        help="Path to the patterns file (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    expirations = subparsers.add_parser("expirations", help="Print the next expiring references")
+    expirations.add_argument("-n", "--count", type=int, default=20,
+                             help="Number of references to print (default: %(default)s)")
+    subparsers.add_parser("remove-expired", help="Remove the expired references and update the patterns file")
+    args = parser.parse_args()
+
+    if args.command == "expirations":
+        print_expirations(args.actions, args.patterns, args.count)
+    elif args.command == "remove-expired":
+        remove_expired(args.actions, args.patterns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """
+    Returns the default directory for the GitHub API cache, honoring `XDG_CACHE_HOME`.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(cache_home) / "infrastructure-actions" / "gh-api"
+
+
+class CachedResponse(object):
+    def __init__(self, url: str, status: int, reason: str, headers: dict[str, str], body: str, stored_at: float):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def etag(self) -> str | None:
+        return header_value(self.headers, "ETag")
+
+    def last_modified(self) -> str | None:
+        return header_value(self.headers, "Last-Modified")
+
+
+def header_value(headers: dict[str, str], name: str) -> str | None:
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+class GhApiCache(object):
+    """
+    On-disk cache of GitHub API responses, keyed by the request URL.
+
+    Cached responses are revalidated using `If-None-Match` / `If-Modified-Since`.
+    GitHub answers with `304 Not Modified` if the resource did not change,
+    which does not count against the API rate limit.
+
+    Entries older than `ttl_seconds` are dropped and fetched again in full.
+    When the cache grows beyond `max_bytes`, the least recently used entries are evicted.
+
+    Each entry is a separate JSON file, replaced atomically, so the cache can be
+    used from multiple threads.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        """
+        Returns the cached response for `url`, or `None` if there is none or it is older than the TTL.
+        """
+        path = self._path(url)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or time.time() - entry.get("stored_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        return CachedResponse(url, entry["status"], entry["reason"], entry["headers"], entry["body"], entry["stored_at"])
+
+    def conditional_headers(self, cached: CachedResponse) -> dict[str, str]:
+        """
+        Returns the request headers to revalidate the cached response.
+        """
+        headers: dict[str, str] = {}
+        if cached.etag():
+            headers["If-None-Match"] = cached.etag()
+        if cached.last_modified():
+            headers["If-Modified-Since"] = cached.last_modified()
+        return headers
+
+    def touch(self, cached: CachedResponse) -> None:
+        """
+        Marks the entry as recently used, so it is evicted last.
+        """
+        try:
+            os.utime(self._path(cached.url))
+        except OSError:
+            pass
+
+    def store(self, url: str, status: int, reason: str, headers: dict[str, str], body: str) -> None:
+        """
+        Stores a successful response. Responses without `ETag` and `Last-Modified` cannot be revalidated and are not cached.
+        """
+        if status != 200 or (header_value(headers, "ETag") is None and header_value(headers, "Last-Modified") is None):
+            return
+        path = self._path(url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{time.monotonic_ns()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "url": url,
+                "status": status,
+                "reason": reason,
+                "headers": headers,
+                "body": body,
+                "stored_at": time.time(),
+            }, f)
+        os.replace(tmp_path, path)
+
+    def prune(self) -> None:
+        """
+        Removes expired entries, then evicts the least recently used entries until the cache fits into `max_bytes`.
+        """
+        now = time.time()
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            # The modification time is never older than the time the entry was stored,
+            # so entries whose modification time is older than the TTL are expired.
+            if now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
@@ -26,15 +26,47 @@
 #       uvx --with ruyaml python gateway/run_action_tags.py
 # Or if you're using a virtualenv:
 #       python gateway/run_action_tags.py
+# Use '--jobs N' to change the number of actions verified concurrently.
+# GitHub API responses are cached in ~/.cache/infrastructure-actions/gh-api and revalidated
+# using conditional requests, use '--no-cache' to disable the cache.
+# Git tags are resolved in batches using the GraphQL API, use '--no-graphql' to only use the REST API.
+# Use '--git-ls-remote' to resolve them with one 'git ls-remote' per repository first, which does not
+# count against the GitHub API rate limit.
+# Only actions that changed since their last successful verification are verified, plus a rolling
+# sample of the others, according to the ledger in ~/.cache/infrastructure-actions/.
+# Use '--full' to verify all actions.
 
+import argparse
+import math
 import os
 from pathlib import Path
 
-from action_tags import verify_actions
-from gateway import update_actions, update_patterns
+from action_tags import enable_api_cache, verify_actions
+from gateway import sync_actions
+from gh_api_cache import GhApiCache, default_cache_dir
+from verification_ledger import VerificationLedger
 
 
 def run_main():
+    parser = argparse.ArgumentParser(description="Verify the Git SHAs and tags in actions.yml against GitHub")
+    parser.add_argument("--jobs", type=int, default=8,
+                        help="Number of actions to verify concurrently (default: 8)")
+    parser.add_argument("--cache-dir", type=Path, default=default_cache_dir(),
+                        help="Directory for cached GitHub API responses (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not cache GitHub API responses")
+    parser.add_argument("--no-graphql", action="store_true",
+                        help="Resolve Git tags one by one using the REST API instead of in batches using the GraphQL API")
+    parser.add_argument("--git-ls-remote", action="store_true",
+                        help="Resolve Git tags using one 'git ls-remote' per repository before using the GitHub API")
+    parser.add_argument("--full", action="store_true",
+                        help="Verify all actions, not only the ones that changed since their last successful verification")
+    parser.add_argument("--ledger", type=Path, default=default_cache_dir().parent / "verify-actions-ledger.json",
+                        help="Ledger of the previous verifications (default: %(default)s)")
+    parser.add_argument("--sample-days", type=int, default=7,
+                        help="Verify unchanged actions again in a rolling sample, so that each is verified at least every N days (default: 7)")
+    args = parser.parse_args()
+
     if not 'GH_TOKEN' in os.environ:
         raise Exception("GH_TOKEN environment variable must be set.")
 
@@ -48,10 +80,21 @@ def run_main():
 
     # Keep the verification inputs in sync with the generated allowlist artifacts
     # before checking tags, matching the update workflow's behavior.
-    update_actions(dummy_workflow, actions_yaml)
-    update_patterns(approved_patterns_yaml, actions_yaml)
+    actions = sync_actions(actions_yaml, approved_patterns_yaml, dummy_workflow)
+    # With --full, start from an empty ledger: all actions are verified and recorded
+    ledger = VerificationLedger(args.ledger) if args.full else VerificationLedger.load(args.ledger)
+    sample_size = math.ceil(len(actions) / max(args.sample_days, 1))
 
-    result = verify_actions(actions_yaml)
+    cache = None if args.no_cache else GhApiCache(args.cache_dir)
+    enable_api_cache(cache)
+    try:
+        result = verify_actions(actions, jobs=args.jobs, graphql=not args.no_graphql, ledger=ledger, sample_size=sample_size,
+                                git_ls_remote=args.git_ls_remote)
+    finally:
+        enable_api_cache(None)
+        if cache:
+            cache.prune()
+    ledger.save()
     if result.has_failures():
         raise Exception(f"Verify actions result summary:\n{result}")
 
@@ -17,15 +17,22 @@
 # under the License.
 #
 
+import io
 import json
 import os
 import pytest
 import re
+import shutil
+import subprocess
+import time
 from datetime import date
 from unittest import mock
+from urllib.error import HTTPError
 
 from action_tags import (
     ApiResponse,
+    RateLimitScheduler,
+    api_stats,
     re_docker_image,
     re_git_sha,
     re_github_actions_repo,
@@ -36,6 +43,8 @@ from action_tags import (
     _gh_get_commit_object,
     _gh_get_tag,
     _gh_matching_tags,
+    _gh_resolve_tags,
+    _git_resolve_tags,
 )
 from gateway import ActionsYAML
 
@@ -755,6 +764,193 @@ def test_gh_helper_url_quoting():
         "/repos/owner/repo/compare/feature%2Fbranch...release%2Fv1",
     ]
 
+def test_concurrent_verification_matches_serial():
+    # noinspection PyTypeChecker
+    actions: ActionsYAML = {
+        "sbt/setup-sbt": {
+            "3e125ece5c3e5248e18da9ed8d2cce3d335ec8dd": {
+                "tag": "v1.1.14"
+            },
+        },
+        "dtolnay/rust-toolchain": {
+            "stable": {
+            },
+        },
+        "docker://foo/bar": {
+            "*": {
+            },
+        },
+        "other/setup-sbt": {
+            "17575ea4e18dd928fe5968dbe32294b97923d65b": {
+                "tag": "v1.1.13"
+            },
+        },
+    }
+    with mock.patch("action_tags._gh_matching_tags", side_effect=_mock_wildcard_tags):
+        serial = verify_actions(actions, log_to_console=False)
+        concurrent = verify_actions(actions, log_to_console=False, jobs=4)
+
+    # The last log line holds the timing and request stats.
+    assert concurrent.logs[:-1] == serial.logs[:-1]
+    assert concurrent.failures == serial.failures == [
+        "GitHub action dtolnay/rust-toolchain references an invalid Git SHA 'stable'"
+    ]
+    assert concurrent.warnings == serial.warnings == [
+        "Ignoring 'docker://foo/bar' because it references a Docker image ..."
+    ]
+    assert concurrent.logs[-1].startswith("Verified 4 actions in ")
+    assert concurrent.logs[-1].endswith("(4 jobs)")
+
+def test_gh_api_get_counts_requests():
+    response = mock.MagicMock(status=200, reason="OK", headers={})
+    response.read.return_value = b"{}"
+    response.__enter__.return_value = response
+    before = api_stats.requests
+    with mock.patch("action_tags.urlopen", return_value=response):
+        _gh_get_branch("owner/repo", "main")
+        _gh_get_tag("owner/repo", "deadbeef")
+
+    assert api_stats.requests - before == 2
+
+def _mock_graphql(query: str) -> ApiResponse:
+    assert 'r0: repository(owner: "sbt", name: "setup-sbt")' in query
+    assert 't0: ref(qualifiedName: "refs/tags/v1.1.13")' in query
+    assert 'r1: repository(owner: "gone", name: "repo")' in query
+    return _api_response(200, json.dumps({
+        "data": {
+            "r0": {
+                "t0": {"target": {"__typename": "Tag", "oid": "e4feb4d8a7cd938b64370099b1893e05c58c3a84",
+                                  "target": {"oid": "17575ea4e18dd928fe5968dbe32294b97923d65b"}}},
+                "t1": {"target": {"__typename": "Commit", "oid": "3e125ece5c3e5248e18da9ed8d2cce3d335ec8dd"}},
+                "t2": None,
+            },
+            "r1": None,
+        },
+        "errors": [{"type": "NOT_FOUND", "path": ["r1"]}],
+    }))
+
+def test_gh_resolve_tags():
+    with mock.patch("action_tags._gh_graphql", side_effect=_mock_graphql) as gh_graphql:
+        resolved = _gh_resolve_tags([
+            ("sbt/setup-sbt", "v1.1.13"),
+            ("sbt/setup-sbt", "v1.1.14"),
+            ("sbt/setup-sbt", "v9"),
+            ("gone/repo", "v1"),
+        ])
+
+    assert gh_graphql.call_count == 1
+    assert resolved == {
+        ("sbt/setup-sbt", "v1.1.13"): [("tag", "e4feb4d8a7cd938b64370099b1893e05c58c3a84", "17575ea4e18dd928fe5968dbe32294b97923d65b")],
+        ("sbt/setup-sbt", "v1.1.14"): [("commit", "3e125ece5c3e5248e18da9ed8d2cce3d335ec8dd", None)],
+        ("sbt/setup-sbt", "v9"): [],
+    }
+
+def test_gh_resolve_tags_batches_and_tolerates_failures():
+    pairs = [("owner/repo", f"v{i}") for i in range(5)]
+    with mock.patch("action_tags._gh_graphql", return_value=_api_response(502, reason="Bad Gateway")) as gh_graphql:
+        assert _gh_resolve_tags(pairs, tags_per_query=2) == {}
+    assert gh_graphql.call_count == 3
+
+def test_verify_actions_graphql_falls_back_to_rest():
+    with (
+        mock.patch("action_tags._gh_graphql", side_effect=_mock_graphql),
+        mock.patch("action_tags._gh_matching_tags", return_value=_commit_ref_response("v1", "0bc4621a3135347011ad047f9ecf449bf72ce2bd")) as matching_tags,
+        mock.patch("action_tags._gh_get_tag") as get_tag,
+    ):
+        # noinspection PyTypeChecker
+        result = verify_actions({
+            "sbt/setup-sbt": {
+                "17575ea4e18dd928fe5968dbe32294b97923d65b": {
+                    "tag": "v1.1.13"
+                },
+                "3e125ece5c3e5248e18da9ed8d2cce3d335ec8dd": {
+                    "tag": "v1.1.14"
+                },
+            },
+            "gone/repo": {
+                "0bc4621a3135347011ad047f9ecf449bf72ce2bd": {
+                    "tag": "v1"
+                },
+            },
+        }, graphql=True)
+
+    assert result.failures == []
+    assert result.warnings == []
+    assert "Resolved 2 of 3 Git tags using the GitHub GraphQL API" in result.logs
+    assert "        .. GH returns commit SHA '17575ea4e18dd928fe5968dbe32294b97923d65b' for previous tag SHA" in result.logs
+    # Only the tag of the repository that failed in GraphQL is resolved using the REST API
+    matching_tags.assert_called_once_with("gone/repo", "v1")
+    get_tag.assert_not_called()
+
+def _urlopen_response(body: bytes = b"{}", headers: dict[str, str] | None = None):
+    response = mock.MagicMock(status=200, reason="OK", headers=headers or {})
+    response.read.return_value = body
+    response.__enter__.return_value = response
+    return response
+
+def _http_error(status: int, headers: dict[str, str] | None = None, body: bytes = b"") -> HTTPError:
+    return HTTPError("https://api.github.test", status, "Error", headers or {}, io.BytesIO(body))
+
+def test_gh_api_get_retries_server_errors():
+    before = api_stats.counters()
+    with (
+        mock.patch("action_tags.rate_limit_scheduler", RateLimitScheduler()),
+        mock.patch("action_tags.urlopen", side_effect=[_http_error(502), _http_error(503), _urlopen_response(b'"ok"')]),
+        mock.patch("action_tags.time.sleep") as sleep,
+    ):
+        response = _gh_get_branch("owner/repo", "main")
+
+    assert response.status == 200
+    assert response.body == '"ok"'
+    assert sleep.call_count == 2
+    assert api_stats.retried - before["retried"] == 2
+    assert api_stats.requests - before["requests"] == 3
+
+def test_gh_api_get_honors_retry_after_for_secondary_rate_limits():
+    secondary = _http_error(403, {"Retry-After": "30"}, b'{"message": "You have exceeded a secondary rate limit."}')
+    with (
+        mock.patch("action_tags.rate_limit_scheduler", RateLimitScheduler()),
+        mock.patch("action_tags.urlopen", side_effect=[secondary, _urlopen_response()]),
+        mock.patch("action_tags.time.sleep") as sleep,
+    ):
+        response = _gh_get_branch("owner/repo", "main")
+
+    assert response.status == 200
+    # The scheduler also holds back the other threads until the Retry-After delay has elapsed.
+    assert sleep.call_args_list[0] == mock.call(30.0)
+
+def test_gh_api_get_does_not_retry_client_errors():
+    forbidden = _http_error(403, {}, b'{"message": "organization has an IP allow list enabled"}')
+    with (
+        mock.patch("action_tags.rate_limit_scheduler", RateLimitScheduler()),
+        mock.patch("action_tags.urlopen", side_effect=[_http_error(404), forbidden]),
+        mock.patch("action_tags.time.sleep") as sleep,
+    ):
+        assert _gh_get_branch("owner/repo", "main").status == 404
+        assert _gh_get_branch("owner/repo", "main").status == 403
+
+    sleep.assert_not_called()
+
+def test_gh_api_get_gives_up_after_max_retries():
+    with (
+        mock.patch("action_tags.rate_limit_scheduler", RateLimitScheduler(max_retries=2)),
+        mock.patch("action_tags.urlopen", side_effect=[_http_error(500)] * 3),
+        mock.patch("action_tags.time.sleep") as sleep,
+    ):
+        assert _gh_get_branch("owner/repo", "main").status == 500
+
+    assert sleep.call_count == 2
+
+def test_rate_limit_scheduler_throttles_proactively():
+    scheduler = RateLimitScheduler(min_remaining=10)
+    reset_at = int(time.time()) + 120
+    scheduler.update(ApiResponse("https://api.github.test", 200, "OK",
+                                 {"x-ratelimit-remaining": "5", "x-ratelimit-reset": str(reset_at)}, ""))
+    with mock.patch("action_tags.time.sleep") as sleep:
+        scheduler.wait()
+
+    assert 100 < sleep.call_args.args[0] <= 120
+
 def _test_wildcard_warnings(refs: ActionsYAML):
     result = verify_actions(refs, today=date(2025, 12, 21))
     assert not "  .. ref '*' is expired, skipping" in result.logs
@@ -787,3 +983,74 @@ def _tag_ref_response(tag: str, sha: str) -> ApiResponse:
 
 def _tag_object_response(sha: str) -> ApiResponse:
     return _api_response(200, f'{{"object": {{"sha": "{sha}"}}}}')
+
+
+def _git(*args: str, cwd=None) -> str:
+    env = {**os.environ, "GIT_AUTHOR_NAME": "test", "GIT_AUTHOR_EMAIL": "test@example.com",
+           "GIT_COMMITTER_NAME": "test", "GIT_COMMITTER_EMAIL": "test@example.com"}
+    return subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def bare_repo(tmp_path):
+    """
+    A local bare repository `owner/repo.git` with a lightweight tag `v1` and an annotated tag `v2`.
+    Returns the remote URL template and the SHAs of the commits and of the annotated tag.
+    """
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    work = tmp_path / "work"
+    _git("init", "-q", str(work))
+    _git("commit", "-q", "--allow-empty", "-m", "first", cwd=work)
+    _git("tag", "v1", cwd=work)
+    _git("commit", "-q", "--allow-empty", "-m", "second", cwd=work)
+    _git("tag", "-a", "v2", "-m", "Release v2", cwd=work)
+    (tmp_path / "owner").mkdir()
+    _git("clone", "-q", "--bare", str(work), str(tmp_path / "owner" / "repo.git"))
+    return (
+        f"file://{tmp_path}/{{owner_repo}}.git",
+        _git("rev-parse", "v1", cwd=work),
+        _git("rev-parse", "v2^{commit}", cwd=work),
+        _git("rev-parse", "v2", cwd=work),
+    )
+
+
+def test_git_resolve_tags(bare_repo):
+    remote_url, v1_sha, v2_commit_sha, v2_tag_sha = bare_repo
+    resolved = _git_resolve_tags([
+        ("owner/repo", "v1"),
+        ("owner/repo", "v2"),
+        ("owner/repo", "v3"),
+        ("owner/missing", "v1"),
+    ], jobs=2, remote_url=remote_url)
+
+    assert resolved == {
+        ("owner/repo", "v1"): [("commit", v1_sha, None)],
+        ("owner/repo", "v2"): [("tag", v2_tag_sha, v2_commit_sha)],
+        ("owner/repo", "v3"): [],
+    }
+
+
+def test_verify_actions_git_ls_remote(bare_repo):
+    remote_url, v1_sha, v2_commit_sha, _ = bare_repo
+    with (
+        mock.patch("action_tags.GIT_REMOTE_URL", remote_url),
+        mock.patch("action_tags._gh_matching_tags", return_value=_commit_ref_response("v1", "0bc4621a3135347011ad047f9ecf449bf72ce2bd")) as matching_tags,
+        mock.patch("action_tags._gh_get_tag") as get_tag,
+    ):
+        # noinspection PyTypeChecker
+        result = verify_actions({
+            "owner/repo": {
+                v1_sha: {"tag": "v1"},
+                v2_commit_sha: {"tag": "v2"},
+            },
+            "owner/missing": {
+                "0bc4621a3135347011ad047f9ecf449bf72ce2bd": {"tag": "v1"},
+            },
+        }, git_ls_remote=True)
+
+    assert result.failures == []
+    assert "Resolved 2 of 3 Git tags using git ls-remote" in result.logs
+    # Only the tag of the repository that could not be listed is resolved using the REST API
+    matching_tags.assert_called_once_with("owner/missing", "v1")
+    get_tag.assert_not_called()
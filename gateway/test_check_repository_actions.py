@@ -0,0 +1,62 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import pytest
+
+from check_repository_actions import check_project_actions
+
+APPROVED_SHA = "681c641aba71e4a1c380be3ab5e12ad51f415867"
+
+
+def _write_repository(tmp_path, steps: list[str]):
+    workflows = tmp_path / "repo" / ".github" / "workflows"
+    workflows.mkdir(parents=True)
+    uses = "".join(f"      - uses: {step}\n" for step in steps)
+    (workflows / "ci.yml").write_text(f"jobs:\n  build:\n    steps:\n{uses}")
+    patterns = tmp_path / "approved_patterns.yml"
+    patterns.write_text(
+        f"- astral-sh/setup-uv@{APPROVED_SHA}\n"
+        "- codecov/*@*, !codecov/codecov-action@v3\n"
+    )
+    return tmp_path / "repo", patterns
+
+def test_approved_actions(tmp_path, capsys):
+    repo, patterns = _write_repository(tmp_path, [
+        "actions/checkout@v4",
+        "./local-action",
+        f"astral-sh/setup-uv@{APPROVED_SHA}",
+        "codecov/codecov-action@v4",
+    ])
+    check_project_actions(repo, patterns)
+
+    out = capsys.readouterr().out
+    assert f"✅ Approved pattern astral-sh/setup-uv@{APPROVED_SHA}" in out
+    assert "✅ Approved pattern codecov/*@*" in out
+
+def test_blocked_and_unapproved_actions(tmp_path):
+    repo, patterns = _write_repository(tmp_path, [
+        "codecov/codecov-action@v3",
+        "astral-sh/setup-uv@v5",
+    ])
+    with pytest.raises(Exception) as exc_info:
+        check_project_actions(repo, patterns)
+
+    message = str(exc_info.value)
+    assert "'codecov/codecov-action@v3' is explicitly blocked" in message
+    assert "'astral-sh/setup-uv@v5' is not approved" in message
@@ -20,6 +20,8 @@
 import datetime
 
 import filecmp
+from unittest import mock
+
 from gateway import *
 
 def load_yaml_string(yaml_string: str):
@@ -32,11 +34,11 @@ def test_load_yaml():
     comment = parsed['jobs']['dummy']['steps'][3].ca.items['uses'][2].value
     assert comment == "# v4.6.8\n"
 
-def test_roundtrip_yaml():
+def test_roundtrip_yaml(tmp_path):
     this_dir = os.path.dirname(os.path.realpath(__file__))
     infile = this_dir + "/test_dummy.yml"
     parsed = load_yaml(infile)
-    outfile = this_dir + "/test_out_dummy.yml"
+    outfile = tmp_path / "test_out_dummy.yml"
     write_yaml(outfile, parsed)
     assert filecmp.cmp(infile, outfile, shallow=False)
 
@@ -284,3 +286,241 @@ def test_clean_actions():
 
     remove_expired_refs(refs)
     assert refs == expected_refs
+
+
+def test_update_patterns_writes_snapshot(tmp_path):
+    from allowlist_snapshot import load_snapshot
+
+    list_path = tmp_path / "actions.yml"
+    list_path.write_text(
+        "actions/setup-go:\n"
+        "  v5:\n"
+        "    expires_at: 2999-01-01\n"
+        "  '*':\n"
+        "    keep: true\n"
+    )
+    pattern_path = tmp_path / "approved_patterns.yml"
+    update_patterns(pattern_path, list_path)
+
+    snapshot = load_snapshot(tmp_path / "approved_patterns.json", pattern_path, list_path)
+    assert snapshot.matcher.patterns == ["actions/setup-go@v5", "actions/setup-go@*"]
+    assert snapshot.expiry.to_list() == [["2999-01-01", "actions/setup-go@v5", False]]
+
+
+def _sync_fixture(tmp_path):
+    repo = Path(__file__).resolve().parent.parent
+    tmp_path.mkdir(exist_ok=True)
+    composite = tmp_path / "action.yml"
+    composite.write_text((repo / ".github/actions/for-dependabot-triggered-reviews/action.yml").read_text())
+    actions = tmp_path / "actions.yml"
+    actions.write_text((repo / "actions.yml").read_text())
+    return composite, actions, tmp_path / "approved_patterns.yml"
+
+
+def test_sync_actions_matches_separate_updates(tmp_path):
+    composite, actions, patterns = _sync_fixture(tmp_path / "sync")
+    sync_actions(actions, patterns, composite, clean=True)
+
+    expected_composite, expected_actions, expected_patterns = _sync_fixture(tmp_path / "separate")
+    update_actions(expected_composite, expected_actions)
+    clean_actions(expected_actions)
+    update_workflow(expected_composite, expected_actions)
+    update_patterns(expected_patterns, expected_actions)
+
+    assert actions.read_text() == expected_actions.read_text()
+    assert patterns.read_text().replace(str(actions), "") == expected_patterns.read_text().replace(str(expected_actions), "")
+    assert composite.read_text() == expected_composite.read_text()
+
+
+def test_sync_actions_writes_only_changes(tmp_path, capsys):
+    composite, actions, patterns = _sync_fixture(tmp_path)
+    sync_actions(actions, patterns, composite)
+    mtimes = [os.stat(p).st_mtime_ns for p in (composite, actions, patterns)]
+    capsys.readouterr()
+
+    sync_actions(actions, patterns, composite)
+    assert [os.stat(p).st_mtime_ns for p in (composite, actions, patterns)] == mtimes
+    out = capsys.readouterr().out
+    assert "No changes" in out
+    assert "Timings: parse" in out
+
+
+def test_sync_actions_updates_snapshot_after_hand_edit(tmp_path, capsys):
+    from allowlist_snapshot import snapshot_matches
+
+    list_path = tmp_path / "actions.yml"
+    list_path.write_text(
+        "actions/setup-go:\n"
+        f"  {'a' * 40}:\n"
+        "    tag: v5.0.0\n"
+    )
+    pattern_path = tmp_path / "approved_patterns.yml"
+    sync_actions(list_path, pattern_path)
+    pattern_before = pattern_path.read_text()
+
+    # A tag change leaves the patterns file as it is
+    list_path.write_text(list_path.read_text().replace("v5.0.0", "v5.0.1"))
+    assert not snapshot_matches(snapshot_path(pattern_path), pattern_path, list_path)
+    capsys.readouterr()
+    sync_actions(list_path, pattern_path)
+
+    assert pattern_path.read_text() == pattern_before
+    assert f"Updated {snapshot_path(pattern_path)}" in capsys.readouterr().out
+    assert snapshot_matches(snapshot_path(pattern_path), pattern_path, list_path)
+
+
+def test_actions_index():
+    actions = load_yaml_string(
+        "# Comment on the first action\n"
+        "actions/setup-go:\n"
+        "  0bc4621a3135347011ad047f9ecf449bf72ce2bd:\n"
+        "    tag: v5.0.0\n"
+        "  de90cc6fb38fc0963ad72b210f1f284cd68cea36:  # Comment on a ref\n"
+        "    tag: v4.0.0\n"
+        "    expires_at: 2025-01-01\n"
+        "actions/setup-go/sub/path:\n"
+        "  v4:\n"
+        "    expires_at: 2025-02-01\n"
+        "    keep: true\n"
+        "apache/*:\n"
+        "  '*':\n"
+        "docker://jekyll/jekyll:\n"
+        "  sha256:400b:\n"
+        "    expires_at: 2025-03-01\n"
+    )
+    index = ActionsIndex(actions)
+
+    setup_go = index.by_name["actions/setup-go"][0]
+    assert (setup_go.owner, setup_go.repo, setup_go.sub_path) == ("actions", "setup-go", None)
+    assert setup_go.is_sha and setup_go.updatable and setup_go.tag == "v5.0.0"
+    sub_path = index.by_name["actions/setup-go/sub/path"][0]
+    assert (sub_path.sub_path, sub_path.is_sha, sub_path.keep) == ("sub/path", False, True)
+    assert index.by_name["docker://jekyll/jekyll"][0].owner is None
+    assert [r.name for r in index.by_owner["actions"]] == ["actions/setup-go", "actions/setup-go", "actions/setup-go/sub/path"]
+    assert [r.ref for r in index.by_tag["v4.0.0"]] == ["de90cc6fb38fc0963ad72b210f1f284cd68cea36"]
+    assert len(index) == 4 and index["apache/*"] == {"*": None}
+
+    assert [r.ref for r in index.expiring_until(datetime.date(2025, 2, 1))] == [
+        "de90cc6fb38fc0963ad72b210f1f284cd68cea36", "v4"
+    ]
+    expired = index.expired(datetime.date(2025, 6, 1))
+    assert [r.ref for r in expired] == ["de90cc6fb38fc0963ad72b210f1f284cd68cea36", "sha256:400b"]
+
+    index.remove(expired)
+    assert "docker://jekyll/jekyll" not in index
+    assert [r.ref for r in index.by_name["actions/setup-go"]] == ["0bc4621a3135347011ad047f9ecf449bf72ce2bd"]
+    assert "# Comment on the first action" in to_yaml_string(index.actions)
+
+
+def test_remove_expired_uses_calendar(tmp_path, capsys):
+    list_path = tmp_path / "actions.yml"
+    list_path.write_text(
+        "actions/setup-go:\n"
+        "  v5:\n"
+        f"    expires_at: {date.today() + timedelta(days=3)}\n"
+        "  v4:\n"
+        "    expires_at: 1900-01-01\n"
+    )
+    pattern_path = tmp_path / "approved_patterns.yml"
+    update_patterns(pattern_path, list_path)
+
+    assert remove_expired(list_path, pattern_path)
+    assert "v4" not in list_path.read_text()
+    mtime = os.stat(list_path).st_mtime_ns
+    # Nothing due according to the current snapshot: nothing is parsed or written
+    assert not remove_expired(list_path, pattern_path)
+    assert os.stat(list_path).st_mtime_ns == mtime
+
+    capsys.readouterr()
+    print_expirations(list_path, pattern_path, 5)
+    assert capsys.readouterr().out == f"{date.today() + timedelta(days=3)}  (in 3 days)  actions/setup-go@v5\n"
+
+
+def test_diff_actions():
+    old = {
+        "actions/setup-go": {"v5": {}, "v4": {"tag": "v4"}},
+        "actions/removed": {"v1": {}},
+    }
+    old_index = ActionsIndex(old)
+    new = {
+        "actions/setup-go": {"v5": {"expires_at": datetime.date(2025, 1, 1)}, "v4": {"tag": "v4"}, "v6": {}},
+    }
+    diff = diff_actions(old_index, new)
+    assert [(r.name, r.ref) for r in diff.added] == [("actions/setup-go", "v6")]
+    assert [(r.name, r.ref) for r in diff.removed] == [("actions/removed", "v1")]
+    assert [(r.name, r.ref) for r in diff.changed] == [("actions/setup-go", "v5")]
+    assert diff.names() == {"actions/setup-go", "actions/removed"}
+    assert not diff_actions(new, new)
+
+
+def test_sync_actions_patches_generated_files(tmp_path):
+    composite, actions, patterns = _sync_fixture(tmp_path / "sync")
+    sync_actions(actions, patterns, composite)
+    actions_before = actions.read_text()
+
+    # A dependabot bump of one step, and a new action only in actions.yml
+    content = composite.read_text()
+    uses = next(line for line in content.splitlines() if line.startswith("    - uses: "))
+    name = uses.removeprefix("    - uses: ").split("@")[0]
+    composite.write_text(content.replace(uses, f"    - uses: {name}@{'0' * 40}  # v99.0.0"))
+    # The files are patched, not generated from scratch
+    with mock.patch("gateway.generate_composite_action", side_effect=AssertionError), \
+            mock.patch("gateway.to_yaml_string", wraps=to_yaml_string) as yaml_dump:
+        sync_actions(actions, patterns, composite)
+    # actions.yml and the line of the new pattern
+    assert yaml_dump.call_count == 2
+    assert actions.read_text() != actions_before
+
+    # Same result as generating the files from scratch
+    index = ActionsIndex.load(actions)
+    assert composite.read_text() == generate_composite_action(index)
+    assert patterns.read_text() == generate_patterns_file(create_pattern(index), actions)
+    assert f"{name}@{'0' * 40}  # v99.0.0" in composite.read_text()
+
+
+def test_sync_actions_regenerates_edited_composite_action(tmp_path):
+    composite, actions, patterns = _sync_fixture(tmp_path)
+    sync_actions(actions, patterns, composite)
+    generated = composite.read_text()
+    steps = generated.splitlines(keepends=True)
+    first_step = next(i for i, line in enumerate(steps) if line.startswith("    - uses: "))
+    step_end = next(i for i in range(first_step + 1, len(steps)) if steps[i].startswith("    - "))
+
+    for edited in [
+        # A hand edit of the header
+        generated.replace("# Licensed to the Apache", "# Licensed to the Apache (edited)", 1),
+        # A duplicate step, e.g. left by a failed run
+        "".join(steps[:step_end] + steps[first_step:step_end] + steps[step_end:]),
+    ]:
+        composite.write_text(edited)
+        with mock.patch("gateway.generate_composite_action", wraps=generate_composite_action) as generate:
+            sync_actions(actions, patterns, composite)
+        generate.assert_called_once()
+        assert composite.read_text() == generated
+
+
+def test_patch_composite_action_inserts_and_removes_steps():
+    sha_a, sha_b, sha_c = "a" * 40, "b" * 40, "c" * 40
+    old = {"org/a": {sha_a: {}}, "org/c": {sha_c: {}}}
+    old_index = ActionsIndex(old)
+    content = generate_composite_action(old_index)
+
+    new = ActionsIndex({"org/a": {sha_a: {}}, "org/b": {sha_b: {"tag": "v1"}}, "org/c": {sha_c: {"keep": True}}})
+    patched = patch_composite_action(content, diff_actions(old_index, new), new)
+    assert patched == generate_composite_action(new)
+    assert f"org/b@{sha_b}  # v1" in patched and "org/c@" not in patched
+
+
+def test_patch_composite_action_moves_step_added_by_hand():
+    sha_a, sha_b, sha_c = "a" * 40, "b" * 40, "c" * 40
+    old_index = ActionsIndex({"org/a": {sha_a: {}}, "org/c": {sha_c: {}}})
+    footer = COMPOSITE_ACTION_FOOTER.splitlines(keepends=True)[0]
+    # A step for a new action added by hand after the existing ones
+    content = generate_composite_action(old_index).replace(
+        footer, f"    - uses: org/b@{sha_b}  # v1\n      if: false\n" + footer
+    )
+
+    new = ActionsIndex({"org/a": {sha_a: {}}, "org/b": {sha_b: {"tag": "v1"}}, "org/c": {sha_c: {}}})
+    patched = patch_composite_action(content, diff_actions(old_index, new), new)
+    assert patched == generate_composite_action(new)
+    assert patched.index("org/b@") < patched.index("org/c@")
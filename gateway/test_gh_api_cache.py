@@ -0,0 +1,99 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import io
+import os
+import time
+from unittest import mock
+from urllib.error import HTTPError
+
+from action_tags import _gh_get_tag, api_stats, enable_api_cache
+from gh_api_cache import GhApiCache
+
+URL = "https://api.github.com/repos/owner/repo/git/tags/abc"
+
+
+def test_store_and_lookup(tmp_path):
+    cache = GhApiCache(tmp_path)
+    cache.store(URL, 200, "OK", {"ETag": '"v1"'}, '{"sha": "abc"}')
+
+    cached = cache.lookup(URL)
+    assert cached.body == '{"sha": "abc"}'
+    assert cache.conditional_headers(cached) == {"If-None-Match": '"v1"'}
+    assert cache.lookup(URL + "x") is None
+
+def test_store_requires_validator(tmp_path):
+    cache = GhApiCache(tmp_path)
+    cache.store(URL, 200, "OK", {}, "{}")
+    cache.store(URL + "/404", 404, "Not Found", {"ETag": '"v1"'}, "{}")
+
+    assert cache.lookup(URL) is None
+    assert cache.lookup(URL + "/404") is None
+
+def test_last_modified_validator(tmp_path):
+    cache = GhApiCache(tmp_path)
+    cache.store(URL, 200, "OK", {"last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, "{}")
+
+    assert cache.conditional_headers(cache.lookup(URL)) == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+def test_ttl(tmp_path):
+    cache = GhApiCache(tmp_path, ttl_seconds=60)
+    cache.store(URL, 200, "OK", {"ETag": '"v1"'}, "{}")
+    with mock.patch("gh_api_cache.time.time", return_value=time.time() + 120):
+        assert cache.lookup(URL) is None
+    assert list(tmp_path.glob("*.json")) == []
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = GhApiCache(tmp_path, max_bytes=10_000)
+    body = "x" * 4_000
+    for i in range(3):
+        cache.store(f"{URL}/{i}", 200, "OK", {"ETag": f'"{i}"'}, body)
+    now = time.time()
+    for i, path in enumerate([cache._path(f"{URL}/{i}") for i in range(3)]):
+        os.utime(path, (now - 100 + i, now - 100 + i))
+    # Using entry 0 makes entry 1 the least recently used one.
+    cache.touch(cache.lookup(f"{URL}/0"))
+
+    cache.prune()
+
+    assert cache.lookup(f"{URL}/0") is not None
+    assert cache.lookup(f"{URL}/1") is None
+    assert cache.lookup(f"{URL}/2") is not None
+
+def test_gh_api_get_replays_not_modified(tmp_path):
+    cache = GhApiCache(tmp_path)
+    response = mock.MagicMock(status=200, reason="OK", headers={"ETag": '"v1"'})
+    response.read.return_value = b'{"object": {"sha": "def"}}'
+    response.__enter__.return_value = response
+    not_modified = HTTPError(URL, 304, "Not Modified", {}, io.BytesIO(b""))
+
+    enable_api_cache(cache)
+    try:
+        with mock.patch("action_tags.urlopen", return_value=response):
+            first = _gh_get_tag("owner/repo", "abc")
+        cached_before = api_stats.cached
+        with mock.patch("action_tags.urlopen", side_effect=not_modified) as urlopen:
+            second = _gh_get_tag("owner/repo", "abc")
+    finally:
+        enable_api_cache(None)
+
+    assert urlopen.call_args.args[0].get_header("If-none-match") == '"v1"'
+    assert api_stats.cached - cached_before == 1
+    assert second.status == first.status == 200
+    assert second.body == first.body == '{"object": {"sha": "def"}}'
@@ -0,0 +1,112 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+from datetime import date
+from unittest import mock
+
+from action_tags import ApiResponse, verify_actions
+from verification_ledger import VerificationLedger, verified_refs
+
+SHA_1 = "17575ea4e18dd928fe5968dbe32294b97923d65b"
+SHA_2 = "3e125ece5c3e5248e18da9ed8d2cce3d335ec8dd"
+TODAY = date(2026, 1, 10)
+
+
+def _actions():
+    return {
+        "sbt/setup-sbt": {SHA_1: {"tag": "v1.1.13"}},
+        "other/action": {SHA_2: {"tag": "v2"}},
+        "third/action": {SHA_2: {"tag": "v3"}},
+    }
+
+def _matching_tags(owner_repo: str, tag: str) -> ApiResponse:
+    sha = SHA_1 if owner_repo == "sbt/setup-sbt" else SHA_2
+    body = f'[{{"ref": "refs/tags/{tag}", "object": {{"type": "commit", "sha": "{sha}"}}}}]'
+    return ApiResponse("https://api.github.test", 200, "OK", {}, body)
+
+
+def test_verified_refs_skips_expired_refs():
+    action = {
+        SHA_1: {"tag": "v1", "expires_at": date(2026, 1, 1)},
+        SHA_2: {"tag": "v2", "expires_at": date(2026, 1, 1), "keep": True},
+    }
+    assert verified_refs(action, TODAY) == {
+        SHA_2: {"tag": "v2", "ignore_gh_api_errors": False, "ignore_invalid_git_sha": False},
+    }
+
+def test_save_and_load(tmp_path):
+    ledger = VerificationLedger(tmp_path / "ledger.json")
+    ledger.record("sbt/setup-sbt", _actions()["sbt/setup-sbt"], TODAY, ok=True)
+    ledger.save()
+
+    loaded = VerificationLedger.load(tmp_path / "ledger.json")
+    assert loaded.is_verified("sbt/setup-sbt", _actions()["sbt/setup-sbt"], TODAY)
+    assert loaded.verified_at("sbt/setup-sbt") == "2026-01-10"
+
+def test_load_missing_or_invalid(tmp_path):
+    assert VerificationLedger.load(tmp_path / "missing.json").entries == {}
+    (tmp_path / "invalid.json").write_text("{not json")
+    assert VerificationLedger.load(tmp_path / "invalid.json").entries == {}
+
+def test_select_changed_failed_and_sampled(tmp_path):
+    actions = _actions()
+    ledger = VerificationLedger(tmp_path / "ledger.json")
+    ledger.record("sbt/setup-sbt", actions["sbt/setup-sbt"], date(2026, 1, 1), ok=True)
+    ledger.record("other/action", actions["other/action"], date(2026, 1, 5), ok=True)
+    ledger.record("third/action", actions["third/action"], date(2026, 1, 9), ok=False)
+    ledger.record("removed/action", {}, date(2026, 1, 9), ok=True)
+
+    assert ledger.select(actions, TODAY, sample_size=0) == {"third/action"}
+    # The least recently verified action is sampled first
+    assert ledger.select(actions, TODAY, sample_size=1) == {"third/action", "sbt/setup-sbt"}
+    assert "removed/action" not in ledger.entries
+
+    actions["other/action"][SHA_1] = {"tag": "v2.1"}
+    assert ledger.select(actions, TODAY, sample_size=0) == {"third/action", "other/action"}
+
+def test_verify_actions_incremental(tmp_path):
+    actions = _actions()
+    ledger = VerificationLedger(tmp_path / "ledger.json")
+    with mock.patch("action_tags._gh_matching_tags", side_effect=_matching_tags) as matching_tags:
+        first = verify_actions(actions, log_to_console=False, today=TODAY, ledger=ledger)
+        assert matching_tags.call_count == 3
+
+        actions["other/action"][SHA_1] = {"tag": "v2.1"}
+        second = verify_actions(actions, log_to_console=False, today=TODAY, ledger=ledger, jobs=2)
+
+    assert first.failures == []
+    assert second.failures == [
+        "GitHub action other/action references Git tag 'v2.1' via SHAs '{'17575ea4e18dd928fe5968dbe32294b97923d65b'}' "
+        "but none of those matches the valid SHAs '{'3e125ece5c3e5248e18da9ed8d2cce3d335ec8dd'}'"
+    ]
+    assert matching_tags.call_count == 5
+    assert "Skipping GitHub action sbt/setup-sbt, unchanged since verified on 2026-01-10" in second.logs
+    assert ledger.entries["other/action"]["result"] == "failed"
+    assert ledger.entries["sbt/setup-sbt"]["result"] == "ok"
+
+def test_ignored_api_errors_are_not_recorded_as_verified(tmp_path):
+    actions = {"sbt/setup-sbt": {SHA_1: {"ignore_gh_api_errors": True}}}
+    ledger = VerificationLedger(tmp_path / "ledger.json")
+    failing = ApiResponse("https://api.github.test", 500, "Internal Server Error", {}, "commit lookup failed")
+    with mock.patch("action_tags._gh_get_commit_object", return_value=failing):
+        result = verify_actions(actions, log_to_console=False, today=TODAY, ledger=ledger)
+
+    assert result.failures == []
+    assert ledger.entries["sbt/setup-sbt"]["result"] == "failed"
+    assert ledger.select(actions, TODAY, sample_size=0) == {"sbt/setup-sbt"}
@@ -0,0 +1,119 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+
+from gateway import ActionRefs, ActionsYAML
+
+LEDGER_VERSION = 1
+
+
+def verified_refs(action: ActionRefs, today: date) -> dict[str, dict]:
+    """
+    Returns the attributes of the refs of an action that determine the outcome of its verification.
+    Expired refs are not verified and therefore not included.
+    """
+    refs: dict[str, dict] = {}
+    for ref, details in action.items():
+        details = details or {}
+        if 'expires_at' in details and not details.get('keep') and details['expires_at'] < today:
+            continue
+        refs[str(ref)] = {
+            "tag": details.get('tag'),
+            "ignore_gh_api_errors": bool(details.get('ignore_gh_api_errors')),
+            "ignore_invalid_git_sha": bool(details.get('ignore_invalid_git_sha')),
+        }
+    return refs
+
+
+class VerificationLedger(object):
+    """
+    Records which refs of which action were verified when and with which result.
+
+    `verify_actions` uses the ledger to only verify actions whose refs changed since their last
+    successful verification, plus a rolling sample of the actions that were verified longest ago.
+
+    The ledger is a JSON file, for each action it holds the verified refs with their tags,
+    the date of the last verification and its result.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, dict] | None = None):
+        self.path = Path(path)
+        self.entries: dict[str, dict] = entries or {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(path: Path) -> "VerificationLedger":
+        """
+        Loads the ledger from `path`. A missing, unreadable or outdated ledger yields an empty ledger.
+        """
+        try:
+            with open(path, "r") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return VerificationLedger(path)
+        if not isinstance(content, dict) or content.get("version") != LEDGER_VERSION:
+            return VerificationLedger(path)
+        return VerificationLedger(path, content.get("actions") or {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": LEDGER_VERSION, "actions": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_verified(self, name: str, action: ActionRefs, today: date) -> bool:
+        """
+        Whether the action was verified successfully with the same refs before.
+        """
+        entry = self.entries.get(name)
+        return entry is not None and entry.get("result") == "ok" and entry.get("refs") == verified_refs(action, today)
+
+    def verified_at(self, name: str) -> str | None:
+        entry = self.entries.get(name)
+        return entry.get("verified_at") if entry else None
+
+    def select(self, actions: ActionsYAML, today: date, sample_size: int) -> set[str]:
+        """
+        Returns the names of the actions to verify: all new, changed or previously failed actions,
+        plus the `sample_size` unchanged actions that were verified longest ago.
+        Entries of actions that no longer exist are dropped.
+        """
+        with self._lock:
+            for name in list(self.entries):
+                if name not in actions:
+                    del self.entries[name]
+
+        selected = {name for name, action in actions.items() if not self.is_verified(name, action, today)}
+        unchanged = sorted((self.verified_at(name) or "", name) for name in actions if name not in selected)
+        selected.update(name for _, name in unchanged[:sample_size])
+        return selected
+
+    def record(self, name: str, action: ActionRefs, today: date, ok: bool) -> None:
+        with self._lock:
+            self.entries[name] = {
+                "refs": verified_refs(action, today),
+                "verified_at": today.isoformat(),
+                "result": "ok" if ok else "failed",
+            }
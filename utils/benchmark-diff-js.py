@@ -0,0 +1,99 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "jsbeautifier>=1.15",
+#     "requests>=2.31",
+#     "rich>=13.0",
+# ]
+# ///
+"""Benchmark the compiled JS comparison on a real bundle.
+
+Usage:
+    uv run utils/benchmark-diff-js.py path/to/dist/index.js
+
+Copies the bundle into an "original" and a "rebuilt" dist directory and
+times ``diff_js_files`` against an empty beautified-JS cache:
+
+* uncached: beautifying both files serially, as every run used to;
+* identical: byte-identical files, which skip beautification;
+* differing, cold: a rebuilt file differing by one line, beautified
+  through the worker pool and stored in the cache;
+* differing, warm: the same comparison again, served from the cache.
+
+The cache lives in a temporary directory, so ``~/.cache`` is left alone.
+Use a multi-MB bundle (e.g. an ncc-compiled ``dist/index.js``) — below
+``diff_js.PARALLEL_MIN_BYTES`` the pool is not used.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from verify_action_build import diff_js
+from verify_action_build.console import console
+
+
+def measure(label: str, func) -> object:
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<24} {time.perf_counter() - started:8.2f}s")
+    return result
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(2)
+    bundle = Path(sys.argv[1])
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["VERIFY_ACTION_BUILD_CACHE_DIR"] = str(Path(tmp) / "cache")
+        original = Path(tmp) / "original"
+        rebuilt = Path(tmp) / "rebuilt"
+        original.mkdir()
+        rebuilt.mkdir()
+        shutil.copyfile(bundle, original / "index.js")
+        shutil.copyfile(bundle, rebuilt / "index.js")
+
+        def compare() -> bool:
+            return diff_js.diff_js_files(original, rebuilt, "org", "repo", "0" * 40)
+
+        content = bundle.read_text(errors="replace")
+        print(f"Comparing {bundle} ({len(content) / 1e6:.1f} MB), {os.cpu_count()} CPUs")
+        console.quiet = True
+        try:
+            measure("uncached", lambda: [diff_js._beautify_uncached(c) for c in (content, content + "\n")])
+            identical = measure("identical", compare)
+            with open(rebuilt / "index.js", "a") as f:
+                f.write("\n// rebuilt\n")
+            cold = measure("differing, cold", compare)
+            warm = measure("differing, warm", compare)
+        finally:
+            console.quiet = False
+        if not identical or cold != warm:
+            print("Results differ!")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
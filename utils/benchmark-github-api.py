@@ -0,0 +1,168 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "jsbeautifier>=1.15",
+#     "requests>=2.31",
+#     "rich>=13.0",
+# ]
+# ///
+"""Benchmark forking a process per GitHub API call against the pooled in-process client.
+
+Usage:
+    uv run utils/benchmark-github-api.py [number_of_tags]
+
+Serves a fixture shaped like the GitHub REST responses that
+``release_lookup._find_tags_for_commit`` consumes — pages of
+``git/matching-refs/tags`` plus one ``git/tags/<sha>`` object per annotated
+tag (default: 400 tags, two thirds annotated) — from a local HTTP server,
+and resolves the tags of a commit twice:
+
+* fork per call: one ``curl`` process per request, as ``gh api`` does
+  (``gh`` itself cannot be pointed at a local server);
+* pooled: ``github_client.api_get`` over the shared keep-alive session.
+
+The local server hides network latency, so real-world savings are larger:
+each forked call also pays a fresh TLS handshake with api.github.com.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from verify_action_build import github_client, release_lookup
+
+ORG, REPO = "example-org", "example-action"
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def build_fixture(tags: int) -> tuple[dict[str, object], str]:
+    """Return (responses by API path, commit SHA tagged by the last tags)."""
+    target = _sha("target-commit")
+    refs = []
+    responses: dict[str, object] = {}
+    for i in range(tags):
+        name = f"v{i // 100}.{i // 10 % 10}.{i % 10}"
+        commit = target if i >= tags - 3 else _sha(f"commit-{i}")
+        if i % 3:
+            tag_sha = _sha(f"tag-{i}")
+            refs.append({"ref": f"refs/tags/{name}", "object": {"sha": tag_sha, "type": "tag"}})
+            responses[f"/repos/{ORG}/{REPO}/git/tags/{tag_sha}"] = {
+                "sha": tag_sha, "tag": name, "object": {"sha": commit, "type": "commit"},
+            }
+        else:
+            refs.append({"ref": f"refs/tags/{name}", "object": {"sha": commit, "type": "commit"}})
+    for page in range(1, len(refs) // 100 + 2):
+        responses[
+            f"/repos/{ORG}/{REPO}/git/matching-refs/tags?per_page=100&page={page}"
+        ] = refs[(page - 1) * 100:page * 100]
+    return responses, target
+
+
+def serve(responses: dict[str, object]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body are separate writes; avoid delayed-ACK stalls
+            # on the keep-alive connection.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            body = json.dumps(responses.get(self.path, {"message": "Not Found"})).encode()
+            self.send_response(200 if self.path in responses else 404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fork_per_call(base_url: str):
+    curl = shutil.which("curl")
+
+    def api(endpoint: str):
+        url = f"{base_url}/{endpoint}"
+        if curl:
+            cmd = [curl, "-sf", url]
+        else:
+            cmd = [sys.executable, "-c", f"import urllib.request; print(urllib.request.urlopen({url!r}).read().decode())"]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0 or not result.stdout.strip():
+            return None
+        return json.loads(result.stdout)
+
+    return api
+
+
+def measure(label: str, api, commit: str) -> list[str]:
+    calls = 0
+
+    def counted(endpoint: str):
+        nonlocal calls
+        calls += 1
+        return api(endpoint)
+
+    with mock.patch.object(release_lookup, "_gh_api", counted):
+        started = time.perf_counter()
+        tags = release_lookup._find_tags_for_commit(ORG, REPO, commit)
+        elapsed = time.perf_counter() - started
+    print(f"{label:<24} {calls:5d} calls {elapsed:8.2f}s {elapsed / calls * 1000:8.1f}ms/call")
+    return tags
+
+
+def main():
+    tags = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    responses, commit = build_fixture(tags)
+    server = serve(responses)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("GITHUB_TOKEN", "benchmark")
+    print(f"Resolving tags of one commit among {tags} tags")
+    try:
+        forked = measure("fork per call", fork_per_call(base_url), commit)
+        with mock.patch.object(github_client, "GITHUB_API", base_url):
+            pooled = measure("pooled session", github_client.api_get, commit)
+    finally:
+        server.shutdown()
+    if forked != pooled or not pooled:
+        print("Results differ!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
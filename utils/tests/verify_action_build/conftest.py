@@ -0,0 +1,64 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import subprocess
+
+import pytest
+
+from verify_action_build.repo_snapshot import clear_snapshots
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep the on-disk caches of each test out of ~/.cache and other tests."""
+    cache_dir = tmp_path / "verify-action-build-cache"
+    monkeypatch.setenv("VERIFY_ACTION_BUILD_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_repo_snapshots():
+    """Forget the repository listings loaded by each test."""
+    clear_snapshots()
+    yield
+    clear_snapshots()
+
+
+@pytest.fixture
+def bare_repo(tmp_path):
+    """A local bare repository serving blobless, shallow fetches by SHA."""
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "src").mkdir()
+    (work / "src" / "index.ts").write_text("export {}\n")
+    (work / "action.yml").write_text("name: test\n")
+
+    def git(*args, cwd=work):
+        return subprocess.run(
+            ["git", *args], cwd=cwd, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+
+    git("init", "-q")
+    git("add", ".")
+    git("-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "-m", "init")
+    sha = git("rev-parse", "HEAD")
+    bare = tmp_path / "org" / "repo.git"
+    git("clone", "-q", "--bare", str(work), str(bare), cwd=tmp_path)
+    git("config", "uploadpack.allowFilter", "true", cwd=bare)
+    git("config", "uploadpack.allowAnySHA1InWant", "true", cwd=bare)
+    return f"file://{tmp_path}/{{org}}/{{repo}}.git", sha
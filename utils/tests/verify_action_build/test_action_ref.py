@@ -16,14 +16,20 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+from unittest import mock
+
 import pytest
+import requests
 
 from verify_action_build.action_ref import (
     parse_action_ref,
     extract_composite_uses,
     detect_action_type_from_yml,
+    fetch_file_from_github,
 )
 
+SHA = "abc123def456789012345678901234567890abcd"
+
 
 class TestParseActionRef:
     def test_simple_ref(self):
@@ -198,3 +204,51 @@ runs:
 name: Test
 """
         assert detect_action_type_from_yml(yml) == "unknown"
+
+
+class TestFetchFileFromGithub:
+    @staticmethod
+    def _response(status_code, content=b""):
+        resp = mock.Mock()
+        resp.status_code = status_code
+        resp.ok = status_code < 400
+        resp.content = content
+        resp.text = content.decode()
+        return resp
+
+    def test_pinned_sha_is_cached_on_disk(self):
+        with mock.patch(
+            "verify_action_build.file_provider.http_session.get",
+            return_value=self._response(200, b"content"),
+        ) as get:
+            assert fetch_file_from_github("org", "repo", SHA, "a.txt") == "content"
+            assert fetch_file_from_github("org", "repo", SHA, "a.txt") == "content"
+        assert get.call_count == 1
+
+    def test_404_is_cached(self):
+        with mock.patch(
+            "verify_action_build.file_provider.http_session.get",
+            return_value=self._response(404),
+        ) as get:
+            assert fetch_file_from_github("org", "repo", SHA, "missing") is None
+            assert fetch_file_from_github("org", "repo", SHA, "missing") is None
+        assert get.call_count == 1
+
+    def test_server_errors_are_not_cached(self):
+        with mock.patch(
+            "verify_action_build.file_provider.http_session.get",
+            side_effect=[self._response(502), requests.ConnectionError, self._response(200, b"ok")],
+        ) as get:
+            assert fetch_file_from_github("org", "repo", SHA, "a.txt") is None
+            assert fetch_file_from_github("org", "repo", SHA, "a.txt") is None
+            assert fetch_file_from_github("org", "repo", SHA, "a.txt") == "ok"
+        assert get.call_count == 3
+
+    def test_branch_refs_are_not_cached(self):
+        with mock.patch(
+            "verify_action_build.file_provider.http_session.get",
+            return_value=self._response(200, b"content"),
+        ) as get:
+            fetch_file_from_github("org", "repo", "main", "a.txt")
+            fetch_file_from_github("org", "repo", "main", "a.txt")
+        assert get.call_count == 2
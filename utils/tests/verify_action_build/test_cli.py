@@ -16,11 +16,13 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
 
-from verify_action_build.cli import main
+from verify_action_build.cli import _verify_in_worker, main, verify_action_refs
+from verify_action_build.console import console
 
 
 class TestMain:
@@ -75,3 +77,66 @@ class TestMain:
                     with pytest.raises(SystemExit) as exc_info:
                         main()
                     assert exc_info.value.code == 1
+
+    def test_wipe_package_cache_alone_exits(self):
+        with mock.patch("sys.argv", ["verify-action-build", "--wipe-package-cache"]):
+            with mock.patch("shutil.which", return_value="/usr/bin/docker"):
+                with mock.patch(
+                    "verify_action_build.cli.wipe_package_cache", return_value=True,
+                ) as wipe:
+                    with pytest.raises(SystemExit) as exc_info:
+                        main()
+                    assert exc_info.value.code == 0
+                    wipe.assert_called_once_with()
+
+
+class TestVerifyActionRefs:
+    def test_single_job_stops_at_first_failure(self):
+        with mock.patch(
+            "verify_action_build.cli.verify_single_action", side_effect=[False, True],
+        ) as verify:
+            assert verify_action_refs(["a/b@1", "c/d@2"], gh=None, jobs=1) is False
+        assert verify.call_count == 1
+
+    def test_parallel_verifies_all_refs_and_summarizes(self, capsys):
+        results = {
+            "a/b@1": (True, "output of a/b\n", 1.0),
+            "c/d@2": (False, "output of c/d\n", 2.0),
+        }
+        with mock.patch(
+            "verify_action_build.cli.ProcessPoolExecutor", ThreadPoolExecutor,
+        ), mock.patch(
+            "verify_action_build.cli._verify_in_worker",
+            side_effect=lambda ref, gh, options: results[ref],
+        ) as worker:
+            passed = verify_action_refs(
+                ["a/b@1", "c/d@2", "a/b@1"], gh=None, jobs=4, cache=False,
+            )
+        assert passed is False
+        assert worker.call_count == 2
+        assert worker.call_args.args[2] == {"cache": False}
+        err = capsys.readouterr().err
+        assert "output of a/b" in err
+        assert "output of c/d" in err
+        assert "Verification Results" in err
+
+    def test_worker_buffers_console_output(self, capsys):
+        def fake_verify(ref, gh=None, ci_mode=False, **kwargs):
+            assert ci_mode is True
+            console.print(f"verifying {ref}")
+            return True
+
+        with mock.patch("verify_action_build.cli.verify_single_action", side_effect=fake_verify):
+            passed, output, seconds = _verify_in_worker("a/b@1", None, {})
+        assert passed is True
+        assert "verifying a/b@1" in output
+        assert seconds >= 0
+        assert "verifying" not in capsys.readouterr().err
+
+    def test_worker_reports_exceptions_as_failures(self):
+        with mock.patch(
+            "verify_action_build.cli.verify_single_action", side_effect=RuntimeError("boom"),
+        ):
+            passed, output, _ = _verify_in_worker("a/b@1", None, {})
+        assert passed is False
+        assert "boom" in output
@@ -17,8 +17,15 @@
 # under the License.
 #
 from pathlib import Path
+from unittest import mock
 
-from verify_action_build.diff_js import _collect_compiled_js, beautify_js, diff_js_files
+from verify_action_build import diff_js
+from verify_action_build.diff_js import (
+    _collect_compiled_js,
+    beautify_js,
+    beautify_many,
+    diff_js_files,
+)
 
 
 class TestBeautifyJs:
@@ -51,6 +58,37 @@ class TestBeautifyJs:
         assert result1 == result2
 
 
+class TestBeautifyCache:
+    def test_second_call_hits_cache(self):
+        code = "function cached(){return 42}"
+        first = beautify_js(code)
+        with mock.patch.object(diff_js, "_beautify_uncached") as uncached:
+            assert beautify_js(code) == first
+        uncached.assert_not_called()
+
+    def test_cache_keyed_by_content(self):
+        assert "one" in beautify_js("var one=1")
+        assert "two" in beautify_js("var two=2")
+
+    def test_beautify_many_dedupes(self):
+        with mock.patch.object(
+            diff_js, "_beautify_uncached", side_effect=lambda c: c.upper()
+        ) as uncached:
+            result = beautify_many(["var a=1", "var b=2", "var a=1"])
+        assert result == {"var a=1": "VAR A=1", "var b=2": "VAR B=2"}
+        assert uncached.call_count == 2
+
+    def test_beautify_many_reuses_cache(self):
+        beautify_js("var seen=1")
+        with mock.patch.object(
+            diff_js, "_beautify_uncached", side_effect=lambda c: c.upper()
+        ) as uncached:
+            result = beautify_many(["var seen=1", "var fresh=2"])
+        uncached.assert_called_once_with("var fresh=2")
+        assert result["var fresh=2"] == "VAR FRESH=2"
+        assert "seen" in result["var seen=1"]
+
+
 class TestCollectCompiledJs:
     def test_picks_up_js_cjs_mjs(self, tmp_path):
         (tmp_path / "dist").mkdir()
@@ -228,3 +266,33 @@ class TestDiffJsOnlyInRebuilt:
         )
 
         assert result is False
+
+
+class TestDiffJsIdenticalFiles:
+    def test_identical_bytes_skip_beautification(self, tmp_path):
+        original = tmp_path / "original-dist"
+        rebuilt = tmp_path / "rebuilt-dist"
+        original.mkdir()
+        rebuilt.mkdir()
+        (original / "index.js").write_text("function a(){return 1}\n")
+        (rebuilt / "index.js").write_text("function a(){return 1}\n")
+
+        with mock.patch.object(diff_js, "_beautify_uncached") as uncached:
+            result = diff_js_files(
+                original, rebuilt, "Org", "Repo", "deadbeef" * 5, out_dir_name="dist",
+            )
+
+        assert result is True
+        uncached.assert_not_called()
+
+    def test_formatting_only_difference_matches(self, tmp_path):
+        original = tmp_path / "original-dist"
+        rebuilt = tmp_path / "rebuilt-dist"
+        original.mkdir()
+        rebuilt.mkdir()
+        (original / "index.js").write_text("function a(){return 1}\n")
+        (rebuilt / "index.js").write_text("function a() {\n  return 1\n}\n")
+
+        assert diff_js_files(
+            original, rebuilt, "Org", "Repo", "deadbeef" * 5, out_dir_name="dist",
+        ) is True
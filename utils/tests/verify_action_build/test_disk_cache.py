@@ -0,0 +1,82 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import os
+
+from verify_action_build.disk_cache import DiskCache, cache_root
+
+
+class TestCacheRoot:
+    def test_override(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("VERIFY_ACTION_BUILD_CACHE_DIR", str(tmp_path))
+        assert cache_root() == tmp_path
+
+    def test_xdg_cache_home(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("VERIFY_ACTION_BUILD_CACHE_DIR")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert cache_root() == tmp_path / "verify-action-build"
+
+
+class TestDiskCache:
+    def test_miss_then_hit(self):
+        cache = DiskCache("test", max_bytes=1 << 20)
+        assert cache.get(("org", "repo", "sha", "a.txt")) == (False, None)
+        cache.put(("org", "repo", "sha", "a.txt"), b"content")
+        assert cache.get(("org", "repo", "sha", "a.txt")) == (True, b"content")
+        assert cache.get(("org", "repo", "sha", "b.txt")) == (False, None)
+
+    def test_negative_entry(self):
+        cache = DiskCache("test", max_bytes=1 << 20)
+        cache.put(("org", "repo", "sha", "missing"), None)
+        assert cache.get(("org", "repo", "sha", "missing")) == (True, None)
+
+    def test_empty_content_is_not_negative(self):
+        cache = DiskCache("test", max_bytes=1 << 20)
+        cache.put(("k",), b"")
+        assert cache.get(("k",)) == (True, b"")
+
+    def test_persists_across_instances(self):
+        DiskCache("test", max_bytes=1 << 20).put(("k",), b"v")
+        assert DiskCache("test", max_bytes=1 << 20).get(("k",)) == (True, b"v")
+
+    def test_evicts_least_recently_used(self):
+        cache = DiskCache("test", max_bytes=1 << 20)
+        for i, key in enumerate(("a", "b", "c")):
+            cache.put((key,), b"x" * 1000)
+            os.utime(cache._path((key,)), (1000 + i, 1000 + i))
+        # Reading "a" makes it the most recently used entry.
+        assert cache.get(("a",))[0]
+        cache.max_bytes = 2500
+        cache.prune()
+        assert cache.get(("b",)) == (False, None)
+        assert cache.get(("a",)) == (True, b"x" * 1000)
+        assert cache.get(("c",)) == (True, b"x" * 1000)
+
+    def test_put_prunes_when_over_limit(self):
+        cache = DiskCache("test", max_bytes=2500)
+        for key in ("a", "b", "c"):
+            cache.put((key,), b"x" * 1000)
+        assert sum(cache.get((key,))[0] for key in ("a", "b", "c")) == 2
+
+    def test_unwritable_directory_is_ignored(self, tmp_path, monkeypatch):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        monkeypatch.setenv("VERIFY_ACTION_BUILD_CACHE_DIR", str(blocker))
+        cache = DiskCache("test", max_bytes=1 << 20)
+        cache.put(("k",), b"v")
+        assert cache.get(("k",)) == (False, None)
@@ -16,13 +16,22 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import io
+import subprocess
+import tarfile
 from unittest import mock
 
+import pytest
+
 from verify_action_build.docker_build import (
     detect_node_version,
+    _export_artifacts,
     _read_dockerfile_template,
     _print_docker_build_steps,
+    read_artifacts,
+    remove_build,
 )
+from verify_action_build.toolchain_image import _DOCKERFILE_PATH as TOOLCHAIN_DOCKERFILE
 
 
 class TestDetectNodeVersion:
@@ -35,7 +44,7 @@ runs:
   using: node20
   main: dist/index.js
 """
-        with mock.patch("verify_action_build.docker_build.requests.get", return_value=response):
+        with mock.patch("verify_action_build.docker_build.http_session.get", return_value=response):
             version = detect_node_version("org", "repo", "abc123")
         assert version == "20"
 
@@ -48,20 +57,20 @@ runs:
   using: 'node16'
   main: dist/index.js
 """
-        with mock.patch("verify_action_build.docker_build.requests.get", return_value=response):
+        with mock.patch("verify_action_build.docker_build.http_session.get", return_value=response):
             version = detect_node_version("org", "repo", "abc123")
         assert version == "16"
 
     def test_falls_back_to_20(self):
         response = mock.Mock()
         response.ok = False
-        with mock.patch("verify_action_build.docker_build.requests.get", return_value=response):
+        with mock.patch("verify_action_build.docker_build.http_session.get", return_value=response):
             version = detect_node_version("org", "repo", "abc123")
         assert version == "20"
 
     def test_network_error_falls_back(self):
         import requests as req
-        with mock.patch("verify_action_build.docker_build.requests.get", side_effect=req.RequestException):
+        with mock.patch("verify_action_build.docker_build.http_session.get", side_effect=req.RequestException):
             version = detect_node_version("org", "repo", "abc123")
         assert version == "20"
 
@@ -79,7 +88,7 @@ runs:
             resp.ok = False
             return resp
 
-        with mock.patch("verify_action_build.docker_build.requests.get", side_effect=track_get):
+        with mock.patch("verify_action_build.docker_build.http_session.get", side_effect=track_get):
             version = detect_node_version("org", "repo", "abc123", sub_path="sub")
         assert version == "22"
         assert any("sub/action.yml" in c for c in calls)
@@ -88,7 +97,7 @@ runs:
 class TestReadDockerfileTemplate:
     def test_reads_file(self):
         content = _read_dockerfile_template()
-        assert "FROM node:" in content
+        assert "FROM ${TOOLCHAIN_IMAGE}" in content
         assert "WORKDIR /action" in content
         assert "ARG REPO_URL" in content
         assert "ARG COMMIT_HASH" in content
@@ -103,16 +112,19 @@ class TestReadDockerfileTemplate:
         # Sanity check that the Dart branch wasn't accidentally removed.
         content = _read_dockerfile_template()
         assert "pubspec.yaml" in content
-        assert "apt-get install -y --no-install-recommends dart" in content
         assert "dart pub get" in content
+        toolchain = TOOLCHAIN_DOCKERFILE.read_text()
+        assert "FROM node:" in toolchain
+        assert "apt-get install -y --no-install-recommends dart" in toolchain
 
     def test_deno_support_present(self):
         content = _read_dockerfile_template()
-        # Install branch runs the official installer into /usr/local.
         assert "deno.json" in content
         assert "deno.jsonc" in content
-        assert "deno.land/install.sh" in content
-        assert "DENO_INSTALL=/usr/local" in content
+        # Install branch runs the official installer into /usr/local.
+        toolchain = TOOLCHAIN_DOCKERFILE.read_text()
+        assert "deno.land/install.sh" in toolchain
+        assert "DENO_INSTALL=/usr/local" in toolchain
         # Build step invokes the conventional bundle task.
         assert "deno task bundle" in content
 
@@ -148,3 +160,113 @@ class TestPrintDockerBuildSteps:
         result.stdout = ""
         result.stderr = ""
         _print_docker_build_steps(result)
+
+
+def _artifacts_tar(members: list[tuple[str, bytes | None, str]]) -> bytes:
+    """Build a tar archive like ``docker cp container:/artifacts -`` streams.
+
+    *members* are ``(name, content, link)``: a file when *content* is set,
+    a symlink when *link* is set, else a directory.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, content, link in members:
+            info = tarfile.TarInfo(name)
+            if content is not None:
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+                continue
+            if link:
+                info.type = tarfile.SYMTYPE
+                info.linkname = link
+            else:
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+            tar.addfile(info)
+    return buffer.getvalue()
+
+
+ARTIFACTS = [
+    ("artifacts", None, ""),
+    ("artifacts/out-dir.txt", b"lib\n", ""),
+    ("artifacts/kept-js.log", b"lib/readable.js\n", ""),
+    ("artifacts/original-dist", None, ""),
+    ("artifacts/original-dist/index.js", b"original", ""),
+    ("artifacts/original-dist/sub", None, ""),
+    ("artifacts/original-dist/sub/a.js", b"a", ""),
+    ("artifacts/rebuilt-dist", None, ""),
+    ("artifacts/rebuilt-dist/index.js", b"rebuilt", ""),
+    ("artifacts/rebuilt-node-modules/.bin", None, ""),
+    ("artifacts/rebuilt-node-modules/pkg/cli.js", b"cli", ""),
+    ("artifacts/rebuilt-node-modules/.bin/cli", None, "../pkg/cli.js"),
+    ("artifacts/rebuilt-node-modules/escape", None, "../../../etc/passwd"),
+    ("artifacts/original-dist/../../evil.js", b"evil", ""),
+    ("other/file.txt", b"ignored", ""),
+]
+
+
+class TestReadArtifacts:
+    def _trees(self, tmp_path):
+        trees = {}
+        for name in ("original-dist", "rebuilt-dist", "rebuilt-node-modules"):
+            trees[name] = tmp_path / name
+            trees[name].mkdir()
+        return trees
+
+    def test_unpacks_trees_and_manifest(self, tmp_path):
+        trees = self._trees(tmp_path)
+        manifest = read_artifacts(io.BytesIO(_artifacts_tar(ARTIFACTS)), trees)
+        assert manifest == {"out-dir.txt": "lib\n", "kept-js.log": "lib/readable.js\n"}
+        assert (trees["original-dist"] / "index.js").read_text() == "original"
+        assert (trees["original-dist"] / "sub" / "a.js").read_text() == "a"
+        assert (trees["rebuilt-dist"] / "index.js").read_text() == "rebuilt"
+        node_modules = trees["rebuilt-node-modules"]
+        assert (node_modules / ".bin" / "cli").is_symlink()
+        assert (node_modules / ".bin" / "cli").read_text() == "cli"
+
+    def test_skips_members_escaping_their_tree(self, tmp_path):
+        trees = self._trees(tmp_path)
+        read_artifacts(io.BytesIO(_artifacts_tar(ARTIFACTS)), trees)
+        assert not (trees["rebuilt-node-modules"] / "escape").exists()
+        assert not (tmp_path / "evil.js").exists()
+        assert not (tmp_path / "file.txt").exists()
+
+    def test_not_a_tar(self, tmp_path):
+        with pytest.raises(tarfile.TarError):
+            read_artifacts(io.BytesIO(b"not a tar archive" * 100), self._trees(tmp_path))
+
+
+class TestExportArtifacts:
+    def _popen(self, stdout: bytes, returncode: int):
+        proc = mock.MagicMock()
+        proc.__enter__.return_value = proc
+        proc.stdout = io.BytesIO(stdout)
+        proc.stderr = io.BytesIO(b"error" if returncode else b"")
+        proc.returncode = returncode
+        return mock.patch(
+            "verify_action_build.docker_build.subprocess.Popen", return_value=proc,
+        )
+
+    def test_single_docker_cp(self, tmp_path):
+        trees = {"original-dist": tmp_path}
+        with self._popen(_artifacts_tar(ARTIFACTS), 0) as popen:
+            manifest = _export_artifacts("container", trees)
+        assert popen.call_args[0][0] == ["docker", "cp", "container:/artifacts", "-"]
+        assert manifest["out-dir.txt"] == "lib\n"
+        assert (tmp_path / "index.js").read_text() == "original"
+
+    def test_docker_cp_failure_raises(self, tmp_path):
+        with self._popen(b"", 1):
+            with pytest.raises(subprocess.CalledProcessError):
+                _export_artifacts("container", {"original-dist": tmp_path})
+
+
+class TestRemoveBuild:
+    def test_removes_container_and_image(self):
+        with mock.patch("verify_action_build.docker_build.subprocess.run") as run:
+            remove_build("org", "repo", "a" * 40, "b" * 40)
+        build_id = f"org-repo-{'a' * 12}-lock-{'b' * 12}"
+        assert [c.args[0] for c in run.call_args_list] == [
+            ["docker", "rm", "-f", f"verify-action-{build_id}"],
+            ["docker", "rmi", "-f", f"verify-action:{build_id}"],
+        ]
@@ -0,0 +1,123 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import os
+from unittest import mock
+
+import pytest
+
+from verify_action_build import repo_snapshot
+from verify_action_build.action_ref import fetch_file_from_github
+from verify_action_build.file_provider import (
+    CloneFileProvider,
+    FileProvider,
+    HttpFileProvider,
+    cloned,
+    provider_for,
+    use_provider,
+)
+from verify_action_build.repo_snapshot import loaded_snapshot
+from verify_action_build.security import _fetch_blob_bytes
+
+SHA = "a" * 40
+
+
+class MemoryProvider(FileProvider):
+    def __init__(self, files: dict[str, bytes]):
+        super().__init__("org", "repo", SHA)
+        self.files = files
+
+    def read_bytes(self, path):
+        return self.files.get(path)
+
+
+class TestProviderFor:
+    def test_defaults_to_http(self):
+        assert isinstance(provider_for("org", "repo", SHA), HttpFileProvider)
+
+    def test_use_provider(self):
+        provider = MemoryProvider({"action.yml": b"name: test\n", "bin/tool": b"\x00\x01"})
+        with use_provider(provider):
+            assert provider_for("org", "repo", SHA) is provider
+            assert isinstance(provider_for("org", "repo", "b" * 40), HttpFileProvider)
+            assert fetch_file_from_github("org", "repo", SHA, "action.yml") == "name: test\n"
+            assert _fetch_blob_bytes("org", "repo", SHA, "bin/tool") == b"\x00\x01"
+            assert fetch_file_from_github("org", "repo", SHA, "missing.yml") is None
+        assert isinstance(provider_for("org", "repo", SHA), HttpFileProvider)
+
+    def test_read_text_replaces_invalid_utf8(self):
+        provider = MemoryProvider({"a.txt": b"ok \xff"})
+        assert provider.read_text("a.txt") == "ok �"
+        assert provider.read_text("b.txt") is None
+
+    def test_provider_must_implement_read_bytes(self):
+        class Incomplete(FileProvider):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete("org", "repo", SHA)
+
+
+class TestCloneFileProvider:
+    def test_read_bytes(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "index.ts").write_text("export {}\n")
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config").write_text("[core]\n")
+        provider = CloneFileProvider("org", "repo", SHA, tmp_path)
+        assert provider.read_bytes("src/index.ts") == b"export {}\n"
+        assert provider.read_bytes("./src//index.ts") == b"export {}\n"
+        assert provider.read_bytes("src/missing.ts") is None
+        assert provider.read_bytes("src") is None
+        assert provider.read_bytes(".git/config") is None
+        assert provider.read_bytes("src/../../etc/passwd") is None
+        assert provider.read_bytes("") is None
+
+    def test_symlinks_are_not_followed(self, tmp_path):
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "secret").write_text("secret\n")
+        checkout = tmp_path / "checkout"
+        checkout.mkdir()
+        os.symlink(outside / "secret", checkout / "link")
+        os.symlink(outside, checkout / "dir")
+        provider = CloneFileProvider("org", "repo", SHA, checkout)
+        assert provider.read_bytes("link") == str(outside / "secret").encode()
+        assert provider.read_bytes("dir/secret") is None
+
+    def test_cloned(self, bare_repo):
+        remote_url, sha = bare_repo
+        with mock.patch.object(repo_snapshot, "GIT_REMOTE_URL", remote_url), \
+                mock.patch("verify_action_build.file_provider.http_session.get") as get:
+            with cloned("org", "repo", sha) as provider:
+                assert provider is not None
+                assert provider_for("org", "repo", sha) is provider
+                assert fetch_file_from_github("org", "repo", sha, "action.yml") == "name: test\n"
+                assert fetch_file_from_github("org", "repo", sha, "src/index.ts") == "export {}\n"
+                snapshot = loaded_snapshot("org", "repo", sha)
+                assert snapshot.paths() == ["action.yml", "src/index.ts"]
+                checkout = provider.checkout
+            assert not checkout.exists()
+        get.assert_not_called()
+        assert isinstance(provider_for("org", "repo", sha), HttpFileProvider)
+
+    def test_cloned_failure_yields_none(self):
+        with mock.patch.object(repo_snapshot, "GIT_REMOTE_URL", "file:///nonexistent/{org}/{repo}.git"):
+            with cloned("org", "repo", SHA) as provider:
+                assert provider is None
+                assert isinstance(provider_for("org", "repo", SHA), HttpFileProvider)
@@ -16,9 +16,12 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import subprocess
 from unittest import mock
 
-from verify_action_build.github_client import GitHubClient
+import requests
+
+from verify_action_build.github_client import GitHubClient, api_get
 
 
 class TestGitHubClient:
@@ -84,3 +87,72 @@ class TestGitHubClient:
         with mock.patch.object(client, "_get", return_value=None):
             result = client._get_status_checks("abc123")
         assert result == []
+
+
+class TestApiGet:
+    @staticmethod
+    def _response(status_code, body=b""):
+        resp = mock.Mock()
+        resp.ok = status_code < 400
+        resp.content = body
+        resp.json.side_effect = lambda: __import__("json").loads(body)
+        return resp
+
+    def test_in_process_when_token_available(self):
+        with mock.patch(
+            "verify_action_build.github_client.github_token", return_value="ghp_x",
+        ), mock.patch(
+            "verify_action_build.github_client.http_session.get",
+            return_value=self._response(200, b'{"sha": "abc"}'),
+        ) as get, mock.patch("verify_action_build.github_client.subprocess.run") as run:
+            assert api_get("repos/o/r/commits/abc") == {"sha": "abc"}
+        run.assert_not_called()
+        assert get.call_args.args[0] == "https://api.github.com/repos/o/r/commits/abc"
+        assert get.call_args.kwargs["headers"]["Authorization"] == "Bearer ghp_x"
+
+    def test_in_process_failures_return_none(self):
+        with mock.patch(
+            "verify_action_build.github_client.github_token", return_value="ghp_x",
+        ), mock.patch(
+            "verify_action_build.github_client.http_session.get",
+            side_effect=[
+                self._response(404, b'{"message": "Not Found"}'),
+                self._response(200, b"not json"),
+                requests.ConnectionError,
+            ],
+        ):
+            assert api_get("a") is None
+            assert api_get("b") is None
+            assert api_get("c") is None
+
+    def test_forks_gh_without_token(self):
+        completed = subprocess.CompletedProcess([], 0, stdout='[{"number": 1}]', stderr="")
+        with mock.patch(
+            "verify_action_build.github_client.github_token", return_value=None,
+        ), mock.patch(
+            "verify_action_build.github_client.shutil.which", return_value="/usr/bin/gh",
+        ), mock.patch(
+            "verify_action_build.github_client.subprocess.run", return_value=completed,
+        ) as run:
+            assert api_get("repos/o/r/pulls") == [{"number": 1}]
+        assert run.call_args.args[0] == ["gh", "api", "repos/o/r/pulls"]
+
+    def test_unauthenticated_without_token_or_gh(self):
+        with mock.patch(
+            "verify_action_build.github_client.github_token", return_value=None,
+        ), mock.patch(
+            "verify_action_build.github_client.shutil.which", return_value=None,
+        ), mock.patch(
+            "verify_action_build.github_client.http_session.get",
+            return_value=self._response(200, b"[]"),
+        ) as get:
+            assert api_get("repos/o/r/pulls") == []
+        assert "Authorization" not in get.call_args.kwargs["headers"]
+
+    def test_client_without_token_uses_api_get(self):
+        client = GitHubClient(repo="owner/repo")
+        with mock.patch(
+            "verify_action_build.github_client.api_get", return_value=[{"sha": "a"}],
+        ) as get:
+            assert client.get_commit_pulls("o", "r", "abc") == [{"sha": "a"}]
+        get.assert_called_once_with("repos/o/r/commits/abc/pulls")
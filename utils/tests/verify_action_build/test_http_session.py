@@ -0,0 +1,192 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+import pytest
+import requests
+
+from verify_action_build import http_session
+from verify_action_build.http_session import (
+    HttpStats,
+    PooledSession,
+    get_session,
+    gh_auth_token,
+    github_token,
+)
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server answering each request with the next queued (status, headers)."""
+    responses: list[tuple[int, dict]] = []
+    paths: list[str] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            paths.append(self.path)
+            status, headers = responses.pop(0) if responses else (200, {})
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", responses, paths
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestPooledSession:
+    def test_retries_server_errors(self, server):
+        url, responses, paths = server
+        responses.extend([(503, {}), (200, {})])
+        resp = PooledSession().get(f"{url}/file")
+        assert resp.ok
+        assert paths == ["/file", "/file"]
+
+    def test_retries_403_with_retry_after(self, server):
+        url, responses, paths = server
+        responses.extend([(403, {"Retry-After": "0"}), (200, {})])
+        assert PooledSession().get(f"{url}/file").ok
+        assert len(paths) == 2
+
+    def test_does_not_retry_plain_403(self, server):
+        url, responses, paths = server
+        responses.append((403, {}))
+        resp = PooledSession().get(f"{url}/file")
+        assert resp.status_code == 403
+        assert len(paths) == 1
+
+    def test_records_per_host_stats(self, server):
+        url, responses, _ = server
+        responses.append((404, {}))
+        session = PooledSession()
+        session.get(f"{url}/a")
+        session.get(f"{url}/b")
+        stats = session.stats.snapshot()
+        assert stats["127.0.0.1"]["requests"] == 2
+        assert stats["127.0.0.1"]["errors"] == 0
+
+    def test_connection_errors_are_counted(self):
+        session = PooledSession()
+        with mock.patch.object(
+            requests.Session, "request", side_effect=requests.ConnectionError,
+        ):
+            with pytest.raises(requests.ConnectionError):
+                session.get("https://example.invalid/x")
+        assert session.stats.snapshot()["example.invalid"]["errors"] == 1
+
+    def test_token_sent_to_github_hosts_only(self):
+        session = PooledSession(token="ghp_test")
+        with mock.patch.object(requests.Session, "request") as request:
+            request.return_value.status_code = 200
+            session.get("https://api.github.com/repos/o/r", headers={"Accept": "x"})
+            session.get("https://registry.npmjs.org/pkg")
+            session.get("https://api.github.com/user", headers={"Authorization": "token other"})
+        github, npm, explicit = (call.kwargs for call in request.call_args_list)
+        assert github["headers"]["Authorization"] == "Bearer ghp_test"
+        assert github["headers"]["Accept"] == "x"
+        assert github["timeout"] == http_session.DEFAULT_TIMEOUT
+        assert "headers" not in npm
+        assert explicit["headers"]["Authorization"] == "token other"
+
+
+class TestHttpStats:
+    def test_snapshot_sorted_by_requests_and_reset(self):
+        stats = HttpStats()
+        stats.record("a", 0.5)
+        stats.record("b", 0.1)
+        stats.record("b", 0.2, error=True)
+        snapshot = stats.snapshot()
+        assert list(snapshot) == ["b", "a"]
+        assert snapshot["b"]["errors"] == 1
+        assert snapshot["b"]["seconds"] == pytest.approx(0.3)
+        stats.reset()
+        assert stats.snapshot() == {}
+
+
+class TestGetSession:
+    def test_shared_within_a_process(self):
+        assert get_session() is get_session()
+
+    def test_recreated_after_fork(self):
+        session = get_session()
+        with mock.patch("verify_action_build.http_session.os.getpid", return_value=-1):
+            assert get_session() is not session
+
+    def test_reads_token_from_environment(self):
+        with mock.patch.dict("os.environ", {"GITHUB_TOKEN": "ghp_env"}), mock.patch(
+            "verify_action_build.http_session._session", None,
+        ):
+            assert get_session().token == "ghp_env"
+
+
+class TestGitHubToken:
+    @pytest.fixture(autouse=True)
+    def clear_gh_token_cache(self):
+        gh_auth_token.cache_clear()
+        yield
+        gh_auth_token.cache_clear()
+
+    def test_gh_auth_token_asked_once(self):
+        completed = subprocess.CompletedProcess([], 0, stdout="gho_abc\n", stderr="")
+        with mock.patch(
+            "verify_action_build.http_session.subprocess.run", return_value=completed,
+        ) as run:
+            assert gh_auth_token() == "gho_abc"
+            assert gh_auth_token() == "gho_abc"
+        run.assert_called_once()
+        assert run.call_args.args[0] == ["gh", "auth", "token"]
+
+    def test_gh_auth_token_not_logged_in(self):
+        completed = subprocess.CompletedProcess([], 1, stdout="", stderr="not logged in")
+        with mock.patch(
+            "verify_action_build.http_session.subprocess.run", return_value=completed,
+        ):
+            assert gh_auth_token() is None
+
+    def test_gh_auth_token_without_gh(self):
+        with mock.patch(
+            "verify_action_build.http_session.subprocess.run", side_effect=FileNotFoundError,
+        ):
+            assert gh_auth_token() is None
+
+    def test_environment_token_wins(self, monkeypatch):
+        monkeypatch.setenv("GITHUB_TOKEN", "ghp_env")
+        with mock.patch("verify_action_build.http_session.subprocess.run") as run:
+            assert github_token() == "ghp_env"
+        run.assert_not_called()
+
+    def test_falls_back_to_gh(self, monkeypatch):
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        completed = subprocess.CompletedProcess([], 0, stdout="gho_abc\n", stderr="")
+        with mock.patch(
+            "verify_action_build.http_session.subprocess.run", return_value=completed,
+        ):
+            assert github_token() == "gho_abc"
@@ -0,0 +1,165 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import re
+import subprocess
+from unittest import mock
+
+from verify_action_build.docker_build import _read_dockerfile_template
+from verify_action_build.package_cache import (
+    CACHE_MOUNT_ID_PREFIX,
+    CACHE_MOUNTS,
+    STATS_PATH,
+    PackageCacheStats,
+    parse_stats,
+    wipe_package_cache,
+    with_package_cache,
+)
+
+DOCKERFILE = """\
+FROM base
+RUN echo setup
+# [package-cache]
+RUN npm ci && \\
+    echo installed
+RUN echo between
+# [package-cache]
+RUN pnpm install
+RUN echo done
+"""
+
+
+class TestWithPackageCache:
+    def test_mounts_marked_steps(self):
+        lines = with_package_cache(DOCKERFILE).splitlines()
+        mounted = [line for line in lines if line.startswith("RUN --mount=")]
+        # The two marked steps, plus the steps resetting and measuring the caches.
+        assert len(mounted) == 4
+        for line in mounted:
+            for name, target, _ in CACHE_MOUNTS:
+                assert f"id={CACHE_MOUNT_ID_PREFIX}-{name},target={target}," in line
+        assert lines[1] == "RUN echo setup"
+        assert "touch -a -d @0" in lines[2]
+        assert lines[4].endswith(" npm ci && \\")
+        assert lines[5] == "    echo installed"
+        assert lines[6] == "RUN echo between"
+        assert lines[8].endswith(" pnpm install")
+        assert STATS_PATH in lines[9]
+        assert lines[10] == "RUN echo done"
+
+    def test_unmarked_dockerfile_is_unchanged(self):
+        assert with_package_cache("FROM base\nRUN npm ci\n") == "FROM base\nRUN npm ci\n"
+
+    def test_build_dockerfile_has_marked_steps(self):
+        template = _read_dockerfile_template()
+        assert template.count("# [package-cache]\nRUN ") == 2
+        mounted = with_package_cache(template)
+        assert mounted.count("RUN --mount=type=cache") == 4
+
+    def test_cache_mounts_only_on_fetch_steps(self):
+        """Steps with the shared caches fetch pinned packages without running any scripts."""
+        steps = re.split(r"\n(?=RUN )", with_package_cache(_read_dockerfile_template()))
+        fetch_steps = [
+            step for step in steps
+            if "--mount=type=cache" in step and STATS_PATH not in step and "touch -a" not in step
+        ]
+        assert len(fetch_steps) == 2
+        for step in fetch_steps:
+            installs = re.findall(r"\b(?:npm|yarn|pnpm) (?:ci|install)\b[^;&|]*", step)
+            assert len(installs) == 4
+            for install in installs:
+                assert "--ignore-scripts" in install or "--mode=skip-build" in install
+            assert not re.search(r"\bnpm install", step)
+            assert "rebuild" not in step
+            assert " run " not in step
+            assert "package-lock.json" in step
+
+    def test_build_step_gets_no_cache_mount(self):
+        """The step running the action's own scripts must not reach the shared caches."""
+        steps = re.split(r"\n(?=RUN )", with_package_cache(_read_dockerfile_template()))
+        build_steps = [step for step in steps if 'run "$step"' in step or "ncc build" in step]
+        assert build_steps
+        for step in build_steps:
+            assert "--mount=type=cache" not in step
+
+    def test_yarn_v1_cache_is_not_mounted(self):
+        assert all("/usr/local/share/.cache/yarn" not in target for _, target, _ in CACHE_MOUNTS)
+
+    def test_measures_downloaded_and_reused_bytes(self, tmp_path):
+        """Run the generated shell commands against a local cache directory."""
+        lines = with_package_cache(DOCKERFILE).splitlines()
+        cache = tmp_path / "cache"
+        stamp = tmp_path / "stamp"
+        stats = tmp_path / "stats.txt"
+
+        def command(line):
+            body = re.sub(r"--mount=\S+ ", "", line).removeprefix("RUN ")
+            body = re.sub(r'DIRS="[^"]*"', f'DIRS="{cache}"', body)
+            return body.replace("/package-cache.stamp", str(stamp)).replace(STATS_PATH, str(stats))
+
+        cache.mkdir()
+        (cache / "old").write_bytes(b"x" * 5000)
+        (cache / "unused").write_bytes(b"x" * 3000)
+        subprocess.run(["sh", "-c", command(lines[2])], check=True)
+        (cache / "old").read_bytes()
+        (cache / "new").write_bytes(b"x" * 7000)
+        subprocess.run(["sh", "-c", command(lines[9])], check=True)
+        downloaded, reused = parse_stats(stats.read_text())
+        assert downloaded == 7000
+        # Access times are only updated on reads if the filesystem records them.
+        assert reused in (5000, 0)
+
+
+class TestParseStats:
+    def test_parses(self):
+        assert parse_stats("7000 5000\n") == (7000, 5000)
+
+    def test_invalid(self):
+        assert parse_stats("") is None
+        assert parse_stats("7000") is None
+        assert parse_stats("a b") is None
+
+
+class TestPackageCacheStats:
+    def test_summary(self):
+        stats = PackageCacheStats()
+        assert stats.summary() is None
+        stats.record(downloaded=1024 * 1024, reused=30 * 1024 * 1024)
+        assert stats.summary() == "30.0 MB from cache, 1.0 MB downloaded"
+        stats.reset()
+        assert stats.summary() is None
+
+
+class TestWipePackageCache:
+    def test_prunes_cache_mounts(self):
+        with mock.patch(
+            "verify_action_build.package_cache.subprocess.run",
+            return_value=subprocess.CompletedProcess([], 0),
+        ) as run:
+            assert wipe_package_cache()
+        cmd = run.call_args[0][0]
+        assert cmd[:4] == ["docker", "builder", "prune", "--force"]
+        assert "type=exec.cachemount" in cmd
+        assert f"description~={CACHE_MOUNT_ID_PREFIX}" in cmd
+
+    def test_failure(self):
+        with mock.patch(
+            "verify_action_build.package_cache.subprocess.run",
+            return_value=subprocess.CompletedProcess([], 1),
+        ):
+            assert not wipe_package_cache()
@@ -0,0 +1,117 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+from unittest import mock
+
+from verify_action_build import repo_snapshot
+from verify_action_build.action_ref import fetch_file_from_github
+from verify_action_build.repo_snapshot import RepoSnapshot, get_snapshot, loaded_snapshot
+
+SHA = "a" * 40
+
+TREE = {
+    "sha": SHA,
+    "tree": [
+        {"path": "action.yml", "type": "blob", "sha": "1" * 40},
+        {"path": "dist", "type": "tree", "sha": "2" * 40},
+        {"path": "dist/index.js", "type": "blob", "sha": "3" * 40},
+        {"path": "vendor", "type": "commit", "sha": "4" * 40},
+    ],
+    "truncated": False,
+}
+
+
+def _patch_api(data):
+    return mock.patch("verify_action_build.repo_snapshot.api_get", return_value=data)
+
+
+class TestRepoSnapshot:
+    def test_fetch_from_trees_api(self):
+        with _patch_api(TREE) as api:
+            snapshot = RepoSnapshot.fetch("org", "repo", SHA)
+        api.assert_called_once_with(f"repos/org/repo/git/trees/{SHA}?recursive=1")
+        assert snapshot.complete
+        assert snapshot.paths() == ["action.yml", "dist/index.js"]
+        assert snapshot.blobs["dist/index.js"] == "3" * 40
+        assert "dist/index.js" in snapshot
+        assert "dist" not in snapshot
+        assert snapshot.top_level_names() == {"action.yml", "dist", "vendor"}
+
+    def test_unavailable(self):
+        with _patch_api(None):
+            snapshot = RepoSnapshot.fetch("org", "repo", SHA)
+        assert not snapshot.available
+        assert not snapshot.complete
+        assert snapshot.paths() == []
+
+    def test_truncated_falls_back_to_git(self):
+        listed = ({"a.txt": "5" * 40}, {"a.txt"})
+        with _patch_api({**TREE, "truncated": True}), mock.patch(
+            "verify_action_build.repo_snapshot._list_tree_via_git", return_value=listed,
+        ):
+            snapshot = RepoSnapshot.fetch("org", "repo", SHA)
+        assert snapshot.complete
+        assert snapshot.paths() == ["a.txt"]
+
+    def test_truncated_without_git_stays_truncated(self):
+        with _patch_api({**TREE, "truncated": True}), mock.patch(
+            "verify_action_build.repo_snapshot._list_tree_via_git", return_value=None,
+        ):
+            snapshot = RepoSnapshot.fetch("org", "repo", SHA)
+        assert snapshot.available
+        assert snapshot.truncated
+        assert not snapshot.complete
+
+
+class TestGetSnapshot:
+    def test_fetched_once(self):
+        assert loaded_snapshot("org", "repo", SHA) is None
+        with _patch_api(TREE) as api:
+            first = get_snapshot("org", "repo", SHA)
+            second = get_snapshot("org", "repo", SHA)
+        assert first is second
+        assert loaded_snapshot("org", "repo", SHA) is first
+        api.assert_called_once()
+
+    def test_failures_are_retried(self):
+        with _patch_api(None) as api:
+            get_snapshot("org", "repo", SHA)
+            get_snapshot("org", "repo", SHA)
+        assert api.call_count == 2
+        assert loaded_snapshot("org", "repo", SHA) is None
+
+    def test_absent_files_are_not_requested(self):
+        with _patch_api(TREE):
+            get_snapshot("org", "repo", SHA)
+        with mock.patch("verify_action_build.file_provider.http_session.get") as get:
+            assert fetch_file_from_github("org", "repo", SHA, "package-lock.json") is None
+        get.assert_not_called()
+
+
+def test_list_tree_via_git(bare_repo):
+    remote_url, sha = bare_repo
+    with mock.patch.object(repo_snapshot, "GIT_REMOTE_URL", remote_url):
+        blobs, top_level = repo_snapshot._list_tree_via_git("org", "repo", sha)
+    assert set(blobs) == {"action.yml", "src/index.ts"}
+    assert top_level == {"action.yml", "src"}
+    assert all(len(blob) == 40 for blob in blobs.values())
+
+
+def test_list_tree_via_git_failure():
+    with mock.patch.object(repo_snapshot, "GIT_REMOTE_URL", "file:///nonexistent/{org}/{repo}.git"):
+        assert repo_snapshot._list_tree_via_git("org", "repo", SHA) is None
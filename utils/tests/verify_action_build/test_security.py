@@ -2043,7 +2043,7 @@ class TestFetchReleaseAssetBytes:
             return resp
 
         with mock.patch(
-            "verify_action_build.security.requests.get",
+            "verify_action_build.security.http_session.get",
             side_effect=fake_get,
         ):
             name, content = _fetch_release_asset_bytes(
@@ -2073,7 +2073,7 @@ class TestFetchReleaseAssetBytes:
             return resp
 
         with mock.patch(
-            "verify_action_build.security.requests.get",
+            "verify_action_build.security.http_session.get",
             side_effect=fake_get,
         ):
             name, content = _fetch_release_asset_bytes(
@@ -0,0 +1,165 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+import os
+import subprocess
+from unittest import mock
+
+import pytest
+
+from verify_action_build import toolchain_image
+from verify_action_build.toolchain_image import (
+    TOOLCHAIN_LABEL,
+    ToolchainImage,
+    ToolchainStats,
+    _marker_path,
+    detect_toolchain,
+    ensure_toolchain_image,
+    prune_toolchain_images,
+    toolchain_tag,
+)
+
+
+def _completed(returncode=0, stdout=""):
+    return subprocess.CompletedProcess([], returncode, stdout=stdout, stderr="")
+
+
+class FakeDocker:
+    """Stands in for the docker CLI, tracking which images exist."""
+
+    def __init__(self, images=()):
+        self.images = set(images)
+        self.builds = []
+        self.removed = []
+
+    def __call__(self, cmd, **kwargs):
+        if cmd[1:3] == ["image", "inspect"]:
+            return _completed(0 if cmd[-1] in self.images else 1)
+        if cmd[1] == "build":
+            tag = cmd[cmd.index("-t") + 1]
+            self.builds.append(cmd)
+            self.images.add(tag)
+            return _completed()
+        if cmd[1:3] == ["image", "ls"]:
+            assert f"label={TOOLCHAIN_LABEL}" in cmd
+            return _completed(stdout="".join(f"{tag}\n" for tag in sorted(self.images)))
+        if cmd[1] == "rmi":
+            self.images.discard(cmd[2])
+            self.removed.append(cmd[2])
+            return _completed()
+        raise AssertionError(f"unexpected command {cmd}")
+
+
+def _patch_docker(fake):
+    return mock.patch("verify_action_build.toolchain_image.subprocess.run", side_effect=fake)
+
+
+class TestToolchainTag:
+    def test_tags(self):
+        assert toolchain_tag("20") == "verify-action-toolchain:node20"
+        assert toolchain_tag("24", dart=True) == "verify-action-toolchain:node24-dart"
+        assert toolchain_tag("20", deno=True) == "verify-action-toolchain:node20-deno"
+
+
+class TestDetectToolchain:
+    def test_detects_from_root_files(self):
+        files = {"pubspec.yaml": b"name: x\n", "deno.jsonc": b"{}"}
+        provider = mock.Mock()
+        provider.read_bytes.side_effect = files.get
+        with mock.patch("verify_action_build.toolchain_image.provider_for", return_value=provider):
+            assert detect_toolchain("org", "repo", "a" * 40) == (True, True)
+            files.clear()
+            assert detect_toolchain("org", "repo", "a" * 40) == (False, False)
+
+
+class TestEnsureToolchainImage:
+    def test_miss_then_hit(self):
+        fake = FakeDocker()
+        stats = ToolchainStats()
+        with _patch_docker(fake), mock.patch.object(toolchain_image, "toolchain_stats", stats):
+            first = ensure_toolchain_image("20", dart=True)
+            second = ensure_toolchain_image("20", dart=True)
+        assert not first.hit
+        assert second.hit
+        assert second.build_seconds == round(first.build_seconds, 1)
+        assert len(fake.builds) == 1
+        build = fake.builds[0]
+        assert "NODE_VERSION=20" in build
+        assert "INSTALL_DART=1" in build
+        assert "INSTALL_DENO=" in build
+        assert "cache miss" in stats.summary()
+        assert "node20-dart cache hit, saved ~" in stats.summary()
+
+    def test_no_cache_rebuilds(self):
+        tag = toolchain_tag("20")
+        fake = FakeDocker({tag})
+        with _patch_docker(fake):
+            image = ensure_toolchain_image("20", cache=False)
+        assert not image.hit
+        assert "--no-cache" in fake.builds[0]
+
+    def test_hit_without_marker(self):
+        fake = FakeDocker({toolchain_tag("20")})
+        with _patch_docker(fake):
+            image = ensure_toolchain_image("20")
+        assert image.hit
+        assert image.build_seconds is None
+        assert image.describe() == "node20 cache hit"
+        assert _marker_path(image.tag).exists()
+
+    def test_build_failure_raises(self):
+        with mock.patch(
+            "verify_action_build.toolchain_image.subprocess.run",
+            side_effect=[_completed(1), _completed(1)],
+        ):
+            with pytest.raises(subprocess.CalledProcessError):
+                ensure_toolchain_image("20")
+
+
+class TestPruneToolchainImages:
+    def test_removes_least_recently_used(self):
+        tags = [toolchain_tag(v) for v in ("18", "20", "22", "24")]
+        for age, tag in enumerate(reversed(tags)):
+            path = _marker_path(tag)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("{}")
+            os.utime(path, (1000 - age, 1000 - age))
+        fake = FakeDocker({*tags, "verify-action-toolchain:node16"})
+        with _patch_docker(fake):
+            removed = prune_toolchain_images(max_images=2, keep=tags[0])
+        # node16 has no marker, node18 is kept despite being the oldest.
+        assert sorted(removed) == ["verify-action-toolchain:node16", tags[1]]
+        assert fake.images == {tags[0], tags[2], tags[3]}
+        assert not _marker_path(tags[1]).exists()
+
+    def test_docker_failure_is_ignored(self):
+        with mock.patch(
+            "verify_action_build.toolchain_image.subprocess.run", return_value=_completed(1),
+        ):
+            assert prune_toolchain_images() == []
+
+
+class TestToolchainStats:
+    def test_summary(self):
+        stats = ToolchainStats()
+        assert stats.summary() is None
+        stats.record(ToolchainImage("verify-action-toolchain:node20", hit=False, build_seconds=41.6))
+        stats.record(ToolchainImage("verify-action-toolchain:node20", hit=True, build_seconds=41.6))
+        assert stats.summary() == "node20 cache miss, built in 42s; node20 cache hit, saved ~42s"
+        stats.reset()
+        assert stats.summary() is None
@@ -16,11 +16,19 @@
 # specific language governing permissions and limitations
 # under the License.
 #
+import multiprocessing
+import subprocess
+import time
+from concurrent.futures import Future
 from pathlib import Path
 from unittest import mock
 
+import pytest
+
 from verify_action_build.verification import (
     SECURITY_CHECKLIST_URL,
+    _BackgroundBuild,
+    _build_in_worker,
     show_verification_summary,
     verify_single_action,
 )
@@ -257,6 +265,161 @@ class TestVerifySingleActionLockFileRetry:
         assert "approved lock files" in js_rows[0][2]
 
 
+class ImmediateExecutor:
+    """Stands in for the background executors: runs each task on submit."""
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class ImmediateBuild:
+    """Stands in for _BackgroundBuild: runs the build on creation."""
+
+    last = None
+
+    def __init__(self, kwargs):
+        self.outcome = _build_in_worker(kwargs)
+        self.collected = False
+        self.cancelled = False
+        ImmediateBuild.last = self
+
+    def result(self):
+        self.collected = True
+        return self.outcome
+
+    def cancel(self):
+        if not self.collected:
+            self.cancelled = True
+
+
+class TestVerifySingleActionParallelBuilds:
+    """With parallel_builds, the retry build and source clone start up front."""
+
+    _patch_stack = TestVerifySingleActionLockFileRetry._patch_stack
+    _stop = TestVerifySingleActionLockFileRetry._stop
+
+    def _parallel_patches(self):
+        return [
+            ("background_build", mock.patch(
+                "verify_action_build.verification._BackgroundBuild", ImmediateBuild,
+            )),
+            ("thread_pool", mock.patch(
+                "verify_action_build.verification.ThreadPoolExecutor", ImmediateExecutor,
+            )),
+            ("clone_repo", mock.patch("verify_action_build.verification.clone_repo")),
+        ]
+
+    def test_retry_result_used_on_mismatch(self):
+        started = self._patch_stack(
+            approved=[{"hash": "b" * 40, "version": "v1.0.0"}],
+            diff_js_side_effect=[False, True],
+            extra_patches=self._parallel_patches(),
+        )
+        try:
+            result = verify_single_action(
+                "org/repo@" + "c" * 40, ci_mode=True, parallel_builds=True,
+            )
+            build_mock = started["build_in_docker"]
+            assert build_mock.call_count == 2
+            # The retry build was started first, in its own work dir.
+            retry_call = build_mock.call_args_list[0]
+            assert retry_call.kwargs["approved_hash"] == "b" * 40
+            assert retry_call.kwargs["work_dir"].name == "retry"
+            assert started["diff_js_files"].call_count == 2
+            started["clone_repo"].assert_called_once()
+            assert ImmediateBuild.last.collected and not ImmediateBuild.last.cancelled
+        finally:
+            self._stop(started)
+        assert result is False
+
+    def test_retry_result_unused_on_match(self):
+        started = self._patch_stack(
+            approved=[{"hash": "b" * 40, "version": "v1.0.0"}],
+            diff_js_side_effect=[True],
+            extra_patches=self._parallel_patches(),
+        )
+        try:
+            result = verify_single_action(
+                "org/repo@" + "c" * 40, ci_mode=True, parallel_builds=True,
+            )
+            assert started["build_in_docker"].call_count == 2
+            assert started["diff_js_files"].call_count == 1
+            # The retry build is stopped rather than waited for
+            assert ImmediateBuild.last.cancelled and not ImmediateBuild.last.collected
+        finally:
+            self._stop(started)
+        assert result is True
+
+    def test_retry_build_error_is_raised(self):
+        started = self._patch_stack(
+            approved=[{"hash": "b" * 40, "version": "v1.0.0"}],
+            diff_js_side_effect=[False],
+            extra_patches=self._parallel_patches(),
+        )
+        started["build_in_docker"].side_effect = [
+            subprocess.CalledProcessError(1, ["docker", "build"]),
+            _build_in_docker_result(),
+        ]
+        try:
+            with pytest.raises(subprocess.CalledProcessError):
+                verify_single_action("org/repo@" + "c" * 40, ci_mode=True, parallel_builds=True)
+        finally:
+            self._stop(started)
+
+    def test_no_background_work_without_approved_versions(self):
+        started = self._patch_stack(
+            approved=[],
+            diff_js_side_effect=[True],
+            extra_patches=self._parallel_patches(),
+        )
+        try:
+            verify_single_action("org/repo@" + "c" * 40, ci_mode=True, parallel_builds=True)
+            assert started["build_in_docker"].call_count == 1
+            started["clone_repo"].assert_not_called()
+        finally:
+            self._stop(started)
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="the worker process only sees the patched build_in_docker when forked",
+)
+class TestBackgroundBuild:
+    KWARGS = dict(org="org", repo="repo", commit_hash="c" * 40, approved_hash="b" * 40)
+
+    def test_result(self):
+        with mock.patch(
+            "verify_action_build.verification.build_in_docker", return_value=("built",),
+        ), mock.patch("verify_action_build.verification.remove_build") as remove:
+            build = _BackgroundBuild(self.KWARGS)
+            assert build.result() == (("built",), "", None)
+            build.cancel()
+        remove.assert_not_called()
+
+    def test_cancel_does_not_wait_for_the_build(self):
+        with mock.patch(
+            "verify_action_build.verification.build_in_docker",
+            side_effect=lambda **kwargs: time.sleep(60),
+        ), mock.patch("verify_action_build.verification.remove_build") as remove:
+            build = _BackgroundBuild(self.KWARGS)
+            started = time.monotonic()
+            build.cancel()
+            assert time.monotonic() - started < 10
+        assert not build._process.is_alive()
+        remove.assert_called_once_with("org", "repo", "c" * 40, "b" * 40)
+
+
 class TestVerifySingleActionResultMessage:
     """The RESULT panel text must describe the actual failure cause."""
 
@@ -22,9 +22,8 @@ import re
 import sys
 from functools import lru_cache
 
-import requests
-
 from .console import console
+from .file_provider import provider_for
 
 
 def parse_action_ref(ref: str) -> tuple[str, str, str, str]:
@@ -52,34 +51,25 @@ def fetch_action_yml(org: str, repo: str, commit_hash: str, sub_path: str = "")
     """Fetch action.yml content from GitHub at a specific commit.
 
     Cached so that multiple security checks walking the same action graph
-    only pay the HTTP cost once per (org, repo, commit, sub_path).
+    only pay the HTTP cost once per (org, repo, commit, sub_path); at a
+    pinned SHA the files are also cached on disk across runs.
     """
     candidates = []
     if sub_path:
         candidates.extend([f"{sub_path}/action.yml", f"{sub_path}/action.yaml"])
     candidates.extend(["action.yml", "action.yaml"])
 
+    provider = provider_for(org, repo, commit_hash)
     for path in candidates:
-        url = f"https://raw.githubusercontent.com/{org}/{repo}/{commit_hash}/{path}"
-        try:
-            resp = requests.get(url, timeout=10)
-            if resp.ok:
-                return resp.text
-        except requests.RequestException:
-            continue
+        content = provider.read_text(path)
+        if content is not None:
+            return content
     return None
 
 
 def fetch_file_from_github(org: str, repo: str, commit_hash: str, path: str) -> str | None:
-    """Fetch a file's content from GitHub at a specific commit."""
-    url = f"https://raw.githubusercontent.com/{org}/{repo}/{commit_hash}/{path}"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.ok:
-            return resp.text
-    except requests.RequestException:
-        pass
-    return None
+    """Fetch a file's content from GitHub at a specific commit (see file_provider)."""
+    return provider_for(org, repo, commit_hash).read_text(path)
 
 
 def extract_composite_uses(action_yml_content: str) -> list[dict]:
@@ -22,10 +22,16 @@ import argparse
 import os
 import shutil
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from .console import console
+from rich.table import Table
+
+from .console import buffered_console, console
 from .dependabot import check_dependabot_prs
 from .github_client import GitHubClient
+from .http_session import gh_auth_token
+from .package_cache import wipe_package_cache
 from .pr_extraction import extract_action_refs_from_diff
 from .verification import SECURITY_CHECKLIST_URL, verify_single_action
 
@@ -35,6 +41,76 @@ def _exit(code: int) -> None:
     sys.exit(code)
 
 
+def _verify_in_worker(ref: str, gh: GitHubClient, options: dict) -> tuple[bool, str, float]:
+    """Verify *ref* in a worker process.
+
+    Returns (passed, buffered console output, duration in seconds).  Each
+    verification builds in its own temporary work dir, so workers do not
+    share any state on disk.
+    """
+    started = time.monotonic()
+    with buffered_console() as captured:
+        try:
+            passed = verify_single_action(ref, gh=gh, ci_mode=True, **options)
+        except SystemExit:
+            passed = False
+        except Exception:
+            console.print_exception()
+            passed = False
+    return passed, captured[0], time.monotonic() - started
+
+
+def _show_results_summary(results: dict[str, tuple[bool, float]]) -> None:
+    """Show a table with the outcome of each verified action ref."""
+    console.print()
+    console.rule("[bold]Verification Results[/bold]")
+    table = Table(show_header=True, border_style="blue")
+    table.add_column("Action", style="bold", min_width=30)
+    table.add_column("Result", min_width=6, justify="center")
+    table.add_column("Duration", justify="right")
+    for ref, (passed, seconds) in results.items():
+        icon = "[green]✓[/green]" if passed else "[red]✗[/red]"
+        table.add_row(ref, icon, f"{seconds:.0f}s")
+    console.print(table)
+
+
+def verify_action_refs(
+    action_refs: list[str], gh: GitHubClient, jobs: int = 1,
+    ci_mode: bool = False, **options,
+) -> bool:
+    """Verify several action refs, in up to *jobs* worker processes.
+
+    With a single job the refs are verified one after another, stopping at
+    the first failure.  Otherwise every ref is verified, non-interactively;
+    the output of each verification is buffered and printed once it
+    finishes, followed by a summary table.
+    """
+    if jobs <= 1 or len(action_refs) <= 1:
+        return all(
+            verify_single_action(ref, gh=gh, ci_mode=ci_mode, **options)
+            for ref in action_refs
+        )
+
+    refs = list(dict.fromkeys(action_refs))
+    console.print(
+        f"Verifying {len(refs)} action references with {min(jobs, len(refs))} parallel jobs..."
+    )
+    results: dict[str, tuple[bool, float]] = {}
+    with ProcessPoolExecutor(max_workers=min(jobs, len(refs))) as pool:
+        futures = {pool.submit(_verify_in_worker, ref, gh, options): ref for ref in refs}
+        for future in as_completed(futures):
+            ref = futures[future]
+            passed, buffered, seconds = future.result()
+            results[ref] = (passed, seconds)
+            console.print()
+            console.rule(f"[bold]{ref}[/bold]")
+            console.file.write(buffered)
+            console.file.flush()
+
+    _show_results_summary({ref: results[ref] for ref in refs})
+    return all(passed for passed, _ in results.values())
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Verify compiled JS in a GitHub Action matches a local rebuild.",
@@ -67,6 +143,16 @@ def main() -> None:
         metavar="N",
         help="Extract action reference from PR #N and verify it",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "With --from-pr, verify up to N action references in parallel. "
+            "Parallel verification is non-interactive, as with --ci"
+        ),
+    )
     parser.add_argument(
         "--ci",
         action="store_true",
@@ -92,17 +178,62 @@ def main() -> None:
             "the file has no detectable checksum/signature verification."
         ),
     )
+    parser.add_argument(
+        "--clone",
+        action="store_true",
+        help=(
+            "Read the action's files for the security checks from a local "
+            "shallow clone of the commit instead of fetching each over HTTP"
+        ),
+    )
+    parser.add_argument(
+        "--package-cache",
+        action="store_true",
+        help=(
+            "Keep the npm/yarn/pnpm download caches of the rebuild in BuildKit "
+            "cache mounts and reuse them across runs. Lock file integrity "
+            "checks still apply"
+        ),
+    )
+    parser.add_argument(
+        "--wipe-package-cache",
+        action="store_true",
+        help="Remove the package caches kept by --package-cache, then continue with any other command",
+    )
+    parser.add_argument(
+        "--parallel-builds",
+        action="store_true",
+        help=(
+            "When the action has approved versions, run the rebuild with the "
+            "approved lock files and the source clone for the approved-version "
+            "diff alongside the primary rebuild, instead of after it"
+        ),
+    )
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
 
     ci_mode = args.ci
     cache = not args.no_cache
     show_build_steps = args.show_build_steps
     check_binary_downloads = not args.no_binary_download_check
+    clone = args.clone
+    package_cache = args.package_cache
+    parallel_builds = args.parallel_builds
 
     if not shutil.which("docker"):
         console.print("[red]Error:[/red] docker is required but not found in PATH")
         _exit(1)
 
+    if args.wipe_package_cache:
+        if wipe_package_cache():
+            console.print("  [green]✓[/green] Package cache wiped")
+        else:
+            console.print("[red]Error:[/red] could not wipe the package cache (docker builder prune failed)")
+            _exit(1)
+        if not (args.action_ref or args.from_pr or args.check_dependabot_prs):
+            _exit(0)
+
     # Build the GitHub client
     if args.no_gh:
         if not args.github_token:
@@ -119,7 +250,9 @@ def main() -> None:
                 "Either install gh or use --no-gh with a --github-token."
             )
             _exit(1)
-        gh = GitHubClient(token=args.github_token)
+        # With the gh CLI's token, API calls run in-process over a pooled
+        # session instead of forking gh for every request.
+        gh = GitHubClient(token=args.github_token or gh_auth_token())
 
     if args.from_pr:
         diff_text = gh.get_pr_diff(args.from_pr)
@@ -135,25 +268,25 @@ def main() -> None:
             _exit(0)
         for ref in action_refs:
             console.print(f"  Extracted action reference from PR #{args.from_pr}: [bold]{ref}[/bold]")
-        passed = all(
-            verify_single_action(
-                ref, gh=gh, ci_mode=ci_mode, cache=cache,
-                show_build_steps=show_build_steps,
-                check_binary_downloads=check_binary_downloads,
-            )
-            for ref in action_refs
+        passed = verify_action_refs(
+            action_refs, gh, jobs=args.jobs, ci_mode=ci_mode, cache=cache,
+            show_build_steps=show_build_steps,
+            check_binary_downloads=check_binary_downloads, clone=clone,
+            package_cache=package_cache, parallel_builds=parallel_builds,
         )
         _exit(0 if passed else 1)
     elif args.check_dependabot_prs:
         check_dependabot_prs(
             gh=gh, cache=cache, show_build_steps=show_build_steps,
-            check_binary_downloads=check_binary_downloads,
+            check_binary_downloads=check_binary_downloads, clone=clone,
+            package_cache=package_cache, parallel_builds=parallel_builds,
         )
     elif args.action_ref:
         passed = verify_single_action(
             args.action_ref, gh=gh, ci_mode=ci_mode, cache=cache,
             show_build_steps=show_build_steps,
-            check_binary_downloads=check_binary_downloads,
+            check_binary_downloads=check_binary_downloads, clone=clone,
+            package_cache=package_cache, parallel_builds=parallel_builds,
         )
         _exit(0 if passed else 1)
     else:
@@ -20,6 +20,8 @@
 
 import os
 import subprocess
+from contextlib import contextmanager
+from typing import Iterator
 
 from rich.console import Console
 
@@ -30,6 +32,25 @@ console = Console(stderr=True, **_ci_console_options)
 output = Console(**_ci_console_options)
 
 
+@contextmanager
+def buffered_console() -> Iterator[list[str]]:
+    """Capture everything printed to ``console`` within the block.
+
+    The rendered output (with terminal styling, when attached to one) is
+    appended to the yielded list when the block exits.  Status spinners are
+    disabled meanwhile, as nothing is shown until the output is replayed.
+    """
+    captured: list[str] = []
+    interactive = console.is_interactive
+    console.is_interactive = False
+    console.begin_capture()
+    try:
+        yield captured
+    finally:
+        captured.append(console.end_capture())
+        console.is_interactive = interactive
+
+
 def link(url: str, text: str) -> str:
     """Return Rich-markup hyperlink, falling back to plain text in CI."""
     if _is_ci:
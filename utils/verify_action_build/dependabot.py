@@ -37,7 +37,8 @@ def get_gh_user(gh: GitHubClient | None = None) -> str:
 
 def check_dependabot_prs(
     gh: GitHubClient, cache: bool = True, show_build_steps: bool = False,
-    check_binary_downloads: bool = True,
+    check_binary_downloads: bool = True, clone: bool = False,
+    package_cache: bool = False, parallel_builds: bool = False,
 ) -> None:
     """List open dependabot PRs, verify each, and optionally merge."""
     console.print()
@@ -163,14 +164,16 @@ def check_dependabot_prs(
                         sub_ref = f"{org_repo}@{commit_hash}"
                     if not verify_single_action(
                         sub_ref, gh=gh, cache=cache, show_build_steps=show_build_steps,
-                        check_binary_downloads=check_binary_downloads,
+                        check_binary_downloads=check_binary_downloads, clone=clone,
+                        package_cache=package_cache, parallel_builds=parallel_builds,
                     ):
                         passed = False
             else:
                 if not verify_single_action(
                     f"{org_repo}@{commit_hash}", gh=gh, cache=cache,
                     show_build_steps=show_build_steps,
-                    check_binary_downloads=check_binary_downloads,
+                    check_binary_downloads=check_binary_downloads, clone=clone,
+                    package_cache=package_cache, parallel_builds=parallel_builds,
                 ):
                     passed = False
 
@@ -18,12 +18,16 @@
 #
 """JavaScript beautification and compiled JS comparison."""
 
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import jsbeautifier
 
 from .console import console, link
 from .diff_display import show_colored_diff
+from .disk_cache import DiskCache
 
 # Extensions emitted by action build toolchains. `.js` is the common case
 # (webpack/ncc/tsc); `.cjs` is what esbuild/rollup write when the source
@@ -42,8 +46,19 @@ def _collect_compiled_js(base: Path) -> set[Path]:
     return found
 
 
-def beautify_js(content: str) -> str:
-    """Reformat JavaScript for readable diffing."""
+# jsbeautifier is pure Python and takes tens of seconds on a multi-MB
+# bundle, so its output is kept on disk by content hash (see disk_cache).
+# Bump BEAUTIFY_CACHE_VERSION when changing the options below.
+BEAUTIFY_CACHE_VERSION = "1"
+BEAUTIFIED_CACHE_MAX_BYTES = 512 * 1024 * 1024
+beautified_cache = DiskCache("beautified-js", max_bytes=BEAUTIFIED_CACHE_MAX_BYTES)
+
+# Below this much JS in total, starting worker processes costs more than
+# beautifying in this one.
+PARALLEL_MIN_BYTES = 256 * 1024
+
+
+def _beautify_uncached(content: str) -> str:
     opts = jsbeautifier.default_options()
     opts.indent_size = 2
     opts.wrap_line_length = 120
@@ -52,6 +67,58 @@ def beautify_js(content: str) -> str:
     return "\n".join(lines) + "\n"
 
 
+def _cache_key(content: str) -> tuple[str, ...]:
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    return (BEAUTIFY_CACHE_VERSION, jsbeautifier.__version__, digest)
+
+
+def _cached(content: str) -> str | None:
+    hit, cached = beautified_cache.get(_cache_key(content))
+    return cached.decode() if hit and cached is not None else None
+
+
+def _store(content: str, beautified: str) -> None:
+    beautified_cache.put(_cache_key(content), beautified.encode())
+
+
+def beautify_js(content: str) -> str:
+    """Reformat JavaScript for readable diffing."""
+    beautified = _cached(content)
+    if beautified is None:
+        beautified = _beautify_uncached(content)
+        _store(content, beautified)
+    return beautified
+
+
+def beautify_many(contents: list[str]) -> dict[str, str]:
+    """Beautify several JavaScript sources, keyed by content.
+
+    Each distinct content is beautified once; cached results are reused and
+    the rest are spread over worker processes when there is enough of it.
+    """
+    results: dict[str, str] = {}
+    pending: list[str] = []
+    for content in dict.fromkeys(contents):
+        cached = _cached(content)
+        if cached is None:
+            pending.append(content)
+        else:
+            results[content] = cached
+
+    workers = min(len(pending), os.cpu_count() or 1)
+    if workers > 1 and sum(len(c) for c in pending) >= PARALLEL_MIN_BYTES:
+        # Largest first, so one big bundle does not start last.
+        pending.sort(key=len, reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            beautified = list(pool.map(_beautify_uncached, pending))
+    else:
+        beautified = [_beautify_uncached(content) for content in pending]
+    for content, output in zip(pending, beautified):
+        _store(content, output)
+        results[content] = output
+    return results
+
+
 def diff_js_files(
     original_dir: Path, rebuilt_dir: Path, org: str, repo: str, commit_hash: str,
     out_dir_name: str = "dist",
@@ -127,17 +194,46 @@ def diff_js_files(
             if full_path.exists() and rel_path not in all_js_contents:
                 all_js_contents[rel_path] = full_path.read_text(errors="replace")
 
+    referenced_by = {
+        rel_path: [
+            other
+            for other, content in all_js_contents.items()
+            if other != rel_path and rel_path.name in content
+        ]
+        for rel_path in all_files
+        if rel_path.name in ignored_files
+    }
+
+    # Read the published files to compare up front.  Byte-identical pairs
+    # need no beautification; the remaining files are beautified together,
+    # in parallel and through the cache, before the results are shown.
+    raw_files: dict[Path, tuple[bytes, bytes | None]] = {}
     for rel_path in all_files:
-        if rel_path.name in ignored_files:
-            referenced_by = [
-                other
-                for other, content in all_js_contents.items()
-                if other != rel_path and rel_path.name in content
-            ]
-            if referenced_by:
+        if rel_path in referenced_by and not referenced_by[rel_path]:
+            continue
+        if rel_path in kept_files or rel_path not in original_files:
+            continue
+        orig_bytes = (original_dir / rel_path).read_bytes()
+        built_bytes = (rebuilt_dir / rel_path).read_bytes() if rel_path in rebuilt_files else None
+        raw_files[rel_path] = (orig_bytes, built_bytes)
+    to_beautify = [
+        content.decode(errors="replace")
+        for orig_bytes, built_bytes in raw_files.values()
+        if orig_bytes != built_bytes
+        for content in (orig_bytes, built_bytes)
+        if content is not None
+    ]
+    beautified: dict[str, str] = {}
+    if to_beautify:
+        with console.status(f"[dim]Beautifying {len(to_beautify)} file(s)...[/dim]"):
+            beautified = beautify_many(to_beautify)
+
+    for rel_path in all_files:
+        if rel_path in referenced_by:
+            if referenced_by[rel_path]:
                 console.print(
                     f"  [yellow]![/yellow] {rel_path} is in the ignore list but is "
-                    f"referenced by: {', '.join(str(r) for r in referenced_by)} "
+                    f"referenced by: {', '.join(str(r) for r in referenced_by[rel_path])} "
                     f"— [bold]comparing anyway[/bold]"
                 )
             else:
@@ -147,9 +243,6 @@ def diff_js_files(
                 )
                 continue
 
-        orig_file = original_dir / rel_path
-        built_file = rebuilt_dir / rel_path
-
         file_link = link(f"{blob_url}/{out_dir_name}/{rel_path}", str(rel_path))
 
         if rel_path in kept_files:
@@ -171,18 +264,19 @@ def diff_js_files(
 
         if rel_path not in rebuilt_files:
             console.print(f"  [red]-[/red] {file_link} [dim](only in original)[/dim]")
-            with console.status(f"[dim]Beautifying {rel_path}...[/dim]"):
-                orig_content = beautify_js(orig_file.read_text(errors="replace"))
-            show_colored_diff(rel_path, orig_content, "")
+            orig_bytes, _ = raw_files[rel_path]
+            show_colored_diff(rel_path, beautified[orig_bytes.decode(errors="replace")], "")
             all_match = False
             continue
 
-        orig_raw = orig_file.read_text(errors="replace")
-        built_raw = built_file.read_text(errors="replace")
+        orig_bytes, built_bytes = raw_files[rel_path]
+        if orig_bytes == built_bytes:
+            console.print(f"  [green]✓[/green] {file_link} [green](identical)[/green]")
+            continue
 
-        with console.status(f"[dim]Beautifying {rel_path}...[/dim]"):
-            orig_content = beautify_js(orig_raw)
-            built_content = beautify_js(built_raw)
+        orig_raw = orig_bytes.decode(errors="replace")
+        orig_content = beautified[orig_raw]
+        built_content = beautified[built_bytes.decode(errors="replace")]
 
         if orig_content == built_content:
             console.print(f"  [green]✓[/green] {file_link} [green](identical)[/green]")
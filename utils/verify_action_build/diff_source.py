@@ -28,10 +28,23 @@ from .diff_display import show_colored_diff
 from .diff_js import beautify_js
 
 
+def clone_repo(org: str, repo: str, clone_dir: Path) -> Path:
+    """Clone ``org/repo`` into *clone_dir* without checking out a commit.
+
+    The clone has every commit, so it serves any approved version.
+    """
+    run(
+        ["git", "clone", "--no-checkout", f"https://github.com/{org}/{repo}.git", str(clone_dir)],
+        capture_output=True,
+    )
+    return clone_dir
+
+
 def diff_approved_vs_new(
     org: str, repo: str, approved_hash: str, new_hash: str, work_dir: Path,
     ci_mode: bool = False,
     include_dist_files: set[Path] | None = None,
+    clone_dir: Path | None = None,
 ) -> None:
     """Diff source files between an approved version and the new version.
 
@@ -40,6 +53,9 @@ def diff_approved_vs_new(
     the approved version. Used for non-minified compiled JS that the rebuild
     step intentionally skips. JS/CJS/MJS files in this set are beautified
     before diffing so the output is readable.
+
+    *clone_dir* is a clone made earlier with :func:`clone_repo`; without
+    it the repository is cloned into *work_dir*.
     """
     include_dist_files = include_dist_files or set()
     console.print()
@@ -50,8 +66,6 @@ def diff_approved_vs_new(
     approved_dir.mkdir(exist_ok=True)
     new_dir.mkdir(exist_ok=True)
 
-    repo_url = f"https://github.com/{org}/{repo}.git"
-
     excluded_dirs = {"dist", "node_modules", ".git", ".github", "__tests__", "__mocks__"}
     lock_files = {
         "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb",
@@ -60,11 +74,8 @@ def diff_approved_vs_new(
     source_extensions = {".js", ".ts", ".mjs", ".cjs", ".mts", ".cts", ".json", ".yml", ".yaml"}
 
     with console.status("[bold blue]Fetching source from both versions...[/bold blue]"):
-        clone_dir = work_dir / "repo-clone"
-        run(
-            ["git", "clone", "--no-checkout", repo_url, str(clone_dir)],
-            capture_output=True,
-        )
+        if clone_dir is None:
+            clone_dir = clone_repo(org, repo, work_dir / "repo-clone")
 
         skipped_dirs: set[str] = set()
 
@@ -0,0 +1,128 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+"""Persistent on-disk cache for immutable content.
+
+Entries live under ``~/.cache/verify-action-build/<name>/`` (honouring
+``$XDG_CACHE_HOME``, or ``$VERIFY_ACTION_BUILD_CACHE_DIR`` to relocate the
+whole cache).  Keys are tuples of strings, hashed into the file name, so
+the cache only suits content that never changes for a given key — e.g.
+files at a pinned commit SHA.  There is no expiry; when an entry is
+written and the cache has grown past its size limit, the least recently
+used entries are evicted.  Deleting the directory is always safe.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+# Negative entries are empty files, but still cost a directory entry and
+# an inode; account for them so they are evicted eventually too.
+_MIN_ENTRY_BYTES = 512
+_MISSING_SUFFIX = ".missing"
+
+
+def cache_root() -> Path:
+    """Return the directory holding all verify-action-build caches."""
+    override = os.environ.get("VERIFY_ACTION_BUILD_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "verify-action-build"
+
+
+class DiskCache:
+    """Least-recently-used cache of byte strings, bounded by total size.
+
+    ``None`` can be stored as a negative entry, for content known not to
+    exist (e.g. a 404).  I/O errors are never raised: an unreadable entry
+    is a miss, and a failed write is dropped.
+    """
+
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._written_since_prune = 0
+        self._pruned = False
+
+    @property
+    def directory(self) -> Path:
+        return cache_root() / self.name
+
+    def _path(self, key: tuple[str, ...]) -> Path:
+        digest = hashlib.sha256("\0".join(key).encode()).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def get(self, key: tuple[str, ...]) -> tuple[bool, bytes | None]:
+        """Return ``(hit, content)``; *content* is None for a negative entry."""
+        path = self._path(key)
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+            return True, content
+        except OSError:
+            pass
+        missing = path.with_name(path.name + _MISSING_SUFFIX)
+        try:
+            os.utime(missing)
+            return True, None
+        except OSError:
+            return False, None
+
+    def put(self, key: tuple[str, ...], content: bytes | None) -> None:
+        """Store *content* for *key*, or a negative entry when it is None."""
+        path = self._path(key)
+        if content is None:
+            path = path.with_name(path.name + _MISSING_SUFFIX)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+                f.write(content or b"")
+            os.replace(f.name, path)
+        except OSError:
+            return
+        # Scanning the cache costs a stat per entry, so prune on the first
+        # write of each run and then only after a tenth of the limit is written.
+        self._written_since_prune += max(len(content or b""), _MIN_ENTRY_BYTES)
+        if not self._pruned or self._written_since_prune > self.max_bytes // 10:
+            self.prune()
+
+    def prune(self) -> None:
+        """Evict least recently used entries until the cache fits its size limit."""
+        self._pruned = True
+        self._written_since_prune = 0
+        entries = []
+        total = 0
+        try:
+            for path in self.directory.glob("*/*"):
+                stat = path.stat()
+                size = max(stat.st_size, _MIN_ENTRY_BYTES)
+                entries.append((stat.st_mtime, size, path))
+                total += size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
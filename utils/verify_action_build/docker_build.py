@@ -18,17 +18,27 @@
 #
 """Docker-based action building and artifact extraction."""
 
+import os
 import re
 import subprocess
+import tarfile
 from pathlib import Path
+from typing import IO
 
 import requests
 
 from rich.panel import Panel
 from rich.table import Table
 
+from . import http_session
 from .console import console, link, run
 from .github_client import GitHubClient
+from .package_cache import STATS_PATH, package_cache_stats, parse_stats, with_package_cache
+from .toolchain_image import detect_toolchain, ensure_toolchain_image
+
+# build_action.Dockerfile writes everything read back into this directory.
+ARTIFACTS_PATH = "/artifacts"
+STATS_NAME = STATS_PATH.removeprefix(f"{ARTIFACTS_PATH}/")
 
 # Path to the Dockerfile template shipped with this package
 _DOCKERFILE_PATH = Path(__file__).resolve().parent / "dockerfiles" / "build_action.Dockerfile"
@@ -56,7 +66,7 @@ def detect_node_version(
     for path in candidates:
         url = f"https://raw.githubusercontent.com/{org}/{repo}/{commit_hash}/{path}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = http_session.get(url, timeout=10)
             if not resp.ok:
                 continue
             for line in resp.text.splitlines():
@@ -97,6 +107,93 @@ def _print_docker_build_steps(build_result: subprocess.CompletedProcess[str]) ->
         console.print()
 
 
+def _split_artifact_name(name: str) -> tuple[str, str] | None:
+    """Split ``artifacts/<top>/<rest>`` into ``(top, rest)``; None outside artifacts/."""
+    parts = name.split("/")
+    if len(parts) < 2 or parts[0] != Path(ARTIFACTS_PATH).name:
+        return None
+    return parts[1], "/".join(parts[2:])
+
+
+def read_artifacts(stream: IO[bytes], trees: dict[str, Path]) -> dict[str, str]:
+    """Unpack an artifacts tar stream in one pass.
+
+    Members under each top-level directory named in *trees* are written
+    below the matching local directory, as they arrive; members that would
+    land outside it are skipped.  The top-level files (out-dir.txt,
+    kept-js.log, ...) are returned by name, decoded.
+
+    Raises:
+        tarfile.TarError: If the stream is not a tar archive.
+    """
+    manifest: dict[str, str] = {}
+    with tarfile.open(fileobj=stream, mode="r|") as tar:
+        for member in tar:
+            located = _split_artifact_name(member.name)
+            if located is None:
+                continue
+            top, rest = located
+            if not rest:
+                if member.isfile() and top not in trees:
+                    extracted = tar.extractfile(member)
+                    if extracted is not None:
+                        manifest[top] = extracted.read().decode("utf-8", errors="replace")
+                continue
+            if top not in trees:
+                continue
+            member.name = rest
+            if member.islnk():
+                target = _split_artifact_name(member.linkname)
+                if target is None or target[0] != top:
+                    continue
+                member.linkname = target[1]
+            try:
+                tar.extract(member, trees[top], filter="data")
+            except (tarfile.FilterError, OSError):
+                continue
+    return manifest
+
+
+def _export_artifacts(container_name: str, trees: dict[str, Path]) -> dict[str, str]:
+    """Export the container's artifacts with a single ``docker cp``, see read_artifacts.
+
+    Raises:
+        subprocess.CalledProcessError: If ``docker cp`` fails or its output
+            cannot be read.
+    """
+    cmd = ["docker", "cp", f"{container_name}:{ARTIFACTS_PATH}", "-"]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        try:
+            manifest = read_artifacts(proc.stdout, trees)
+        except tarfile.TarError:
+            manifest = None
+        # Drain the rest of the stream so docker cp can exit.
+        proc.stdout.read()
+        stderr = proc.stderr.read()
+    if proc.returncode != 0 or manifest is None:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    return manifest
+
+
+def _build_names(org: str, repo: str, commit_hash: str, approved_hash: str = "") -> tuple[str, str]:
+    """Return the (container name, image tag) of a build.
+
+    Builds with the approved lock files may run next to the primary build,
+    so they get names of their own.
+    """
+    build_id = f"{org}-{repo}-{commit_hash[:12]}"
+    if approved_hash:
+        build_id += f"-lock-{approved_hash[:12]}"
+    return f"verify-action-{build_id}", f"verify-action:{build_id}"
+
+
+def remove_build(org: str, repo: str, commit_hash: str, approved_hash: str = "") -> None:
+    """Remove the container and image of a build, e.g. after it was stopped."""
+    container_name, image_tag = _build_names(org, repo, commit_hash, approved_hash)
+    subprocess.run(["docker", "rm", "-f", container_name], capture_output=True)
+    subprocess.run(["docker", "rmi", "-f", image_tag], capture_output=True)
+
+
 def build_in_docker(
     org: str, repo: str, commit_hash: str, work_dir: Path,
     sub_path: str = "",
@@ -105,6 +202,7 @@ def build_in_docker(
     show_build_steps: bool = False,
     approved_hash: str = "",
     source_commit_hash: str = "",
+    package_cache: bool = False,
 ) -> tuple[Path, Path, str, str, bool, Path, Path, list[str]]:
     """Build the action in a Docker container and extract original + rebuilt dist.
 
@@ -117,6 +215,10 @@ def build_in_docker(
     the tree to *source_commit_hash* before building.  Used for actions whose
     tagged commit is an orphan tree without buildable source.
 
+    With *package_cache* the package installs use the persistent npm/yarn/pnpm
+    caches (see package_cache), and the bytes downloaded and served from them
+    are recorded in ``package_cache_stats``.
+
     Returns (original_dir, rebuilt_dir, action_type, out_dir_name,
              has_node_modules, original_node_modules, rebuilt_node_modules,
              kept_js_files).
@@ -126,18 +228,19 @@ def build_in_docker(
     approved version instead of the rebuild.
     """
     repo_url = f"https://github.com/{org}/{repo}.git"
-    container_name = f"verify-action-{org}-{repo}-{commit_hash[:12]}"
+    container_name, image_tag = _build_names(org, repo, commit_hash, approved_hash)
 
     dockerfile_path = work_dir / "Dockerfile"
-    dockerfile_path.write_text(_read_dockerfile_template())
+    dockerfile = _read_dockerfile_template()
+    if package_cache:
+        dockerfile = with_package_cache(dockerfile)
+    dockerfile_path.write_text(dockerfile)
 
     original_dir = work_dir / "original-dist"
     rebuilt_dir = work_dir / "rebuilt-dist"
     original_dir.mkdir(exist_ok=True)
     rebuilt_dir.mkdir(exist_ok=True)
 
-    image_tag = f"verify-action:{org}-{repo}-{commit_hash[:12]}"
-
     action_display = f"{org}/{repo}"
     if sub_path:
         action_display += f"/{sub_path}"
@@ -163,12 +266,17 @@ def build_in_docker(
     if node_version != "20":
         console.print(f"  [green]✓[/green] Detected Node.js version: [bold]node{node_version}[/bold]")
 
+    dart, deno = detect_toolchain(org, repo, commit_hash)
+    with console.status("[bold blue]Preparing toolchain image...[/bold blue]"):
+        toolchain = ensure_toolchain_image(node_version, dart=dart, deno=deno, cache=cache)
+    console.print(f"  [green]✓[/green] Toolchain image: {toolchain.describe()}")
+
     docker_build_cmd = [
         "docker",
         "build",
         "--progress=plain",
         "--build-arg",
-        f"NODE_VERSION={node_version}",
+        f"TOOLCHAIN_IMAGE={toolchain.tag}",
         "--build-arg",
         f"REPO_URL={repo_url}",
         "--build-arg",
@@ -191,6 +299,8 @@ def build_in_docker(
     with console.status("[bold blue]Building Docker image...[/bold blue]"):
         build_result = subprocess.run(
             docker_build_cmd, capture_output=True, text=True,
+            # Cache mounts need BuildKit, the default builder since Docker 23.
+            env={**os.environ, "DOCKER_BUILDKIT": "1"} if package_cache else None,
         )
         if build_result.returncode != 0:
             console.print("[red]Docker build failed. Output:[/red]")
@@ -210,43 +320,27 @@ def build_in_docker(
                 capture_output=True,
             )
 
-            run(
-                [
-                    "docker",
-                    "cp",
-                    f"{container_name}:/original-dist/.",
-                    str(original_dir),
-                ],
-                capture_output=True,
-            )
+            original_node_modules = work_dir / "original-node-modules"
+            rebuilt_node_modules = work_dir / "rebuilt-node-modules"
+            original_node_modules.mkdir(exist_ok=True)
+            rebuilt_node_modules.mkdir(exist_ok=True)
 
-            run(
-                [
-                    "docker",
-                    "cp",
-                    f"{container_name}:/rebuilt-dist/.",
-                    str(rebuilt_dir),
-                ],
-                capture_output=True,
-            )
+            manifest = _export_artifacts(container_name, {
+                "original-dist": original_dir,
+                "rebuilt-dist": rebuilt_dir,
+                "original-node-modules": original_node_modules,
+                "rebuilt-node-modules": rebuilt_node_modules,
+            })
             console.print("  [green]✓[/green] Artifacts extracted")
 
-            out_dir_result = subprocess.run(
-                ["docker", "cp", f"{container_name}:/out-dir.txt", str(work_dir / "out-dir.txt")],
-                capture_output=True,
-            )
             out_dir_name = "dist"
-            if out_dir_result.returncode == 0:
-                out_dir_name = (work_dir / "out-dir.txt").read_text().strip() or "dist"
+            if "out-dir.txt" in manifest:
+                out_dir_name = manifest["out-dir.txt"].strip() or "dist"
                 if out_dir_name != "dist":
                     console.print(f"  [green]✓[/green] Detected output directory: [bold]{out_dir_name}/[/bold]")
 
-            deleted_log = subprocess.run(
-                ["docker", "cp", f"{container_name}:/deleted-js.log", str(work_dir / "deleted-js.log")],
-                capture_output=True,
-            )
-            if deleted_log.returncode == 0:
-                log_content = (work_dir / "deleted-js.log").read_text().strip()
+            if "deleted-js.log" in manifest:
+                log_content = manifest["deleted-js.log"].strip()
                 if log_content.startswith("no ") and log_content.endswith(" directory"):
                     console.print(f"  [yellow]![/yellow] No {out_dir_name}/ directory found before rebuild")
                 else:
@@ -256,59 +350,34 @@ def build_in_docker(
                         for f in deleted_files:
                             console.print(f"    [dim]- {f}[/dim]")
 
-            kept_js_files: list[str] = []
-            kept_log = subprocess.run(
-                ["docker", "cp", f"{container_name}:/kept-js.log", str(work_dir / "kept-js.log")],
-                capture_output=True,
-            )
-            if kept_log.returncode == 0:
-                kept_js_files = [
-                    l for l in (work_dir / "kept-js.log").read_text().strip().splitlines()
-                    if l.strip()
-                ]
-                if kept_js_files:
-                    console.print(
-                        f"  [green]✓[/green] Kept {len(kept_js_files)} non-minified JS file(s) "
-                        f"(diffed against previously-approved version, not rebuild):"
-                    )
-                    for f in kept_js_files:
-                        console.print(f"    [dim]- {f}[/dim]")
+            kept_js_files: list[str] = [
+                l for l in manifest.get("kept-js.log", "").strip().splitlines() if l.strip()
+            ]
+            if kept_js_files:
+                console.print(
+                    f"  [green]✓[/green] Kept {len(kept_js_files)} non-minified JS file(s) "
+                    f"(diffed against previously-approved version, not rebuild):"
+                )
+                for f in kept_js_files:
+                    console.print(f"    [dim]- {f}[/dim]")
 
-            action_type_result = subprocess.run(
-                ["docker", "cp", f"{container_name}:/action-type.txt", str(work_dir / "action-type.txt")],
-                capture_output=True,
-            )
             action_type = "unknown"
-            if action_type_result.returncode == 0:
-                action_type = (work_dir / "action-type.txt").read_text().strip()
+            if "action-type.txt" in manifest:
+                action_type = manifest["action-type.txt"].strip()
                 console.print(f"  [green]✓[/green] Action type: [bold]{action_type}[/bold]")
 
-            original_node_modules = work_dir / "original-node-modules"
-            rebuilt_node_modules = work_dir / "rebuilt-node-modules"
-            original_node_modules.mkdir(exist_ok=True)
-            rebuilt_node_modules.mkdir(exist_ok=True)
-            has_node_modules = False
-
-            has_nm_result = subprocess.run(
-                ["docker", "cp", f"{container_name}:/has-node-modules.txt",
-                 str(work_dir / "has-node-modules.txt")],
-                capture_output=True,
-            )
-            if has_nm_result.returncode == 0:
-                has_node_modules = (work_dir / "has-node-modules.txt").read_text().strip() == "true"
+            if package_cache:
+                cache_stats = parse_stats(manifest.get(STATS_NAME, ""))
+                if cache_stats is not None:
+                    downloaded, reused = cache_stats
+                    package_cache_stats.record(downloaded, reused)
+                    console.print(
+                        f"  [green]✓[/green] Package cache: {reused / 1048576:.1f} MB reused, "
+                        f"{downloaded / 1048576:.1f} MB downloaded"
+                    )
 
+            has_node_modules = manifest.get("has-node-modules.txt", "").strip() == "true"
             if has_node_modules:
-                status.update("[bold blue]Extracting node_modules artifacts...[/bold blue]")
-                run(
-                    ["docker", "cp", f"{container_name}:/original-node-modules/.",
-                     str(original_node_modules)],
-                    capture_output=True,
-                )
-                run(
-                    ["docker", "cp", f"{container_name}:/rebuilt-node-modules/.",
-                     str(rebuilt_node_modules)],
-                    capture_output=True,
-                )
                 console.print("  [green]✓[/green] Vendored node_modules detected and extracted")
         finally:
             status.update("[bold blue]Cleaning up Docker resources...[/bold blue]")
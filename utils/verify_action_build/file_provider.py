@@ -0,0 +1,216 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+"""Where the files of an action's repository are read from.
+
+The security checks read dozens to hundreds of files of the verified
+commit (action.yml, scripts, lock files, manifests, JS sources).  Every
+read goes through :func:`provider_for`, which returns the
+:class:`FileProvider` registered for that (org, repo, commit):
+
+* :class:`HttpFileProvider` (the default) fetches each file from
+  raw.githubusercontent.com, with the disk cache for pinned SHAs;
+* :class:`CloneFileProvider` reads from a local checkout, made with a
+  single shallow, blobless ``git fetch`` (see :func:`cloned`).
+
+Tests can register their own provider with :func:`use_provider`.
+"""
+
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import requests
+
+from . import http_session
+from .disk_cache import DiskCache
+from .repo_snapshot import (
+    GIT_FETCH_TIMEOUT_SECONDS,
+    RepoSnapshot,
+    fetch_commit,
+    list_tree,
+    loaded_snapshot,
+    register_snapshot,
+)
+
+# Files fetched at a full commit SHA never change, so they are kept on disk
+# across runs (see disk_cache), including 404s.
+RAW_CACHE_MAX_BYTES = 256 * 1024 * 1024
+raw_cache = DiskCache("raw", max_bytes=RAW_CACHE_MAX_BYTES)
+
+RAW_FETCH_TIMEOUT_SECONDS = 30
+
+
+class FileProvider(ABC):
+    """Reads the files of ``org/repo`` at ``commit_hash``.
+
+    Paths are relative to the repository root.  Subclasses implement
+    :meth:`read_bytes`.
+    """
+
+    def __init__(self, org: str, repo: str, commit_hash: str):
+        self.org = org
+        self.repo = repo
+        self.commit_hash = commit_hash
+
+    @abstractmethod
+    def read_bytes(self, path: str) -> bytes | None:
+        """Return the file's content, or None if it does not exist or cannot be read."""
+
+    def read_text(self, path: str) -> str | None:
+        content = self.read_bytes(path)
+        return None if content is None else content.decode("utf-8", errors="replace")
+
+
+class HttpFileProvider(FileProvider):
+    """Fetches each file from raw.githubusercontent.com.
+
+    At a pinned SHA, found files and 404s are cached on disk; other
+    failures are not, so they are retried on the next run.  Once the
+    commit's file listing is loaded (see repo_snapshot), files absent from
+    it are not requested at all.
+    """
+
+    def read_bytes(self, path: str) -> bytes | None:
+        org, repo, commit_hash = self.org, self.repo, self.commit_hash
+        snapshot = loaded_snapshot(org, repo, commit_hash)
+        if snapshot is not None and snapshot.complete and path not in snapshot:
+            return None
+
+        key = (org, repo, commit_hash, path)
+        pinned = re.fullmatch(r"[0-9a-f]{40}", commit_hash) is not None
+        if pinned:
+            hit, content = raw_cache.get(key)
+            if hit:
+                return content
+
+        url = f"https://raw.githubusercontent.com/{org}/{repo}/{commit_hash}/{path}"
+        try:
+            resp = http_session.get(url, timeout=RAW_FETCH_TIMEOUT_SECONDS)
+        except requests.RequestException:
+            return None
+        if pinned and (resp.ok or resp.status_code == 404):
+            raw_cache.put(key, resp.content if resp.ok else None)
+        return resp.content if resp.ok else None
+
+
+class CloneFileProvider(FileProvider):
+    """Reads files from a local checkout of the commit.
+
+    Symbolic links are not followed: like raw.githubusercontent.com, reading
+    one returns the link target, so nothing outside the checkout is read.
+    """
+
+    def __init__(self, org: str, repo: str, commit_hash: str, checkout: Path):
+        super().__init__(org, repo, commit_hash)
+        self.checkout = checkout
+
+    def read_bytes(self, path: str) -> bytes | None:
+        current = self.checkout
+        parts = [p for p in path.split("/") if p not in ("", ".")]
+        if not parts or ".." in parts or ".git" in parts[:1]:
+            return None
+        for i, part in enumerate(parts):
+            current = current / part
+            try:
+                if current.is_symlink():
+                    # A symlinked directory cannot be traversed; a symlinked
+                    # file reads as its target, as on raw.githubusercontent.com.
+                    return os.readlink(current).encode() if i == len(parts) - 1 else None
+            except OSError:
+                return None
+        try:
+            return current.read_bytes()
+        except OSError:
+            return None
+
+    @classmethod
+    def clone(
+        cls, org: str, repo: str, commit_hash: str, directory: Path,
+    ) -> "CloneFileProvider | None":
+        """Check out ``commit_hash`` into *directory* with a shallow, blobless fetch.
+
+        The checkout downloads the file contents in one batch.  The commit's
+        listing is registered as its :class:`RepoSnapshot`.  Returns None on
+        failure.
+        """
+        git_dir = str(directory)
+        if not fetch_commit(git_dir, org, repo, commit_hash):
+            return None
+        try:
+            subprocess.run(
+                ["git", "-C", git_dir, "-c", "advice.detachedHead=false",
+                 "checkout", "-q", "FETCH_HEAD"],
+                capture_output=True, check=True, timeout=GIT_FETCH_TIMEOUT_SECONDS,
+                env={**os.environ, "GIT_LFS_SKIP_SMUDGE": "1"},
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        listed = list_tree(git_dir)
+        if listed is not None:
+            register_snapshot(RepoSnapshot(org, repo, commit_hash, *listed))
+        return cls(org, repo, commit_hash, directory)
+
+
+_providers: dict[tuple[str, str, str], FileProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def provider_for(org: str, repo: str, commit_hash: str) -> FileProvider:
+    """Return the provider registered for the commit, or an :class:`HttpFileProvider`."""
+    with _providers_lock:
+        provider = _providers.get((org, repo, commit_hash))
+    return provider or HttpFileProvider(org, repo, commit_hash)
+
+
+@contextmanager
+def use_provider(provider: FileProvider) -> Iterator[FileProvider]:
+    """Serve reads of the provider's commit from *provider* within the block."""
+    key = (provider.org, provider.repo, provider.commit_hash)
+    with _providers_lock:
+        previous = _providers.get(key)
+        _providers[key] = provider
+    try:
+        yield provider
+    finally:
+        with _providers_lock:
+            if previous is None:
+                _providers.pop(key, None)
+            else:
+                _providers[key] = previous
+
+
+@contextmanager
+def cloned(org: str, repo: str, commit_hash: str) -> Iterator[CloneFileProvider | None]:
+    """Serve reads of the commit from a temporary local clone within the block.
+
+    Yields the provider, or None if cloning failed (reads then stay on HTTP).
+    """
+    with tempfile.TemporaryDirectory(prefix="verify-action-clone-") as tmp:
+        provider = CloneFileProvider.clone(org, repo, commit_hash, Path(tmp))
+        if provider is None:
+            yield None
+            return
+        with use_provider(provider):
+            yield provider
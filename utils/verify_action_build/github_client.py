@@ -20,11 +20,15 @@
 
 import json
 import re
+import shutil
 import subprocess
 from pathlib import Path
 
 import requests
 
+from . import http_session
+from .http_session import github_token
+
 GITHUB_API = "https://api.github.com"
 
 
@@ -43,6 +47,50 @@ def _detect_repo() -> str:
     return "apache/infrastructure-actions"
 
 
+def _gh_api(endpoint: str) -> dict | list | None:
+    """Call ``gh api`` and return parsed JSON, or ``None`` on any failure."""
+    try:
+        result = subprocess.run(
+            ["gh", "api", endpoint],
+            capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    try:
+        return json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return None
+
+
+def api_get(endpoint: str) -> dict | list | None:
+    """GET a REST API endpoint and return parsed JSON, or ``None`` on any failure.
+
+    Same semantics as ``gh api <endpoint>``, but served in-process over the
+    pooled session whenever a token is available (``$GITHUB_TOKEN`` or the
+    gh CLI's, see :func:`http_session.github_token`), instead of forking a
+    ``gh`` process per call.  Without a token it falls back to ``gh api``,
+    or to an unauthenticated request when gh is not installed either.
+    """
+    token = github_token()
+    if token is None and shutil.which("gh"):
+        return _gh_api(endpoint)
+    headers = {"Accept": "application/vnd.github+json"}
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    try:
+        resp = http_session.get(f"{GITHUB_API}/{endpoint}", headers=headers)
+    except requests.RequestException:
+        return None
+    if not resp.ok or not resp.content.strip():
+        return None
+    try:
+        return resp.json()
+    except ValueError:
+        return None
+
+
 class GitHubClient:
     """Abstraction over GitHub API — uses either gh CLI or requests with a token."""
 
@@ -57,24 +105,14 @@ class GitHubClient:
             "Accept": "application/vnd.github+json",
         }
 
-    def _gh_api(self, endpoint: str) -> dict | list | None:
-        """Call gh api and return parsed JSON, or None on failure."""
-        result = subprocess.run(
-            ["gh", "api", endpoint],
-            capture_output=True, text=True,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return json.loads(result.stdout)
-        return None
-
     def _get(self, endpoint: str) -> dict | list | None:
-        """GET from GitHub API using requests or gh CLI."""
+        """GET from GitHub API using this client's token, or else see :func:`api_get`."""
         if self._use_requests:
-            resp = requests.get(f"{GITHUB_API}/{endpoint}", headers=self._headers())
+            resp = http_session.get(f"{GITHUB_API}/{endpoint}", headers=self._headers())
             if resp.ok:
                 return resp.json()
             return None
-        return self._gh_api(endpoint)
+        return api_get(endpoint)
 
     def get_commit_pulls(self, owner: str, repo: str, commit_sha: str) -> list[dict]:
         """Get PRs associated with a commit."""
@@ -91,7 +129,7 @@ class GitHubClient:
     def get_pr_diff(self, pr_number: int) -> str | None:
         """Get the diff for a PR."""
         if self._use_requests:
-            resp = requests.get(
+            resp = http_session.get(
                 f"{GITHUB_API}/repos/{self.repo}/pulls/{pr_number}",
                 headers={**self._headers(), "Accept": "application/vnd.github.v3.diff"},
             )
@@ -105,7 +143,7 @@ class GitHubClient:
     def get_authenticated_user(self) -> str:
         """Get the login of the authenticated user."""
         if self._use_requests:
-            resp = requests.get(f"{GITHUB_API}/user", headers=self._headers())
+            resp = http_session.get(f"{GITHUB_API}/user", headers=self._headers())
             if resp.ok:
                 return resp.json().get("login", "unknown")
             return "unknown"
@@ -121,7 +159,7 @@ class GitHubClient:
             prs = []
             page = 1
             while True:
-                resp = requests.get(
+                resp = http_session.get(
                     f"{GITHUB_API}/repos/{self.repo}/pulls",
                     headers=self._headers(),
                     params={"state": "open", "per_page": 50, "page": page},
@@ -165,7 +203,7 @@ class GitHubClient:
 
     def _get_review_decision(self, pr_number: int) -> str | None:
         """Get the review decision for a PR via GraphQL."""
-        resp = requests.post(
+        resp = http_session.post(
             f"{GITHUB_API}/graphql",
             headers=self._headers(),
             json={
@@ -208,7 +246,7 @@ class GitHubClient:
     def approve_pr(self, pr_number: int, comment: str) -> bool:
         """Approve a PR with a review comment."""
         if self._use_requests:
-            resp = requests.post(
+            resp = http_session.post(
                 f"{GITHUB_API}/repos/{self.repo}/pulls/{pr_number}/reviews",
                 headers=self._headers(),
                 json={"body": comment, "event": "APPROVE"},
@@ -223,7 +261,7 @@ class GitHubClient:
     def merge_pr(self, pr_number: int) -> tuple[bool, str]:
         """Merge a PR and delete the branch. Returns (success, error_msg)."""
         if self._use_requests:
-            resp = requests.put(
+            resp = http_session.put(
                 f"{GITHUB_API}/repos/{self.repo}/pulls/{pr_number}/merge",
                 headers=self._headers(),
                 json={"merge_method": "merge"},
@@ -234,7 +272,7 @@ class GitHubClient:
             if isinstance(pr_data, dict):
                 branch = pr_data.get("head", {}).get("ref")
                 if branch:
-                    requests.delete(
+                    http_session.delete(
                         f"{GITHUB_API}/repos/{self.repo}/git/refs/heads/{branch}",
                         headers=self._headers(),
                     )
@@ -0,0 +1,204 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+"""Shared HTTP session with connection pooling, retries and per-host counters.
+
+Every GitHub and npm registry request made during a verification goes
+through :func:`get_session`, so connections are kept alive across the
+dozens of fetches a single action needs, transient failures are retried
+with backoff, and the ``$GITHUB_TOKEN`` is sent consistently to GitHub
+hosts (and only to them).  Without ``$GITHUB_TOKEN``, the gh CLI's token is
+used, asked for once per process.  The module-level :func:`get` and :func:`post`
+mirror ``requests.get`` / ``requests.post``.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+# Hosts that receive the $GITHUB_TOKEN.  Redirects to other hosts (e.g.
+# release asset downloads) have the Authorization header stripped by requests.
+GITHUB_HOSTS = frozenset({"api.github.com", "raw.githubusercontent.com", "github.com"})
+
+DEFAULT_TIMEOUT = 15
+POOL_MAXSIZE = 16
+MAX_RETRIES = 4
+# Connection failures (DNS, refused) are usually not transient; retry once.
+MAX_CONNECT_RETRIES = 1
+BACKOFF_FACTOR = 0.5
+# Upper bound for honouring a Retry-After header, so a rate-limited run
+# degrades to a failed fetch instead of hanging.
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+class _GitHubRetry(Retry):
+    """Retry 429 and 5xx responses, and 403s carrying Retry-After.
+
+    GitHub answers secondary rate limits with 403 (or 429) and a Retry-After
+    header; any other 403 is a genuine permission error and is not retried.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 403 and not has_retry_after:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response) -> float | None:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+
+
+class HttpStats:
+    """Thread-safe request, error and latency counters per host."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict] = {}
+
+    def record(self, host: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            entry = self._hosts.setdefault(host, {"requests": 0, "errors": 0, "seconds": 0.0})
+            entry["requests"] += 1
+            entry["seconds"] += seconds
+            if error:
+                entry["errors"] += 1
+
+    def snapshot(self) -> dict[str, dict]:
+        """Return ``{host: {"requests", "errors", "seconds"}}``, busiest host first."""
+        with self._lock:
+            return {
+                host: dict(entry)
+                for host, entry in sorted(
+                    self._hosts.items(), key=lambda item: -item[1]["requests"],
+                )
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+class PooledSession(requests.Session):
+    """``requests.Session`` with pooling, retries, GitHub auth and counters.
+
+    A response with an error status is returned once retries are exhausted,
+    as with plain ``requests``; callers keep checking ``resp.ok``.
+    """
+
+    def __init__(self, token: str | None = None) -> None:
+        super().__init__()
+        self.token = token
+        self.stats = HttpStats()
+        retry = _GitHubRetry(
+            total=MAX_RETRIES,
+            connect=MAX_CONNECT_RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=(403, 429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE, max_retries=retry,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        host = urlsplit(url).hostname or ""
+        if self.token and host in GITHUB_HOSTS:
+            headers = CaseInsensitiveDict(kwargs.get("headers") or {})
+            headers.setdefault("Authorization", f"Bearer {self.token}")
+            kwargs["headers"] = headers
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        started = time.monotonic()
+        try:
+            resp = super().request(method, url, **kwargs)
+        except requests.RequestException:
+            self.stats.record(host, time.monotonic() - started, error=True)
+            raise
+        self.stats.record(host, time.monotonic() - started, error=resp.status_code >= 500)
+        return resp
+
+
+@lru_cache(maxsize=1)
+def gh_auth_token() -> str | None:
+    """Return the token the gh CLI is logged in with, or None.
+
+    Cached, so the ``gh`` process is only forked once per run.
+    """
+    try:
+        result = subprocess.run(
+            ["gh", "auth", "token"], capture_output=True, text=True, timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    token = result.stdout.strip()
+    return token if result.returncode == 0 and token else None
+
+
+def github_token() -> str | None:
+    """Return ``$GITHUB_TOKEN``, falling back to the gh CLI's token."""
+    return os.environ.get("GITHUB_TOKEN") or gh_auth_token()
+
+
+_session: PooledSession | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Return the process-wide session, creating it on first use.
+
+    A new session is created after a fork, so worker processes never share
+    pooled connections with their parent.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = PooledSession(token=github_token())
+            _session_pid = os.getpid()
+        return _session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """``requests.get`` through the shared session."""
+    return get_session().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """``requests.post`` through the shared session."""
+    return get_session().post(url, **kwargs)
+
+
+def put(url: str, **kwargs) -> requests.Response:
+    """``requests.put`` through the shared session."""
+    return get_session().put(url, **kwargs)
+
+
+def delete(url: str, **kwargs) -> requests.Response:
+    """``requests.delete`` through the shared session."""
+    return get_session().delete(url, **kwargs)
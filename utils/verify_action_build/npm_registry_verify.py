@@ -48,13 +48,15 @@ import base64
 import hashlib
 import io
 import json
-import os
 import re
 import tarfile
 
 import requests
 
+from . import http_session
 from .console import console, link
+from .file_provider import provider_for
+from .repo_snapshot import get_snapshot
 
 # npm-generated artifacts that live in a vendored ``node_modules`` but do
 # not come from any package tarball, so they are not part of verification.
@@ -211,48 +213,24 @@ def _integrity_matches(data: bytes, integrity: str) -> bool:
 def _fetch_tree_with_sha(org: str, repo: str, commit_hash: str) -> tuple[dict[str, str], bool]:
     """Map every blob path at ``commit_hash`` to its git blob SHA.
 
-    Returns ``(paths, truncated)``.  ``truncated`` is True when the tree
-    exceeded the API's recursive listing limit — the result is then not
-    canonical and the caller must not treat absence as proof of anything.
+    Returns ``(paths, truncated)``.  ``truncated`` is True when the full
+    listing could not be obtained (see :mod:`repo_snapshot`) — the result is
+    then not canonical and the caller must not treat absence as proof of
+    anything.
     """
-    url = f"https://api.github.com/repos/{org}/{repo}/git/trees/{commit_hash}?recursive=1"
-    headers = {"Accept": "application/vnd.github+json"}
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    try:
-        resp = requests.get(url, timeout=15, headers=headers)
-        if not resp.ok:
-            return {}, False
-        data = resp.json()
-        paths = {
-            t["path"]: t["sha"]
-            for t in data.get("tree", [])
-            if t.get("type") == "blob"
-        }
-        return paths, bool(data.get("truncated"))
-    except (requests.RequestException, ValueError):
-        return {}, False
+    snapshot = get_snapshot(org, repo, commit_hash)
+    return dict(snapshot.blobs), snapshot.truncated
 
 
 def _fetch_lockfile(org: str, repo: str, commit_hash: str, path: str) -> bytes | None:
-    """Fetch one file's raw bytes at ``commit_hash`` via raw.githubusercontent."""
-    url = f"https://raw.githubusercontent.com/{org}/{repo}/{commit_hash}/{path}"
-    headers = {}
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    try:
-        resp = requests.get(url, timeout=15, headers=headers)
-        return resp.content if resp.ok else None
-    except requests.RequestException:
-        return None
+    """Fetch one file's raw bytes at ``commit_hash`` (see file_provider)."""
+    return provider_for(org, repo, commit_hash).read_bytes(path)
 
 
 def _download_tarball(url: str) -> bytes | None:
     """Download a package tarball (public npm registry needs no auth)."""
     try:
-        resp = requests.get(url, timeout=30)
+        resp = http_session.get(url, timeout=30)
         return resp.content if resp.ok else None
     except requests.RequestException:
         return None
@@ -0,0 +1,155 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+"""Opt-in persistent npm/yarn/pnpm package caches for the rebuild.
+
+With ``--package-cache``, the build_action.Dockerfile steps marked
+``# [package-cache]`` run with BuildKit cache mounts over the package
+managers' download caches, so the next verification of the same action
+(or of any action sharing dependencies) does not fetch them again.
+
+The caches only hold registry tarballs and metadata, keyed by content:
+``npm ci``, yarn (v2+) and pnpm check every package read from them
+against the integrity hashes in the lock file, so the rebuild installs
+exactly the same packages with or without a warm cache.  yarn v1 is not
+cached: its cache holds unpacked packages that are not re-hashed when
+read, so a tampered entry would go unnoticed.  Since the caches are
+shared across actions, no script of an action or its dependencies may
+write to them: the marked steps only fetch packages pinned by a lock file,
+with install scripts disabled (``--ignore-scripts``, or
+``--mode=skip-build`` for yarn v2+), and the scripts run in the unmarked
+step after each of them.  Without a lock file nothing is fetched with the
+caches, as ``npm install`` has no integrity hashes to check against.
+
+To measure what the cache saved, the build resets the access time of
+every cached file before installing.  Afterwards, files written by the
+build were downloaded, and older files read by it were served from the
+cache.  That needs access times on the BuildKit cache directory (the
+default ``relatime`` is enough); without them nothing is counted as
+reused.
+"""
+
+import re
+import subprocess
+
+# (mount id suffix, target, sharing); all of these are safe to write
+# concurrently.
+CACHE_MOUNTS = (
+    ("npm", "/root/.npm", "shared"),
+    ("yarn-berry", "/root/.yarn/berry/cache", "shared"),
+    ("pnpm", "/root/.local/share/pnpm/store", "shared"),
+)
+CACHE_MOUNT_ID_PREFIX = "verify-action-package-cache"
+STATS_PATH = "/artifacts/package-cache.txt"
+
+_MARKER = "# [package-cache]"
+_STAMP_PATH = "/package-cache.stamp"
+
+
+def _mount_flags() -> str:
+    return " ".join(
+        f"--mount=type=cache,id={CACHE_MOUNT_ID_PREFIX}-{name},target={target},sharing={sharing}"
+        for name, target, sharing in CACHE_MOUNTS
+    )
+
+
+def _sum_sizes(find_args: str) -> str:
+    return f"$(find $DIRS -type f {find_args} -printf '%s\\n' | awk '{{s += $1}} END {{print s + 0}}')"
+
+
+def with_package_cache(dockerfile: str) -> str:
+    """Return *dockerfile* with the package caches mounted into the marked steps.
+
+    A step before the first marked one resets the cached files' access
+    times; a step after the last one writes ``<downloaded> <reused>``
+    byte counts to :data:`STATS_PATH`.
+    """
+    lines = dockerfile.splitlines(keepends=True)
+    marked = [i + 1 for i, line in enumerate(lines) if line.strip() == _MARKER]
+    if not marked:
+        return dockerfile
+    flags = _mount_flags()
+    dirs = " ".join(target for _, target, _ in CACHE_MOUNTS)
+    for i in marked:
+        lines[i] = re.sub(r"^RUN ", f"RUN {flags} ", lines[i], count=1)
+
+    begin = (
+        f'RUN {flags} DIRS="{dirs}"; mkdir -p $DIRS && '
+        f"find $DIRS -type f -exec touch -a -d @0 {{}} + && touch {_STAMP_PATH}\n"
+    )
+    end = (
+        f'RUN {flags} DIRS="{dirs}"; '
+        f"echo \"{_sum_sizes(f'-newer {_STAMP_PATH}')} "
+        f"{_sum_sizes(f'! -newer {_STAMP_PATH} -anewer {_STAMP_PATH}')}\" > {STATS_PATH}\n"
+    )
+    # The last marked step ends at its first line without a continuation.
+    last = marked[-1]
+    while lines[last].rstrip("\n").endswith("\\"):
+        last += 1
+    lines.insert(last + 1, end)
+    lines.insert(marked[0] - 1, begin)
+    return "".join(lines)
+
+
+class PackageCacheStats:
+    """Bytes downloaded and served from the package cache by the builds of a verification."""
+
+    def __init__(self):
+        self.builds: list[tuple[int, int]] = []
+
+    def record(self, downloaded: int, reused: int) -> None:
+        self.builds.append((downloaded, reused))
+
+    def reset(self) -> None:
+        self.builds = []
+
+    def summary(self) -> str | None:
+        """One line for the verification summary, or None if the cache was not used."""
+        if not self.builds:
+            return None
+        return "; ".join(
+            f"{_megabytes(reused)} from cache, {_megabytes(downloaded)} downloaded"
+            for downloaded, reused in self.builds
+        )
+
+
+package_cache_stats = PackageCacheStats()
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def parse_stats(text: str) -> tuple[int, int] | None:
+    """Parse the ``<downloaded> <reused>`` line written to :data:`STATS_PATH`."""
+    try:
+        downloaded, reused = (int(part) for part in text.split())
+    except ValueError:
+        return None
+    return downloaded, reused
+
+
+def wipe_package_cache() -> bool:
+    """Remove the package cache mounts from the BuildKit cache. Returns True on success."""
+    result = subprocess.run(
+        ["docker", "builder", "prune", "--force",
+         "--filter", "type=exec.cachemount",
+         "--filter", f"description~={CACHE_MOUNT_ID_PREFIX}"],
+        capture_output=True, text=True,
+    )
+    return result.returncode == 0
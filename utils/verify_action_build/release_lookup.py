@@ -34,35 +34,27 @@ orphan tag's published ``dist/``.
 
 from __future__ import annotations
 
-import json
-import subprocess
 from datetime import datetime, timedelta, timezone
 
+from .github_client import api_get
+from .repo_snapshot import get_snapshot
+
 
 def _gh_api(endpoint: str) -> dict | list | None:
-    """Call ``gh api`` and return parsed JSON, or ``None`` on any failure."""
-    result = subprocess.run(
-        ["gh", "api", endpoint],
-        capture_output=True, text=True,
-    )
-    if result.returncode != 0 or not result.stdout.strip():
-        return None
-    try:
-        return json.loads(result.stdout)
-    except json.JSONDecodeError:
-        return None
+    """Call the GitHub API like ``gh api``; parsed JSON, or ``None`` on any failure."""
+    return api_get(endpoint)
 
 
 def _tree_top_level_names(org: str, repo: str, commit_hash: str) -> set[str]:
     """Return the set of top-level entry names in the commit's tree.
 
+    Loads the commit's :class:`RepoSnapshot`, which the security checks of
+    the same commit reuse later on.
+
     Returns an empty set if the lookup fails — callers should treat that as
     "unknown, don't infer anything".
     """
-    data = _gh_api(f"repos/{org}/{repo}/git/trees/{commit_hash}")
-    if not isinstance(data, dict):
-        return set()
-    return {entry.get("path", "") for entry in data.get("tree", []) if entry.get("path")}
+    return get_snapshot(org, repo, commit_hash).top_level_names()
 
 
 def is_source_detached(org: str, repo: str, commit_hash: str, sub_path: str = "") -> bool:
@@ -178,8 +170,12 @@ def _commit_has_package_json(
         if not isinstance(data, list):
             return False
         return any(e.get("name") == "package.json" for e in data)
-    names = _tree_top_level_names(org, repo, commit_hash)
-    return "package.json" in names
+    # Candidate source commits are not otherwise inspected, so a single
+    # non-recursive tree is cheaper than a full snapshot.
+    data = _gh_api(f"repos/{org}/{repo}/git/trees/{commit_hash}")
+    if not isinstance(data, dict):
+        return False
+    return any(entry.get("path") == "package.json" for entry in data.get("tree", []))
 
 
 def resolve_source_commit(
@@ -0,0 +1,185 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+"""Listing of every file in a repository at one commit, shared by all checks.
+
+Several checks need to know which files exist at the verified commit — JS
+source discovery, the in-tree binary check, vendored ``node_modules``
+verification and source-detached tag detection — and the checks probing
+for optional files (lock files, scripts, Dockerfiles) would otherwise pay
+a 404 round trip for every file that is not there.  :func:`get_snapshot`
+fetches the recursive git tree once per (org, repo, commit) and keeps it in
+memory for the rest of the run; ``action_ref.fetch_file_from_github`` then
+answers for absent files without a request.
+
+GitHub truncates recursive trees of very large repositories.  The listing
+is then taken from a blobless shallow fetch and ``git ls-tree`` instead.
+When the verified commit is read from a local clone (see file_provider),
+the clone's listing is registered and no trees API call is made.
+"""
+
+import subprocess
+import tempfile
+import threading
+
+from .github_client import api_get
+
+GIT_REMOTE_URL = "https://github.com/{org}/{repo}.git"
+GIT_FETCH_TIMEOUT_SECONDS = 300
+
+
+class RepoSnapshot:
+    """The files of ``org/repo`` at ``commit_hash``.
+
+    *blobs* maps every file path to its git blob SHA; *top_level* holds the
+    names of all entries at the repository root (files and directories).
+    *available* is False when the listing could not be fetched at all, and
+    *truncated* when only part of it could.
+    """
+
+    def __init__(
+        self, org: str, repo: str, commit_hash: str,
+        blobs: dict[str, str], top_level: set[str],
+        available: bool = True, truncated: bool = False,
+    ):
+        self.org = org
+        self.repo = repo
+        self.commit_hash = commit_hash
+        self.blobs = blobs
+        self.top_level = top_level
+        self.available = available
+        self.truncated = truncated
+
+    @property
+    def complete(self) -> bool:
+        """Whether the listing is canonical, i.e. absence proves a file does not exist."""
+        return self.available and not self.truncated
+
+    def paths(self) -> list[str]:
+        return list(self.blobs)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.blobs
+
+    def top_level_names(self) -> set[str]:
+        return set(self.top_level)
+
+    @classmethod
+    def fetch(cls, org: str, repo: str, commit_hash: str) -> "RepoSnapshot":
+        """List the commit's files with one recursive trees API call, or a clone if truncated."""
+        data = api_get(f"repos/{org}/{repo}/git/trees/{commit_hash}?recursive=1")
+        if not isinstance(data, dict):
+            return cls(org, repo, commit_hash, {}, set(), available=False)
+        entries = [e for e in data.get("tree", []) if e.get("path")]
+        blobs = {e["path"]: e.get("sha", "") for e in entries if e.get("type") == "blob"}
+        top_level = {e["path"].split("/", 1)[0] for e in entries}
+        if not data.get("truncated"):
+            return cls(org, repo, commit_hash, blobs, top_level)
+        listed = _list_tree_via_git(org, repo, commit_hash)
+        if listed is None:
+            return cls(org, repo, commit_hash, blobs, top_level, truncated=True)
+        return cls(org, repo, commit_hash, *listed)
+
+
+def fetch_commit(git_dir: str, org: str, repo: str, commit_hash: str) -> bool:
+    """Fetch ``commit_hash`` into a new repository at *git_dir*, shallow and blobless.
+
+    Only the commit and its tree objects are downloaded, not file contents;
+    those are fetched on demand, e.g. by a checkout.  Returns False on failure.
+    """
+    url = GIT_REMOTE_URL.format(org=org, repo=repo)
+    try:
+        for cmd in (
+            ["git", "init", "-q", git_dir],
+            ["git", "-C", git_dir, "fetch", "-q", "--depth=1", "--filter=blob:none", url, commit_hash],
+        ):
+            subprocess.run(
+                cmd, capture_output=True, check=True, timeout=GIT_FETCH_TIMEOUT_SECONDS,
+            )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return True
+
+
+def list_tree(git_dir: str, rev: str = "FETCH_HEAD") -> tuple[dict[str, str], set[str]] | None:
+    """Return ``(blobs, top_level)`` for *rev* in *git_dir*, or None on failure."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", git_dir, "ls-tree", "-r", "-z", rev],
+            capture_output=True, text=True, check=True,
+            timeout=GIT_FETCH_TIMEOUT_SECONDS,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    blobs: dict[str, str] = {}
+    top_level: set[str] = set()
+    for record in result.stdout.split("\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition("\t")
+        _mode, obj_type, sha = meta.split(" ", 2)
+        top_level.add(path.split("/", 1)[0])
+        if obj_type == "blob":
+            blobs[path] = sha
+    return blobs, top_level
+
+
+def _list_tree_via_git(
+    org: str, repo: str, commit_hash: str,
+) -> tuple[dict[str, str], set[str]] | None:
+    """List the commit's files from a shallow, blobless fetch into a temporary repository."""
+    with tempfile.TemporaryDirectory(prefix="verify-action-tree-") as tmp:
+        if not fetch_commit(tmp, org, repo, commit_hash):
+            return None
+        return list_tree(tmp)
+
+
+_snapshots: dict[tuple[str, str, str], RepoSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(org: str, repo: str, commit_hash: str) -> RepoSnapshot:
+    """Return the snapshot of ``org/repo`` at ``commit_hash``, fetching it on first use."""
+    key = (org, repo, commit_hash)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+    if snapshot is None:
+        snapshot = RepoSnapshot.fetch(org, repo, commit_hash)
+        # A failed fetch is not kept, so the next check tries again.
+        if snapshot.available:
+            with _snapshots_lock:
+                snapshot = _snapshots.setdefault(key, snapshot)
+    return snapshot
+
+
+def register_snapshot(snapshot: RepoSnapshot) -> None:
+    """Make *snapshot* the listing of its commit, e.g. one taken from a local clone."""
+    with _snapshots_lock:
+        _snapshots[(snapshot.org, snapshot.repo, snapshot.commit_hash)] = snapshot
+
+
+def loaded_snapshot(org: str, repo: str, commit_hash: str) -> RepoSnapshot | None:
+    """Return the snapshot if it has been fetched already, without fetching it."""
+    with _snapshots_lock:
+        return _snapshots.get((org, repo, commit_hash))
+
+
+def clear_snapshots() -> None:
+    with _snapshots_lock:
+        _snapshots.clear()
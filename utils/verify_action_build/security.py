@@ -31,8 +31,11 @@ from typing import Iterator
 
 import requests
 
+from . import http_session
 from .console import console
+from .file_provider import provider_for
 from .github_client import GitHubClient
+from .repo_snapshot import get_snapshot
 from .action_ref import (
     fetch_action_yml,
     fetch_file_from_github,
@@ -1326,26 +1329,13 @@ def _find_binary_downloads_js(content: str) -> list[tuple[int, str]]:
 
 
 def _list_repo_files(org: str, repo: str, commit_hash: str) -> list[str]:
-    """List every blob path in the repo at ``commit_hash`` via the trees API.
+    """List every blob path in the repo at ``commit_hash`` (see :mod:`repo_snapshot`).
 
     Returns an empty list on error, auth failure, or truncated results (the
     caller should treat "no files discovered" as best-effort, not canonical).
     """
-    url = f"https://api.github.com/repos/{org}/{repo}/git/trees/{commit_hash}?recursive=1"
-    headers = {"Accept": "application/vnd.github+json"}
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    try:
-        resp = requests.get(url, timeout=15, headers=headers)
-        if not resp.ok:
-            return []
-        data = resp.json()
-        if data.get("truncated"):
-            return []
-        return [t["path"] for t in data.get("tree", []) if t.get("type") == "blob"]
-    except requests.RequestException:
-        return []
+    snapshot = get_snapshot(org, repo, commit_hash)
+    return snapshot.paths() if snapshot.complete else []
 
 
 def _discover_js_source_files(
@@ -1852,18 +1842,12 @@ def _looks_like_in_tree_binary(path: str) -> bool:
 def _fetch_blob_bytes(org: str, repo: str, commit_hash: str, path: str) -> bytes | None:
     """Fetch a file's *raw bytes* from GitHub at ``commit_hash``.
 
-    Uses raw.githubusercontent.com which serves any file size (the
-    Contents API caps at 1 MB and the in-tree binaries we want to verify
-    are several MB).  Returns ``None`` on any failure.
+    Read through file_provider: raw.githubusercontent.com serves any file
+    size (the Contents API caps at 1 MB and the in-tree binaries we want
+    to verify are several MB), as does a local clone.  Returns ``None`` on
+    any failure.
     """
-    url = f"https://raw.githubusercontent.com/{org}/{repo}/{commit_hash}/{path}"
-    try:
-        resp = requests.get(url, timeout=30)
-        if resp.ok:
-            return resp.content
-    except requests.RequestException:
-        pass
-    return None
+    return provider_for(org, repo, commit_hash).read_bytes(path)
 
 
 def _fetch_release_asset_text(
@@ -1878,11 +1862,8 @@ def _fetch_release_asset_text(
     """
     url = f"https://api.github.com/repos/{org}/{repo}/releases/tags/{tag}"
     headers = {"Accept": "application/vnd.github+json"}
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
     try:
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = http_session.get(url, headers=headers, timeout=15)
         if not resp.ok:
             return None
         for asset in resp.json().get("assets", []):
@@ -1892,7 +1873,7 @@ def _fetch_release_asset_text(
             if not asset_url:
                 return None
             asset_headers = {**headers, "Accept": "application/octet-stream"}
-            resp2 = requests.get(asset_url, headers=asset_headers, timeout=30)
+            resp2 = http_session.get(asset_url, headers=asset_headers, timeout=30)
             if resp2.ok:
                 return resp2.text
             return None
@@ -2038,11 +2019,8 @@ def _fetch_release_metadata(
     else:
         url = f"https://api.github.com/repos/{org}/{repo}/releases/tags/{tag_or_latest}"
     headers = {"Accept": "application/vnd.github+json"}
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
     try:
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = http_session.get(url, headers=headers, timeout=15)
         if not resp.ok:
             return None
         return resp.json()
@@ -2088,11 +2066,8 @@ def _fetch_release_asset_bytes(
     headers = {
         "Accept": "application/octet-stream",
     }
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
     try:
-        resp = requests.get(asset_url, headers=headers, timeout=60)
+        resp = http_session.get(asset_url, headers=headers, timeout=60)
         if resp.ok:
             return chosen.get("name"), resp.content
         return None, None
@@ -0,0 +1,229 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+"""Cached Docker toolchain images for the rebuild.
+
+build_action.Dockerfile starts from a toolchain image: ``node:<version>-slim``
+with git and corepack, plus the Dart SDK or deno for actions that need
+them (see dockerfiles/toolchain.Dockerfile).  The image only depends on
+that toolchain, not on the action, so it is tagged by it
+(e.g. ``verify-action-toolchain:node20-dart``) and kept across runs.
+
+Docker does not record when an image was last used, so each toolchain
+image has a small marker file under the disk cache root
+(``toolchain-images/<tag>.json``) holding the time it took to build; its
+mtime is the last use.  Beyond :data:`MAX_TOOLCHAIN_IMAGES`, the least
+recently used images are removed.
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from .console import console
+from .disk_cache import cache_root
+from .file_provider import provider_for
+
+TOOLCHAIN_REPOSITORY = "verify-action-toolchain"
+TOOLCHAIN_LABEL = "org.apache.infrastructure-actions.verify-action-build.toolchain"
+MAX_TOOLCHAIN_IMAGES = 6
+
+_DOCKERFILE_PATH = Path(__file__).resolve().parent / "dockerfiles" / "toolchain.Dockerfile"
+
+
+class ToolchainImage:
+    """A toolchain image used by one build.
+
+    Attributes:
+        tag: The image tag.
+        hit: Whether the image was already built by an earlier run.
+        build_seconds: How long building the image took, when it was built
+            (by this run on a miss, by an earlier run on a hit), if known.
+    """
+
+    def __init__(self, tag: str, hit: bool, build_seconds: float | None):
+        self.tag = tag
+        self.hit = hit
+        self.build_seconds = build_seconds
+
+    def describe(self) -> str:
+        name = self.tag.split(":", 1)[1]
+        if not self.hit:
+            built = f", built in {self.build_seconds:.0f}s" if self.build_seconds is not None else ""
+            return f"{name} cache miss{built}"
+        saved = f", saved ~{self.build_seconds:.0f}s" if self.build_seconds is not None else ""
+        return f"{name} cache hit{saved}"
+
+
+class ToolchainStats:
+    """The toolchain images used by the builds of the current verification."""
+
+    def __init__(self):
+        self.images: list[ToolchainImage] = []
+
+    def record(self, image: ToolchainImage) -> None:
+        self.images.append(image)
+
+    def reset(self) -> None:
+        self.images = []
+
+    def summary(self) -> str | None:
+        """One line for the verification summary, or None if nothing was built."""
+        if not self.images:
+            return None
+        return "; ".join(image.describe() for image in self.images)
+
+
+toolchain_stats = ToolchainStats()
+
+
+def detect_toolchain(org: str, repo: str, commit_hash: str) -> tuple[bool, bool]:
+    """Return whether the commit needs the Dart SDK and deno, respectively.
+
+    Mirrors the checks build_action.Dockerfile runs on the checkout: a
+    ``pubspec.yaml`` or ``deno.json(c)`` at the repository root.
+    """
+    provider = provider_for(org, repo, commit_hash)
+    dart = provider.read_bytes("pubspec.yaml") is not None
+    deno = any(provider.read_bytes(name) is not None for name in ("deno.json", "deno.jsonc"))
+    return dart, deno
+
+
+def toolchain_tag(node_version: str, dart: bool = False, deno: bool = False) -> str:
+    """Return the image tag for a toolchain, e.g. ``verify-action-toolchain:node20-deno``."""
+    tag = f"{TOOLCHAIN_REPOSITORY}:node{node_version}"
+    if dart:
+        tag += "-dart"
+    if deno:
+        tag += "-deno"
+    return tag
+
+
+def _marker_path(tag: str) -> Path:
+    return cache_root() / "toolchain-images" / f"{tag.replace(':', '_')}.json"
+
+
+def _read_build_seconds(tag: str) -> float | None:
+    try:
+        seconds = json.loads(_marker_path(tag).read_text()).get("build_seconds")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return float(seconds) if isinstance(seconds, (int, float)) else None
+
+
+def _write_marker(tag: str, build_seconds: float | None) -> None:
+    path = _marker_path(tag)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if build_seconds is None:
+            path.touch()
+        else:
+            path.write_text(json.dumps({"build_seconds": round(build_seconds, 1)}))
+    except OSError:
+        pass
+
+
+def _image_exists(tag: str) -> bool:
+    result = subprocess.run(
+        ["docker", "image", "inspect", "--format", "{{.Id}}", tag],
+        capture_output=True, text=True,
+    )
+    return result.returncode == 0
+
+
+def ensure_toolchain_image(
+    node_version: str, dart: bool = False, deno: bool = False, cache: bool = True,
+) -> ToolchainImage:
+    """Return the toolchain image, building it unless a cached one exists.
+
+    With ``cache=False`` the image is rebuilt from scratch.  The image is
+    recorded in :data:`toolchain_stats`, and the least recently used
+    toolchain images beyond :data:`MAX_TOOLCHAIN_IMAGES` are removed.
+
+    Raises:
+        subprocess.CalledProcessError: If the image cannot be built.
+    """
+    tag = toolchain_tag(node_version, dart, deno)
+    if cache and _image_exists(tag):
+        image = ToolchainImage(tag, hit=True, build_seconds=_read_build_seconds(tag))
+        _write_marker(tag, image.build_seconds)
+    else:
+        cmd = [
+            "docker", "build", "--progress=plain",
+            "--build-arg", f"NODE_VERSION={node_version}",
+            "--build-arg", f"INSTALL_DART={'1' if dart else ''}",
+            "--build-arg", f"INSTALL_DENO={'1' if deno else ''}",
+            "--label", f"{TOOLCHAIN_LABEL}=1",
+            "-t", tag, "-f", str(_DOCKERFILE_PATH),
+        ]
+        if not cache:
+            cmd.insert(3, "--no-cache")
+        started = time.monotonic()
+        # The toolchain needs no files from the build context.
+        with tempfile.TemporaryDirectory(prefix="verify-action-toolchain-") as context:
+            result = subprocess.run([*cmd, context], capture_output=True, text=True)
+        if result.returncode != 0:
+            console.print("[red]Toolchain image build failed. Output:[/red]")
+            console.print(result.stdout)
+            console.print(result.stderr)
+            raise subprocess.CalledProcessError(result.returncode, cmd)
+        image = ToolchainImage(tag, hit=False, build_seconds=time.monotonic() - started)
+        _write_marker(tag, image.build_seconds)
+    toolchain_stats.record(image)
+    prune_toolchain_images(keep=tag)
+    return image
+
+
+def prune_toolchain_images(max_images: int = MAX_TOOLCHAIN_IMAGES, keep: str = "") -> list[str]:
+    """Remove the least recently used toolchain images beyond *max_images*.
+
+    Images without a marker file count as least recently used.  *keep* is
+    never removed.  Returns the removed tags.
+    """
+    result = subprocess.run(
+        ["docker", "image", "ls", "--filter", f"label={TOOLCHAIN_LABEL}",
+         "--format", "{{.Repository}}:{{.Tag}}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return []
+    tags = {line.strip() for line in result.stdout.splitlines()}
+    tags.discard("")
+    tags.discard(f"{TOOLCHAIN_REPOSITORY}:<none>")
+
+    def last_used(tag: str) -> float:
+        try:
+            return os.stat(_marker_path(tag)).st_mtime
+        except OSError:
+            return 0.0
+
+    by_recency = sorted(tags, key=last_used, reverse=True)
+    removed = []
+    for tag in by_recency[max_images:]:
+        if tag == keep:
+            continue
+        if subprocess.run(["docker", "rmi", tag], capture_output=True).returncode == 0:
+            removed.append(tag)
+            try:
+                _marker_path(tag).unlink()
+            except OSError:
+                pass
+    return removed
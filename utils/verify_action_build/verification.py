@@ -18,22 +18,30 @@
 #
 """Verification orchestration and summary display."""
 
+import multiprocessing
+import os
+import signal
 import tempfile
 import webbrowser
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
 from rich.panel import Panel
 from rich.table import Table
 
+from . import http_session
 from .action_ref import fetch_file_from_github, parse_action_ref
 from .approved_actions import find_approved_versions, show_approved_versions, show_commits_between
-from .console import console
+from .console import buffered_console, console
 from .diff_js import diff_js_files
 from .diff_node_modules import diff_node_modules
-from .diff_source import diff_approved_vs_new
-from .docker_build import build_in_docker
+from .diff_source import clone_repo, diff_approved_vs_new
+from .docker_build import build_in_docker, remove_build
+from .file_provider import cloned
 from .github_client import GitHubClient
 from .npm_registry_verify import verify_vendored_node_modules
+from .package_cache import package_cache_stats
 from .release_lookup import (
     format_release_time,
     get_release_or_commit_time,
@@ -51,6 +59,7 @@ from .security import (
     analyze_repo_metadata,
     analyze_scripts,
 )
+from .toolchain_image import toolchain_stats
 
 SECURITY_CHECKLIST_URL = "https://github.com/apache/infrastructure-actions#security-review-checklist"
 
@@ -123,6 +132,28 @@ def show_verification_summary(
         console.print(nested_table)
 
 
+def show_http_summary(stats: dict[str, dict]) -> None:
+    """Show the number of HTTP requests and their latency per host."""
+    if not stats:
+        return
+    console.print()
+    table = Table(show_header=True, border_style="dim", title="[bold]HTTP Requests[/bold]")
+    table.add_column("Host", min_width=30)
+    table.add_column("Requests", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Average", justify="right")
+    for host, entry in stats.items():
+        table.add_row(
+            host,
+            str(entry["requests"]),
+            str(entry["errors"]) if entry["errors"] else "[dim]0[/dim]",
+            f"{entry['seconds']:.1f}s",
+            f"{entry['seconds'] / entry['requests'] * 1000:.0f}ms",
+        )
+    console.print(table)
+
+
 def offer_open_and_approve(
     org: str, repo: str, commit_hash: str, sub_path: str = "",
     ci_mode: bool = False,
@@ -172,13 +203,111 @@ def offer_open_and_approve(
     return None
 
 
+def _build_in_worker(kwargs: dict) -> tuple[tuple | None, str, Exception | None]:
+    """Run build_in_docker(**kwargs) in a worker process.
+
+    Returns (build result, buffered console output, exception raised).  The
+    output is only shown if the result turns out to be needed.
+    """
+    with buffered_console() as captured:
+        try:
+            result, error = build_in_docker(**kwargs), None
+        except Exception as e:
+            result, error = None, e
+    return result, captured[0], error
+
+
+def _run_build_worker(kwargs: dict, conn) -> None:
+    # A process group of its own, so that cancelling the build also stops
+    # the docker commands it runs.
+    os.setpgrp()
+    conn.send(_build_in_worker(kwargs))
+    conn.close()
+
+
+class _BackgroundBuild:
+    """build_in_docker(**kwargs) running in a worker process, see _build_in_worker.
+
+    Unlike a process pool, the build can be stopped when its result is not
+    needed, instead of waiting for it to finish.
+    """
+
+    def __init__(self, kwargs: dict):
+        self._kwargs = kwargs
+        self._conn, child_conn = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_run_build_worker, args=(kwargs, child_conn), daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._done = False
+
+    def result(self) -> tuple[tuple | None, str, Exception | None]:
+        """Wait for the build, see _build_in_worker."""
+        try:
+            result = self._conn.recv()
+        except EOFError:
+            result = None, "", RuntimeError("The background build exited unexpectedly")
+        self._done = True
+        self._process.join()
+        return result
+
+    def cancel(self) -> None:
+        """Stop the build unless its result was collected, and remove its container and image."""
+        if self._done:
+            return
+        self._done = True
+        if self._process.is_alive():
+            try:
+                os.killpg(self._process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                # Not in its own process group yet
+                self._process.terminate()
+            self._process.join()
+        self._conn.close()
+        kwargs = self._kwargs
+        remove_build(kwargs["org"], kwargs["repo"], kwargs["commit_hash"], kwargs["approved_hash"])
+
+
 def verify_single_action(
     action_ref: str, gh: GitHubClient | None = None, ci_mode: bool = False,
     cache: bool = True, show_build_steps: bool = False,
-    check_binary_downloads: bool = True,
+    check_binary_downloads: bool = True, clone: bool = False,
+    package_cache: bool = False, parallel_builds: bool = False,
 ) -> bool:
-    """Verify a single action reference. Returns True if verification passed."""
+    """Verify a single action reference. Returns True if verification passed.
+
+    With ``clone``, the security checks read the action's files from a
+    local shallow clone of the commit instead of fetching each over HTTP.
+    With ``package_cache``, the rebuilds reuse the persistent package
+    manager caches (see package_cache).
+
+    With ``parallel_builds``, when there are approved versions, the rebuild
+    with the approved lock files and the clone for the source diff start
+    together with the primary rebuild, in a worker process and a thread,
+    instead of after it.  Their results are used only if needed.
+    """
     org, repo, sub_path, commit_hash = parse_action_ref(action_ref)
+    if clone:
+        with ExitStack() as stack:
+            with console.status(
+                f"[bold blue]Cloning {org}/{repo} at {commit_hash[:12]}...[/bold blue]"
+            ):
+                provider = stack.enter_context(cloned(org, repo, commit_hash))
+            if provider is None:
+                console.print(
+                    "  [yellow]⚠[/yellow] Could not clone the repository, "
+                    "reading files over HTTP instead"
+                )
+            return verify_single_action(
+                action_ref, gh=gh, ci_mode=ci_mode, cache=cache,
+                show_build_steps=show_build_steps,
+                check_binary_downloads=check_binary_downloads,
+                package_cache=package_cache, parallel_builds=parallel_builds,
+            )
+    http_session.get_session().stats.reset()
+    toolchain_stats.reset()
+    package_cache_stats.reset()
 
     # Look up approved versions early — used for the lock-file retry and the
     # later approved-version diff section.
@@ -235,14 +364,35 @@ def verify_single_action(
                 )
             )
 
-    with tempfile.TemporaryDirectory(prefix="verify-action-") as tmp:
+    # Exiting the stack stops the retry build if its result was not needed,
+    # and waits for the source clone, before the work dir they write to is removed.
+    with tempfile.TemporaryDirectory(prefix="verify-action-") as tmp, ExitStack() as background:
         work_dir = Path(tmp)
+        retry_dir = work_dir / "retry"
+        retry_build: _BackgroundBuild | None = None
+        source_clone: Future | None = None
+        if parallel_builds and approved:
+            retry_dir.mkdir()
+            retry_build = _BackgroundBuild(dict(
+                org=org, repo=repo, commit_hash=commit_hash, work_dir=retry_dir,
+                sub_path=sub_path, gh=gh, cache=cache, show_build_steps=show_build_steps,
+                approved_hash=approved[0]["hash"], package_cache=package_cache,
+            ))
+            background.callback(retry_build.cancel)
+            source_clone = background.enter_context(ThreadPoolExecutor(max_workers=1)).submit(
+                clone_repo, org, repo, work_dir / "repo-clone",
+            )
+            console.print(
+                "  [green]✓[/green] Started the rebuild with the approved lock files "
+                "and the source clone in the background"
+            )
+
         (original_dir, rebuilt_dir, action_type, out_dir_name,
          has_node_modules, original_node_modules, rebuilt_node_modules,
          kept_js_files) = build_in_docker(
             org, repo, commit_hash, work_dir, sub_path=sub_path, gh=gh,
             cache=cache, show_build_steps=show_build_steps,
-            source_commit_hash=source_commit_hash,
+            source_commit_hash=source_commit_hash, package_cache=package_cache,
         )
 
         # Paths from /kept-js.log are repo-root-relative (e.g. "dist/post.js").
@@ -257,6 +407,12 @@ def verify_single_action(
                 kept_out_dir_paths.add(p)
 
         checks_performed.append(("Action type detection", "info", action_type))
+        toolchain_summary = toolchain_stats.summary()
+        if toolchain_summary:
+            checks_performed.append(("Toolchain image", "info", toolchain_summary))
+        package_cache_summary = package_cache_stats.summary()
+        if package_cache_summary:
+            checks_performed.append(("Package cache", "info", package_cache_summary))
         if source_detached_detail:
             checks_performed.append((
                 "Source-detached release tag",
@@ -508,14 +664,22 @@ def verify_single_action(
                     )
                 )
 
-                retry_dir = work_dir / "retry"
-                retry_dir.mkdir(exist_ok=True)
+                if retry_build is not None:
+                    with console.status("[bold blue]Waiting for the rebuild with approved lock files...[/bold blue]"):
+                        retry_result, retry_output, retry_error = retry_build.result()
+                    console.file.write(retry_output)
+                    console.file.flush()
+                    if retry_error is not None:
+                        raise retry_error
+                else:
+                    retry_dir.mkdir(exist_ok=True)
+                    retry_result = build_in_docker(
+                        org, repo, commit_hash, retry_dir, sub_path=sub_path, gh=gh,
+                        cache=cache, show_build_steps=show_build_steps,
+                        approved_hash=prev_hash, package_cache=package_cache,
+                    )
                 (retry_orig, retry_rebuilt, _, _, retry_has_nm,
-                 retry_orig_nm, retry_rebuilt_nm, _) = build_in_docker(
-                    org, repo, commit_hash, retry_dir, sub_path=sub_path, gh=gh,
-                    cache=cache, show_build_steps=show_build_steps,
-                    approved_hash=prev_hash,
-                )
+                 retry_orig_nm, retry_rebuilt_nm, _) = retry_result
 
                 retry_match = diff_js_files(
                     retry_orig, retry_rebuilt, org, repo, commit_hash, out_dir_name,
@@ -568,6 +732,7 @@ def verify_single_action(
                 diff_approved_vs_new(
                     org, repo, selected_hash, commit_hash, work_dir,
                     ci_mode=ci_mode, include_dist_files=kept_repo_paths,
+                    clone_dir=source_clone.result() if source_clone is not None else None,
                 )
                 checks_performed.append(("Source diff vs approved", "info", f"compared against {selected_hash[:12]}"))
         else:
@@ -586,6 +751,7 @@ def verify_single_action(
         checks_performed,
         ci_mode=ci_mode,
     )
+    show_http_summary(http_session.get_session().stats.snapshot())
 
     overall_passed = (
         all_match